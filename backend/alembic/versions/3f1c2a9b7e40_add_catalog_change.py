@@ -0,0 +1,32 @@
+"""add_catalog_change
+
+Revision ID: 3f1c2a9b7e40
+Revises: d7b538646a35
+Create Date: 2026-10-18 23:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9b7e40'
+down_revision = 'd7b538646a35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Append-only catalog change feed polled by the workers
+    op.create_table('catalog_change',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('entity', sa.String(length=32), nullable=False),
+    sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_catalog_change_changed_at'), 'catalog_change', ['changed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_catalog_change_changed_at'), table_name='catalog_change')
+    op.drop_table('catalog_change')
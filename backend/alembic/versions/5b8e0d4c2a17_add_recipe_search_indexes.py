@@ -0,0 +1,27 @@
+"""add_recipe_search_indexes
+
+Revision ID: 5b8e0d4c2a17
+Revises: 3f1c2a9b7e40
+Create Date: 2026-10-18 23:50:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8e0d4c2a17'
+down_revision = '3f1c2a9b7e40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Recipe search filters by category and by ingredient (recipe_ingredient's key leads with recipe_id)
+    op.create_index(op.f('ix_recipe_category'), 'recipe', ['category'], unique=False)
+    op.create_index('ix_recipe_ingredient_ingredient_recipe', 'recipe_ingredient', ['ingredient_id', 'recipe_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recipe_ingredient_ingredient_recipe', table_name='recipe_ingredient')
+    op.drop_index(op.f('ix_recipe_category'), table_name='recipe')
@@ -0,0 +1,32 @@
+"""add_recipe_lsh_bucket
+
+Revision ID: 8d2f6a1c9e53
+Revises: 5b8e0d4c2a17
+Create Date: 2026-10-19 00:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2f6a1c9e53'
+down_revision = '5b8e0d4c2a17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # MinHash LSH buckets for similar recipes; fill with `python -m src.core.recipe_similarity`
+    op.create_table('recipe_lsh_bucket',
+    sa.Column('bucket', sa.BigInteger(), autoincrement=False, nullable=False),
+    sa.Column('recipe_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['recipe_id'], ['recipe.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('bucket', 'recipe_id')
+    )
+    op.create_index(op.f('ix_recipe_lsh_bucket_recipe_id'), 'recipe_lsh_bucket', ['recipe_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_recipe_lsh_bucket_recipe_id'), table_name='recipe_lsh_bucket')
+    op.drop_table('recipe_lsh_bucket')
@@ -0,0 +1,36 @@
+"""add_recipe_neighbor
+
+Revision ID: a4c7e1f09b36
+Revises: 8d2f6a1c9e53
+Create Date: 2026-10-19 01:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c7e1f09b36'
+down_revision = '8d2f6a1c9e53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Co-favorite neighbor lists for recommendations; fill with `python -m src.core.recipe_neighbors`
+    op.create_table('recipe_neighbor',
+    sa.Column('recipe_id', sa.Integer(), nullable=False),
+    sa.Column('neighbor_id', sa.Integer(), nullable=False),
+    sa.Column('shared', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['recipe_id'], ['recipe.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['neighbor_id'], ['recipe.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('recipe_id', 'neighbor_id')
+    )
+    # Users who favorited a recipe, for the incremental neighbor updates
+    op.create_index(op.f('ix_favorite_recipe_recipe_id'), 'favorite_recipe', ['recipe_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_favorite_recipe_recipe_id'), table_name='favorite_recipe')
+    op.drop_table('recipe_neighbor')
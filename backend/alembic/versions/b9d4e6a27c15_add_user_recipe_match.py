@@ -0,0 +1,47 @@
+"""add_user_recipe_match
+
+Revision ID: b9d4e6a27c15
+Revises: e7a3f2c61d08
+Create Date: 2026-10-19 05:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9d4e6a27c15'
+down_revision = 'e7a3f2c61d08'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Precomputed cookable recipes per user; fill with `python -m src.core.cookable`
+    op.create_table('user_recipe_match',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('recipe_id', sa.Integer(), nullable=False),
+    sa.Column('matched', sa.Integer(), nullable=False),
+    sa.Column('missing', sa.Integer(), nullable=False),
+    sa.Column('match_percentage', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['recipe_id'], ['recipe.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'rank')
+    )
+    op.create_index(op.f('ix_user_recipe_match_recipe_id'), 'user_recipe_match', ['recipe_id'], unique=False)
+    op.create_table('user_recipe_match_queue',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('recipe_id', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # Users holding an ingredient, to find whose matches a recipe change affects
+    op.create_index(op.f('ix_user_pantry_ingredient_id'), 'user_pantry', ['ingredient_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_user_pantry_ingredient_id'), table_name='user_pantry')
+    op.drop_table('user_recipe_match_queue')
+    op.drop_index(op.f('ix_user_recipe_match_recipe_id'), table_name='user_recipe_match')
+    op.drop_table('user_recipe_match')
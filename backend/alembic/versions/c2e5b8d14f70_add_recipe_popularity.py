@@ -0,0 +1,33 @@
+"""add_recipe_popularity
+
+Revision ID: c2e5b8d14f70
+Revises: a4c7e1f09b36
+Create Date: 2026-10-19 02:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2e5b8d14f70'
+down_revision = 'a4c7e1f09b36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Write-behind counters for popular / trending; fill the favorite counts with `python -m src.core.popularity`
+    op.create_table('recipe_popularity',
+    sa.Column('recipe_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('favorites', sa.Integer(), nullable=False),
+    sa.Column('views', sa.Integer(), nullable=False),
+    sa.Column('trending', sa.Float(), nullable=False),
+    sa.Column('trending_era', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['recipe_id'], ['recipe.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('recipe_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('recipe_popularity')
@@ -0,0 +1,40 @@
+"""add_recipe_summary
+
+Revision ID: e7a3f2c61d08
+Revises: c2e5b8d14f70
+Create Date: 2026-10-19 03:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a3f2c61d08'
+down_revision = 'c2e5b8d14f70'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Denormalized recipe read model; backfill with `python -m src.core.recipe_summary`
+    op.create_table('recipe_summary',
+    sa.Column('recipe_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('category', sa.String(length=64), nullable=True),
+    sa.Column('cook_time_in_minutes', sa.Integer(), nullable=True),
+    sa.Column('prep_time_in_minutes', sa.Integer(), nullable=True),
+    sa.Column('total_time_in_minutes', sa.Integer(), nullable=True),
+    sa.Column('ingredient_count', sa.Integer(), nullable=False),
+    sa.Column('ingredient_ids', sa.JSON(), nullable=False),
+    sa.Column('ingredient_names', sa.JSON(), nullable=False),
+    sa.Column('favorite_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['recipe_id'], ['recipe.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('recipe_id')
+    )
+    op.create_index(op.f('ix_recipe_summary_category'), 'recipe_summary', ['category'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_recipe_summary_category'), table_name='recipe_summary')
+    op.drop_table('recipe_summary')
@@ -0,0 +1,28 @@
+"""add_recipe_popularity_updated_at
+
+Revision ID: f1c8a3d5e927
+Revises: b9d4e6a27c15
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c8a3d5e927'
+down_revision = 'b9d4e6a27c15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Lets workers reload only the counters written since their last reload; existing rows stay NULL
+    # and are read by the full reload at startup
+    op.add_column('recipe_popularity', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_recipe_popularity_updated_at'), 'recipe_popularity', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_recipe_popularity_updated_at'), table_name='recipe_popularity')
+    op.drop_column('recipe_popularity', 'updated_at')
@@ -0,0 +1,167 @@
+"""
+Data-access strategy microbenchmark.
+
+Calls the same service read methods through each strategy (ORM, Core, raw SQL)
+on the same dataset and reports per-call latency and peak allocation, so the
+per-service DATA_ACCESS_STRATEGIES setting can be chosen from measurements.
+
+Usage (from the backend/ directory):
+    python -m benchmarks.data_access --database-url sqlite:///./bench.db --iterations 200 --out strategies.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from .endpoints import percentile
+
+
+def _cases(ctx) -> List[Tuple[str, str, Callable]]:
+    """(service key, label, call(service)) for every strategy-aware read method"""
+    from src.services.ingredient_service import IngredientService
+    from src.services.favorite_recipe_service import FavoriteRecipeService
+    from src.services.recipe_service import RecipeService
+    from src.services.user_pantry_service import UserPantryService
+
+    recipe_id, ingredient_id, ingredient_name, user_id = ctx["recipe_id"], ctx["ingredient_id"], ctx["ingredient_name"], ctx["user_id"]
+    fav_user, fav_recipe = ctx["favorite"]
+    return [
+        ("ingredient", "get_all_ingredients(limit=100)", IngredientService, lambda s: s.get_all_ingredients(0, 100)),
+        ("ingredient", "get_ingredient_by_id", IngredientService, lambda s: s.get_ingredient_by_id(ingredient_id)),
+        ("ingredient", "get_ingredient_by_name", IngredientService, lambda s: s.get_ingredient_by_name(ingredient_name)),
+        ("ingredient", "get_ingredients_by_category", IngredientService, lambda s: s.get_ingredients_by_category(ctx["ingredient_category"], 0, 100)),
+        ("ingredient", "search_ingredients", IngredientService, lambda s: s.search_ingredients(ctx["ingredient_term"], 0, 100)),
+        ("ingredient", "get_unique_categories", IngredientService, lambda s: s.get_unique_categories()),
+        ("favorite", "get_user_favorites", FavoriteRecipeService, lambda s: s.get_user_favorites(fav_user)),
+        ("favorite", "get_favorite", FavoriteRecipeService, lambda s: s.get_favorite(fav_user, fav_recipe)),
+        ("favorite", "is_favorited", FavoriteRecipeService, lambda s: s.is_favorited(fav_user, fav_recipe)),
+        ("recipe", "get_all_recipes(limit=100)", RecipeService, lambda s: s.get_all_recipes(0, 100)),
+        ("recipe", "get_recipe_by_id", RecipeService, lambda s: s.get_recipe_by_id(recipe_id)),
+        ("recipe", "get_recipes_by_category", RecipeService, lambda s: s.get_recipes_by_category(ctx["recipe_category"], 0, 100)),
+        ("recipe", "search_recipes", RecipeService, lambda s: s.search_recipes(ctx["recipe_term"], 0, 100)),
+        ("pantry", "get_user_pantry", UserPantryService, lambda s: s.get_user_pantry(user_id)),
+        ("pantry", "get_pantry_by_category", UserPantryService, lambda s: s.get_pantry_by_category(user_id, ctx["ingredient_category"])),
+    ]
+
+
+def _sample(db) -> dict:
+    from sqlalchemy import text
+
+    def one(sql):
+        return db.execute(text(sql)).fetchone()
+
+    favorite = one("SELECT user_id, recipe_id FROM favorite_recipe LIMIT 1")
+    ingredient = one("SELECT id, name, category FROM ingredient ORDER BY id LIMIT 1")
+    recipe = one("SELECT id, name, category FROM recipe ORDER BY id LIMIT 1")
+    user = one("SELECT user_id FROM user_pantry LIMIT 1")
+    if not (favorite and ingredient and recipe and user):
+        raise SystemExit("Target database is empty; generate a catalog first with `python -m src.core.generate_data`.")
+    return {
+        "recipe_id": recipe.id,
+        "recipe_category": recipe.category,
+        "recipe_term": recipe.name.split()[-1],
+        "ingredient_id": ingredient.id,
+        "ingredient_name": ingredient.name,
+        "ingredient_category": ingredient.category,
+        "ingredient_term": ingredient.name[:4],
+        "user_id": user.user_id,
+        "favorite": (favorite.user_id, favorite.recipe_id),
+    }
+
+
+def measure(session_factory, service_cls, strategy, call, iterations: int, warmup: int) -> dict:
+    """Per-call latency (fresh session per call, like a request) and peak traced allocation"""
+    def once():
+        db = session_factory()
+        try:
+            return call(service_cls(db, strategy=strategy))
+        finally:
+            db.close()
+
+    for _ in range(warmup):
+        once()
+
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        once()
+        latencies.append(time.perf_counter() - started)
+
+    # Allocation pass is separate: tracemalloc slows every allocation down and would skew latency
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(max(1, iterations // 10)):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            once()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "p50_us": round(percentile(latencies, 50) * 1e6, 1),
+        "p95_us": round(percentile(latencies, 95) * 1e6, 1),
+        "mean_us": round(sum(latencies) / len(latencies) * 1e6, 1),
+        "peak_alloc_kib": round(sum(peaks) / len(peaks) / 1024, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare ORM, Core and raw SQL data-access strategies")
+    parser.add_argument("--database-url", help="Target database (defaults to the configured one)")
+    parser.add_argument("--iterations", type=int, default=200, help="Timed calls per method and strategy")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--only", nargs="*", help="Service keys to run: ingredient favorite recipe pantry")
+    parser.add_argument("--out", help="Write results JSON to this file")
+    args = parser.parse_args(argv)
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    from src.core.database import SessionLocal
+    from src.core.data_access import DataAccessStrategy
+
+    db = SessionLocal()
+    try:
+        ctx = _sample(db)
+    finally:
+        db.close()
+
+    results: Dict[str, Dict[str, dict]] = {}
+    fastest: Dict[str, str] = {}
+    for service, label, service_cls, call in _cases(ctx):
+        if args.only and service not in args.only:
+            continue
+        name = f"{service}.{label}"
+        results[name] = {}
+        for strategy in DataAccessStrategy:
+            results[name][strategy.value] = measure(SessionLocal, service_cls, strategy, call, args.iterations, args.warmup)
+        fastest[name] = min(results[name], key=lambda s: results[name][s]["p50_us"])
+        cells = "  ".join(
+            f"{s}={r['p50_us']:9.1f}us/{r['peak_alloc_kib']:7.1f}KiB" for s, r in results[name].items()
+        )
+        print(f"{name:50s} {cells}  fastest={fastest[name]}")
+
+    # Suggest a per-service setting: the strategy that wins most of that service's methods
+    votes: Dict[str, Dict[str, int]] = {}
+    for name, winner in fastest.items():
+        service = name.split(".", 1)[0]
+        votes.setdefault(service, {}).setdefault(winner, 0)
+        votes[service][winner] += 1
+    suggestion = ",".join(f"{service}={max(v, key=v.get)}" for service, v in votes.items())
+    print(f"\nSuggested setting: DATA_ACCESS_STRATEGIES={suggestion}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"results": results, "fastest": fastest, "suggested": suggestion}, f, indent=2)
+        print(f"Results written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
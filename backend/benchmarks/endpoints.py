@@ -0,0 +1,510 @@
+"""
+Endpoint benchmark suite.
+
+Runs the FastAPI app in-process through an ASGI client against a generated
+catalog (see src/core/generate_data.py) and records p50/p95/p99 latency,
+throughput and SQL queries per request for every endpoint.
+
+Usage (from the backend/ directory):
+    python -m src.core.generate_data --scale 10k --database-url sqlite:///./bench.db --reset
+    python -m benchmarks.endpoints run --database-url sqlite:///./bench.db --concurrency 8 --out before.json
+    python -m benchmarks.endpoints run --database-url sqlite:///./bench.db --concurrency 8 --out after.json
+    python -m benchmarks.endpoints compare before.json after.json --threshold 0.10
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+API_KEY_HEADER = "X-API-Key"
+_SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+# A request is (path, json body or None)
+RequestSpec = Tuple[str, Optional[dict]]
+
+
+@dataclass
+class BenchContext:
+    """Ids sampled from the target dataset; every scenario draws its parameters from here"""
+    rng: random.Random
+    run_token: str
+    recipe_ids: List[int]
+    ingredient_ids: List[int]
+    user_ids: List[int]
+    recipe_categories: List[str]
+    ingredient_categories: List[str]
+    recipe_terms: List[str]
+    ingredient_terms: List[str]
+    pantry_items: List[Tuple[int, int]]
+    favorites: List[Tuple[int, int]]
+    counter: int = 0
+
+    def unique(self, prefix: str) -> str:
+        self.counter += 1
+        return f"{prefix}-{self.run_token}-{self.counter}"
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    build: Callable[[BenchContext, dict], RequestSpec]
+    # Untimed hooks: setup returns state passed to build/teardown (e.g. a row to delete)
+    setup: Optional[Callable[["BenchClient", BenchContext], Awaitable[dict]]] = None
+    teardown: Optional[Callable[["BenchClient", BenchContext, dict, Optional[dict]], Awaitable[None]]] = None
+    writes: bool = False
+
+
+class BenchClient:
+    """Thin wrapper around an in-process ASGI client"""
+
+    def __init__(self, app, api_key: str):
+        import httpx
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        self.client = httpx.AsyncClient(transport=transport, base_url="http://bench", headers={API_KEY_HEADER: api_key})
+
+    async def request(self, method: str, path: str, body: Optional[dict] = None):
+        return await self.client.request(method, path, json=body)
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class QueryCounter:
+    """Counts SQL statements executed on an engine (used in the sequential calibration pass)"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+# ---------------------------------------------------------------------------
+# Scenarios
+# ---------------------------------------------------------------------------
+
+class SetupFailed(Exception):
+    """An untimed setup request failed; the iteration is counted as an error"""
+
+
+def _json_or_none(response) -> Optional[dict]:
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+def _created(response) -> dict:
+    body = _json_or_none(response) if response.status_code < 300 else None
+    if not isinstance(body, dict):
+        raise SetupFailed(f"setup request failed with status {response.status_code}")
+    return body
+
+
+async def _create_recipe(client: BenchClient, ctx: BenchContext) -> dict:
+    ingredient_ids = ctx.rng.sample(ctx.ingredient_ids, min(5, len(ctx.ingredient_ids)))
+    body = {
+        "name": ctx.unique("bench-recipe"),
+        "category": ctx.rng.choice(ctx.recipe_categories),
+        "cook_time_in_minutes": 20,
+        "prep_time_in_minutes": 10,
+        "ingredients": [{"ingredient_id": i, "quantity": "1", "unit": "cup"} for i in ingredient_ids],
+        "steps": [{"step_order": n, "instruction": "Stir well.", "time_in_minutes": 2} for n in range(1, 4)],
+    }
+    response = await client.request("POST", "/recipes/", body)
+    return {"recipe_id": _created(response)["id"]}
+
+
+async def _delete_recipe(client: BenchClient, ctx: BenchContext, state: dict, created: Optional[dict]):
+    recipe_id = state.get("recipe_id") or (created or {}).get("id")
+    if recipe_id:
+        await client.request("DELETE", f"/recipes/{recipe_id}")
+
+
+async def _create_ingredient(client: BenchClient, ctx: BenchContext) -> dict:
+    response = await client.request("POST", "/ingredients/", {"name": ctx.unique("bench-ingredient"), "category": "Bench"})
+    return {"ingredient_id": _created(response)["id"]}
+
+
+async def _delete_ingredient(client: BenchClient, ctx: BenchContext, state: dict, created: Optional[dict]):
+    ingredient_id = state.get("ingredient_id") or (created or {}).get("id")
+    if ingredient_id:
+        await client.request("DELETE", f"/ingredients/{ingredient_id}")
+
+
+async def _create_user(client: BenchClient, ctx: BenchContext) -> dict:
+    user = _created(await client.request("POST", "/users/register", {"email": f"{ctx.unique('bench')}@example.com"}))
+    return {"user_id": user["id"], "email": user["email"]}
+
+
+async def _delete_user(client: BenchClient, ctx: BenchContext, state: dict, created: Optional[dict]):
+    user_id = state.get("user_id") or (created or {}).get("id")
+    if user_id:
+        await client.request("DELETE", f"/users/profile/{user_id}")
+
+
+async def _pick_free_pantry_slot(client: BenchClient, ctx: BenchContext) -> dict:
+    # A fresh user guarantees the (user, ingredient) key is free
+    state = await _create_user(client, ctx)
+    state["ingredient_id"] = ctx.rng.choice(ctx.ingredient_ids)
+    return state
+
+
+async def _create_pantry_item(client: BenchClient, ctx: BenchContext) -> dict:
+    state = await _pick_free_pantry_slot(client, ctx)
+    _created(await client.request("POST", f"/users/{state['user_id']}/pantry/",
+                                  {"ingredient_id": state["ingredient_id"], "quantity": "1", "unit": "unit"}))
+    return state
+
+
+async def _create_favorite(client: BenchClient, ctx: BenchContext) -> dict:
+    state = await _create_user(client, ctx)
+    state["recipe_id"] = ctx.rng.choice(ctx.recipe_ids)
+    _created(await client.request("POST", f"/users/{state['user_id']}/favorites/",
+                                  {"recipe_id": state["recipe_id"], "user_note": "bench"}))
+    return state
+
+
+async def _favorite_slot(client: BenchClient, ctx: BenchContext) -> dict:
+    state = await _create_user(client, ctx)
+    state["recipe_id"] = ctx.rng.choice(ctx.recipe_ids)
+    return state
+
+
+def build_scenarios() -> List[Scenario]:
+    def pick(values):
+        return lambda ctx: ctx.rng.choice(values(ctx))
+
+    recipe_id = pick(lambda c: c.recipe_ids)
+    ingredient_id = pick(lambda c: c.ingredient_ids)
+    user_id = pick(lambda c: c.user_ids)
+
+    def by_ingredients(ctx, _):
+        ids = ctx.rng.sample(ctx.ingredient_ids, min(4, len(ctx.ingredient_ids)))
+        return "/recipes/by-ingredients/?" + "&".join(f"ingredient_ids={i}" for i in ids), None
+
+    def pantry_item(ctx, _):
+        user, ingredient = ctx.rng.choice(ctx.pantry_items)
+        return f"/users/{user}/pantry/{ingredient}", None
+
+    def favorite(ctx, suffix=""):
+        user, recipe = ctx.rng.choice(ctx.favorites)
+        return f"/users/{user}/favorites/{recipe}{suffix}", None
+
+    return [
+        # recipes.py
+        Scenario("recipes.list", "GET", lambda ctx, _: ("/recipes/?limit=100", None)),
+        Scenario("recipes.list_by_category", "GET", lambda ctx, _: (f"/recipes/?category={ctx.rng.choice(ctx.recipe_categories)}&limit=100", None)),
+        Scenario("recipes.search", "GET", lambda ctx, _: (f"/recipes/?search={ctx.rng.choice(ctx.recipe_terms)}&limit=100", None)),
+        Scenario("recipes.get", "GET", lambda ctx, _: (f"/recipes/{recipe_id(ctx)}", None)),
+        Scenario("recipes.by_ingredients", "GET", by_ingredients),
+        Scenario("recipes.create", "POST", lambda ctx, _: ("/recipes/", {
+            "name": ctx.unique("bench-recipe"), "category": "Bench",
+            "ingredients": [{"ingredient_id": ingredient_id(ctx), "quantity": "1", "unit": "cup"}],
+            "steps": [{"step_order": 1, "instruction": "Mix.", "time_in_minutes": 1}],
+        }), teardown=_delete_recipe, writes=True),
+        Scenario("recipes.update", "PUT", lambda ctx, s: (f"/recipes/{s['recipe_id']}", {"cook_time_in_minutes": 30}),
+                 setup=_create_recipe, teardown=_delete_recipe, writes=True),
+        Scenario("recipes.delete", "DELETE", lambda ctx, s: (f"/recipes/{s['recipe_id']}", None),
+                 setup=_create_recipe, writes=True),
+
+        # ingredients.py
+        Scenario("ingredients.list", "GET", lambda ctx, _: ("/ingredients/?limit=100", None)),
+        Scenario("ingredients.list_by_category", "GET", lambda ctx, _: (f"/ingredients/?category={ctx.rng.choice(ctx.ingredient_categories)}&limit=100", None)),
+        Scenario("ingredients.search", "GET", lambda ctx, _: (f"/ingredients/?search={ctx.rng.choice(ctx.ingredient_terms)}&limit=100", None)),
+        Scenario("ingredients.categories", "GET", lambda ctx, _: ("/ingredients/categories", None)),
+        Scenario("ingredients.get", "GET", lambda ctx, _: (f"/ingredients/{ingredient_id(ctx)}", None)),
+        Scenario("ingredients.create", "POST", lambda ctx, _: ("/ingredients/", {"name": ctx.unique("bench-ingredient"), "category": "Bench"}),
+                 teardown=_delete_ingredient, writes=True),
+        Scenario("ingredients.update", "PUT", lambda ctx, s: (f"/ingredients/{s['ingredient_id']}", {"name": ctx.unique("bench-renamed"), "category": "Bench"}),
+                 setup=_create_ingredient, teardown=_delete_ingredient, writes=True),
+        Scenario("ingredients.delete", "DELETE", lambda ctx, s: (f"/ingredients/{s['ingredient_id']}", None),
+                 setup=_create_ingredient, writes=True),
+        Scenario("ingredients.add_substitute", "POST", lambda ctx, s: (f"/ingredients/{s['ingredient_id']}/substitutes", {"name": "Bench Substitute", "unit": "cup"}),
+                 setup=_create_ingredient, teardown=_delete_ingredient, writes=True),
+
+        # pantry.py
+        Scenario("pantry.list", "GET", lambda ctx, _: (f"/users/{user_id(ctx)}/pantry/", None)),
+        Scenario("pantry.list_by_category", "GET", lambda ctx, _: (f"/users/{user_id(ctx)}/pantry/?category={ctx.rng.choice(ctx.ingredient_categories)}", None)),
+        Scenario("pantry.get", "GET", pantry_item),
+        Scenario("pantry.add", "POST", lambda ctx, s: (f"/users/{s['user_id']}/pantry/", {"ingredient_id": s["ingredient_id"], "quantity": "2", "unit": "unit"}),
+                 setup=_pick_free_pantry_slot, teardown=_delete_user, writes=True),
+        Scenario("pantry.update", "PUT", lambda ctx, s: (f"/users/{s['user_id']}/pantry/{s['ingredient_id']}", {"quantity": "3"}),
+                 setup=_create_pantry_item, teardown=_delete_user, writes=True),
+        Scenario("pantry.remove", "DELETE", lambda ctx, s: (f"/users/{s['user_id']}/pantry/{s['ingredient_id']}", None),
+                 setup=_create_pantry_item, teardown=_delete_user, writes=True),
+
+        # favorites.py
+        Scenario("favorites.list", "GET", lambda ctx, _: (f"/users/{user_id(ctx)}/favorites/", None)),
+        Scenario("favorites.get", "GET", lambda ctx, _: favorite(ctx)),
+        Scenario("favorites.check", "GET", lambda ctx, _: favorite(ctx, "/check")),
+        Scenario("favorites.add", "POST", lambda ctx, s: (f"/users/{s['user_id']}/favorites/", {"recipe_id": s["recipe_id"], "user_note": "bench"}),
+                 setup=_favorite_slot, teardown=_delete_user, writes=True),
+        Scenario("favorites.update", "PUT", lambda ctx, s: (f"/users/{s['user_id']}/favorites/{s['recipe_id']}", {"user_note": "updated"}),
+                 setup=_create_favorite, teardown=_delete_user, writes=True),
+        Scenario("favorites.remove", "DELETE", lambda ctx, s: (f"/users/{s['user_id']}/favorites/{s['recipe_id']}", None),
+                 setup=_create_favorite, teardown=_delete_user, writes=True),
+
+        # users.py
+        Scenario("users.list", "GET", lambda ctx, _: ("/users/?limit=100", None)),
+        Scenario("users.get", "GET", lambda ctx, _: (f"/users/{user_id(ctx)}", None)),
+        Scenario("users.profile", "GET", lambda ctx, _: (f"/users/profile/{user_id(ctx)}", None)),
+        Scenario("users.login", "POST", lambda ctx, _: ("/users/login", {"email": f"user{user_id(ctx)}@example.com"})),
+        Scenario("users.register", "POST", lambda ctx, _: ("/users/register", {"email": f"{ctx.unique('bench')}@example.com"}),
+                 teardown=_delete_user, writes=True),
+        Scenario("users.update_profile", "PUT", lambda ctx, s: (f"/users/profile/{s['user_id']}", {"email": f"{ctx.unique('renamed')}@example.com"}),
+                 setup=_create_user, teardown=_delete_user, writes=True),
+        Scenario("users.delete", "DELETE", lambda ctx, s: (f"/users/profile/{s['user_id']}", None),
+                 setup=_create_user, writes=True),
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def sample_context(session_factory, seed: int) -> BenchContext:
+    """Sample ids, categories and search terms from the target dataset"""
+    from sqlalchemy import text
+
+    db = session_factory()
+    try:
+        def column(sql: str) -> list:
+            return [row[0] for row in db.execute(text(sql)).fetchall()]
+
+        recipe_names = column("SELECT name FROM recipe ORDER BY id LIMIT 200")
+        ingredient_names = column("SELECT name FROM ingredient ORDER BY id LIMIT 200")
+        ctx = BenchContext(
+            rng=random.Random(seed),
+            run_token=f"{int(time.time())}{os.getpid()}",
+            recipe_ids=column("SELECT id FROM recipe ORDER BY id LIMIT 5000"),
+            ingredient_ids=column("SELECT id FROM ingredient ORDER BY id LIMIT 5000"),
+            user_ids=column("SELECT id FROM users ORDER BY id LIMIT 5000"),
+            recipe_categories=column("SELECT DISTINCT category FROM recipe WHERE category IS NOT NULL"),
+            ingredient_categories=column("SELECT DISTINCT category FROM ingredient WHERE category IS NOT NULL"),
+            recipe_terms=sorted({word for name in recipe_names for word in name.split() if len(word) > 3}),
+            ingredient_terms=sorted({word for name in ingredient_names for word in name.split() if len(word) > 3}),
+            pantry_items=[tuple(row) for row in db.execute(text("SELECT user_id, ingredient_id FROM user_pantry LIMIT 5000")).fetchall()],
+            favorites=[tuple(row) for row in db.execute(text("SELECT user_id, recipe_id FROM favorite_recipe LIMIT 5000")).fetchall()],
+        )
+    finally:
+        db.close()
+
+    if not (ctx.recipe_ids and ctx.ingredient_ids and ctx.user_ids and ctx.pantry_items and ctx.favorites):
+        raise SystemExit("Target database is empty; generate a catalog first with `python -m src.core.generate_data`.")
+    return ctx
+
+
+def server_timing_queries(response) -> Optional[int]:
+    """Query count reported by the app's Server-Timing header (`db;dur=..;desc="N queries"`)"""
+    match = _SERVER_TIMING_QUERIES.search(response.headers.get("server-timing", ""))
+    return int(match.group(1)) if match else None
+
+
+async def _one(client: BenchClient, ctx: BenchContext, scenario: Scenario) -> Tuple[Optional[float], bool, Optional[int]]:
+    try:
+        state = await scenario.setup(client, ctx) if scenario.setup else {}
+    except SetupFailed:
+        return None, False, None
+    path, body = scenario.build(ctx, state)
+    started = time.perf_counter()
+    response = await client.request(scenario.method, path, body)
+    elapsed = time.perf_counter() - started
+    if scenario.teardown:
+        created = _json_or_none(response) if response.status_code < 300 else None
+        await scenario.teardown(client, ctx, state, created if isinstance(created, dict) else None)
+    return elapsed, response.status_code < 400, server_timing_queries(response)
+
+
+async def run_scenario(client: BenchClient, ctx: BenchContext, scenario: Scenario,
+                       requests: int, concurrency: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        await _one(client, ctx, scenario)
+
+    latencies: List[float] = []
+    queries: List[int] = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            elapsed, ok, count = await _one(client, ctx, scenario)
+            if elapsed is not None:
+                latencies.append(elapsed)
+            if count is not None:
+                queries.append(count)
+            errors += 0 if ok else 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "method": scenario.method,
+        "count": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        # Per-request counts from Server-Timing are exact even under concurrency
+        "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+
+async def count_queries(client: BenchClient, ctx: BenchContext, scenario: Scenario,
+                        counter: QueryCounter, samples: int) -> float:
+    """Sequential pass so every statement is attributed to the measured request"""
+    total = measured = 0
+    for _ in range(samples):
+        try:
+            state = await scenario.setup(client, ctx) if scenario.setup else {}
+        except SetupFailed:
+            continue
+        path, body = scenario.build(ctx, state)
+        counter.count = 0
+        response = await client.request(scenario.method, path, body)
+        total += counter.count
+        measured += 1
+        if scenario.teardown:
+            created = _json_or_none(response) if response.status_code < 300 else None
+            await scenario.teardown(client, ctx, state, created if isinstance(created, dict) else None)
+    return round(total / measured, 2) if measured else 0.0
+
+
+async def run_benchmarks(args) -> dict:
+    # The app reads its database URL at import time, so configure it first
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    from main import app
+    from src.core.database import SessionLocal, engine
+    from src.core.settings import settings
+
+    ctx = sample_context(SessionLocal, args.seed)
+    counter = QueryCounter(engine)
+    client = BenchClient(app, settings.API_KEY)
+
+    scenarios = [s for s in build_scenarios() if args.include_writes or not s.writes]
+    if args.only:
+        scenarios = [s for s in scenarios if any(s.name.startswith(prefix) for prefix in args.only)]
+
+    results: Dict[str, dict] = {}
+    try:
+        for scenario in scenarios:
+            result = await run_scenario(client, ctx, scenario, args.requests, args.concurrency, args.warmup)
+            if result["queries_per_request"] is None:
+                result["queries_per_request"] = await count_queries(client, ctx, scenario, counter, args.query_samples)
+            results[scenario.name] = result
+            print(f"{scenario.name:32s} p50={result['p50_ms']:8.2f}ms p95={result['p95_ms']:8.2f}ms "
+                  f"p99={result['p99_ms']:8.2f}ms {result['throughput_rps']:9.1f} req/s "
+                  f"q/req={result['queries_per_request']:6.1f} errors={result['errors']}")
+    finally:
+        await client.close()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "database": engine.url.render_as_string(hide_password=True),
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "seed": args.seed,
+            "include_writes": args.include_writes,
+        },
+        "results": results,
+    }
+
+
+def compare(base: dict, new: dict, threshold: float, min_delta_ms: float) -> List[str]:
+    """Return human-readable regression lines between two result files"""
+    regressions = []
+    print(f"{'scenario':32s} {'p95 base':>10s} {'p95 new':>10s} {'change':>8s} {'q/req':>12s}")
+    for name, before in sorted(base["results"].items()):
+        after = new["results"].get(name)
+        if not after:
+            continue
+        change = (after["p95_ms"] - before["p95_ms"]) / before["p95_ms"] if before["p95_ms"] else 0.0
+        flags = []
+        if change > threshold and after["p95_ms"] - before["p95_ms"] > min_delta_ms:
+            flags.append(f"p95 +{change:.0%}")
+        if before["throughput_rps"] and after["throughput_rps"] < before["throughput_rps"] * (1 - threshold):
+            flags.append(f"throughput {after['throughput_rps'] / before['throughput_rps'] - 1:.0%}")
+        if after["queries_per_request"] > before["queries_per_request"]:
+            flags.append(f"queries {before['queries_per_request']} -> {after['queries_per_request']}")
+        if after["errors"] > before["errors"]:
+            flags.append(f"errors {before['errors']} -> {after['errors']}")
+
+        print(f"{name:32s} {before['p95_ms']:10.2f} {after['p95_ms']:10.2f} {change:+8.0%} "
+              f"{before['queries_per_request']:5.1f} ->{after['queries_per_request']:5.1f}"
+              + (f"  REGRESSION: {', '.join(flags)}" if flags else ""))
+        if flags:
+            regressions.append(f"{name}: {', '.join(flags)}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every API endpoint in-process")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run the benchmark and write results as JSON")
+    run.add_argument("--database-url", help="Target database (defaults to the configured one)")
+    run.add_argument("--concurrency", type=int, default=4, help="Concurrent in-flight requests per scenario")
+    run.add_argument("--requests", type=int, default=200, help="Timed requests per scenario")
+    run.add_argument("--warmup", type=int, default=10, help="Untimed warmup requests per scenario")
+    run.add_argument("--query-samples", type=int, default=5, help="Sequential requests used to count SQL queries")
+    run.add_argument("--include-writes", action="store_true", help="Also benchmark POST/PUT/DELETE endpoints")
+    run.add_argument("--only", nargs="*", help="Scenario name prefixes to run, e.g. recipes. pantry.list")
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument("--out", help="Write results JSON to this file")
+
+    cmp = sub.add_parser("compare", help="Compare two result files and flag regressions")
+    cmp.add_argument("base")
+    cmp.add_argument("new")
+    cmp.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown that counts as a regression")
+    cmp.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore p95 changes smaller than this (noise floor)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = asyncio.run(run_benchmarks(args))
+        if args.out:
+            with open(args.out, "w") as f:
+                json.dump(report, f, indent=2)
+            print(f"Results written to {args.out}")
+        return 0
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    regressions = compare(base, new, args.threshold, args.min_delta_ms)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) found")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
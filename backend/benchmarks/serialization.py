@@ -0,0 +1,93 @@
+"""
+Per-recipe serialization cost of a recipe list page.
+
+Loads one page of recipes through the ORM repository, then times only the
+Python side of the response on the same objects:
+
+    build       RecipeService._format_recipe: ORM rows -> validated Recipe models
+                (shared by the first two paths)
+    before      FastAPI's response_model pass on the returned models (validate again,
+                dump to JSON mode) and the stdlib JSONResponse encoder
+    after       FastJSONResponse (orjson) returned directly from the router
+    dicts       RecipeService._recipe_dict: ORM rows -> plain dicts of the same shape, encoded
+                by orjson with no model in between (what the recipe list endpoint serves)
+
+Usage (from the backend/ directory):
+    python -m benchmarks.serialization --database-url sqlite:///./bench.db --page-size 1000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List
+
+from .endpoints import percentile
+
+
+def encode_response_model(models, adapter) -> bytes:
+    """What FastAPI does with a returned value when the route has a response_model"""
+    content = adapter.dump_python(adapter.validate_python(models, from_attributes=True), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def _p50(fn, iterations: int) -> float:
+    fn()  # warm up
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return percentile(timings, 50)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare response_model, orjson and plain-dict recipe serialization")
+    parser.add_argument("--database-url", help="Target database (defaults to the configured one)")
+    parser.add_argument("--page-size", type=int, default=1000, help="Recipes per page")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    from pydantic import TypeAdapter
+    from src.core.database import SessionLocal
+    from src.core.responses import dumps
+    from src.schemas.recipe import Recipe
+    from src.services.recipe_service import RecipeService
+
+    db = SessionLocal()
+    try:
+        service = RecipeService(db)
+        recipes = service.repository.get_all(0, args.page_size)
+        if not recipes:
+            raise SystemExit("Target database is empty; generate a catalog first with `python -m src.core.generate_data`.")
+        adapter = TypeAdapter(List[Recipe])
+        models = [service._format_recipe(recipe) for recipe in recipes]
+
+        before, after = encode_response_model(models, adapter), dumps(models)
+        plain = dumps([service._recipe_dict(recipe) for recipe in recipes])
+        if not json.loads(before) == json.loads(after) == json.loads(plain):
+            raise SystemExit("The paths produced different JSON")
+
+        count = len(recipes)
+        build = _p50(lambda: [service._format_recipe(recipe) for recipe in recipes], args.iterations) / count
+        encode_before = _p50(lambda: encode_response_model(models, adapter), args.iterations) / count
+        encode_after = _p50(lambda: dumps(models), args.iterations) / count
+        dicts = _p50(lambda: dumps([service._recipe_dict(recipe) for recipe in recipes]), args.iterations) / count
+
+        print(f"build   {build * 1e6:8.2f}us per recipe (before and after)")
+        print(f"before  {encode_before * 1e6:8.2f}us per recipe to serialize, {(build + encode_before) * 1e6:8.2f}us total")
+        print(f"after   {encode_after * 1e6:8.2f}us per recipe to serialize, {(build + encode_after) * 1e6:8.2f}us total")
+        print(f"dicts   {dicts * 1e6:8.2f}us per recipe to build and serialize")
+        print(f"{count} recipes per page, {len(after) / 1024:.0f} KiB; serialization {encode_before / encode_after:.1f}x faster, "
+              f"{(encode_before - encode_after) * count * 1000:.1f}ms saved per page; plain dicts {(build + encode_after) / dicts:.1f}x faster "
+              f"than models + orjson")
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
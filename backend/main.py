@@ -1,15 +1,31 @@
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, Response
 from fastapi.security import APIKeyHeader
 from fastapi.openapi.utils import get_openapi
 from fastapi.middleware.cors import CORSMiddleware
+import logging
 from src.core.settings import settings
 from src.core.database import engine, Base
+from src.core.query_counter import QueryCounterMiddleware
+from src.core.tracing import TracingMiddleware
+from src.core.responses import FastJSONResponse
+from src.core.metrics import MetricsMiddleware, metrics, register_pool_gauges, CONTENT_TYPE as METRICS_CONTENT_TYPE
 from src.core.dependencies import get_api_key
 from src.core.init_db import init_db
-from src.routers import users, recipes, ingredients, favorites, pantry
+from src.core.logging import start_logging, stop_logging
+from src.core.catalog_snapshot import catalog_snapshot
+from src.core.change_feed import change_feed
+from src.core.recipe_similarity import ensure_index as ensure_similarity_index
+from src.core.recipe_neighbors import ensure_neighbors, neighbor_refresher
+from src.core.popularity import ensure_popularity, popularity_counters
+from src.core.recipe_summary import ensure_summaries
+from src.core.cookable import cookable_job, ensure_cookable
+from src.core.jobs import BackgroundJob, host_lock
+from src.core.assistant import assistant_batcher
+from src.routers import users, recipes, ingredients, favorites, pantry, shopping_list, assistant, export, admin
 
 app = FastAPI(
     title="AI Cooking Assistant API", 
+    default_response_class=FastJSONResponse,
     description="""
     AI-powered cooking assistant API.
     
@@ -21,6 +37,7 @@ app = FastAPI(
     ## Public Endpoints
     - `/` - Hello World
     - `/health` - Health check
+    - `/metrics` - Prometheus metrics
     
     ## Protected Endpoints
     All other endpoints require the API key in the header.
@@ -70,7 +87,7 @@ def custom_openapi():
     }
     # Apply security to all routes except public ones
     for path, path_item in openapi_schema["paths"].items():
-        if not (path == "/" or path == "/health"):
+        if not (path == "/" or path == "/health" or path == "/metrics"):
             for method, operation in path_item.items():
                 if method.lower() in ["get", "post", "put", "delete", "patch"]:
                     operation["security"] = [{"ApiKeyAuth": []}]
@@ -85,23 +102,90 @@ app.add_middleware(
     allow_origins=["http://localhost:3000"] if settings.ENVIRONMENT == "development" else ["https://group24604.discovery.cs.vt.edu"],
     allow_credentials=True,
     allow_methods=["GET", "POST", "OPTIONS", "PUT", "DELETE"],
-    allow_headers=["Content-Type", "Authorization", "X-API-Key"],
+    allow_headers=["Content-Type", "Authorization", "X-API-Key", "X-Trace"],
+    expose_headers=["Server-Timing", "X-Trace-Id"],
 )
 
+# Per-request SQL query count and DB time (Server-Timing header, N+1 warnings)
+app.add_middleware(QueryCounterMiddleware)
+
+# Sampled request traces (root span, X-Trace-Id header)
+app.add_middleware(TracingMiddleware)
+
+# Per-route request counts, latency histograms and in-flight requests for /metrics
+app.add_middleware(MetricsMiddleware)
+register_pool_gauges(engine)
+
 # Include routers
 app.include_router(users.router)
 app.include_router(recipes.router)
 app.include_router(ingredients.router)
 app.include_router(favorites.router)
 app.include_router(pantry.router)
+app.include_router(shopping_list.router)
+app.include_router(assistant.router)
+app.include_router(export.router)
+app.include_router(admin.router)
+
+logger = logging.getLogger(__name__)
+
+# Derived tables are maintained on write but start empty after their migration: build each once,
+# when it is empty. This runs in the background, so workers serve requests meanwhile, and under a
+# lock per table, so one worker builds while the others wait and then find it built.
+DERIVED_TABLES = [
+    ("recipe-similarity", ensure_similarity_index),  # similar-recipe buckets
+    ("recipe-neighbors", ensure_neighbors),  # co-favorite neighbor lists behind recommendations
+    ("recipe-popularity", ensure_popularity),  # favorite counts behind /recipes/popular
+    ("recipe-summary", ensure_summaries),  # recipe_summary read model
+    ("cookable", ensure_cookable),  # precomputed cookable recipes (built from the summaries)
+]
+
+def build_derived_tables(engine) -> dict:
+    failed = []
+    for name, ensure in DERIVED_TABLES:
+        try:
+            with host_lock(name):
+                ensure(engine)
+        except Exception:
+            logger.exception(f"Building {name} at startup failed")
+            failed.append(name)
+    return {"tables": len(DERIVED_TABLES), "failed": failed}
+
+derived_tables = BackgroundJob("derived-tables", build_derived_tables)
 
 # Create database tables and initialize with sample data on startup
 @app.on_event("startup")
 def create_tables():
+    start_logging()
     Base.metadata.create_all(bind=engine)
     # Initialize database with sample data for development
     if settings.ENVIRONMENT == "development":
         init_db()
+    # Build the derived tables still empty after their migration (background, one worker at a time)
+    derived_tables.trigger(engine)
+    # Map the shared catalog snapshot (built once, by the first worker, if missing)
+    catalog_snapshot.ensure(engine)
+    # Follow catalog writes made by every worker
+    change_feed.start(engine)
+    # Periodic full rebuild of the recommendation neighbor lists: off by default (cron); set
+    # RECIPE_NEIGHBORS_REFRESH_SECONDS on one designated worker only, as every worker that has it rebuilds
+    neighbor_refresher.start(engine, settings.RECIPE_NEIGHBORS_REFRESH_SECONDS)
+    # Popular / trending counters: load them, then write behind every POPULARITY_FLUSH_SECONDS
+    popularity_counters.start(engine)
+    # Apply queued pantry / recipe changes to the cookable lists: off by default (cron); set
+    # COOKABLE_REFRESH_SECONDS on one designated worker only
+    cookable_job.start(engine, settings.COOKABLE_REFRESH_SECONDS)
+    # Load ASSISTANT_MODEL and start batching assistant requests
+    assistant_batcher.start()
+
+@app.on_event("shutdown")
+def flush_logs():
+    change_feed.stop()
+    neighbor_refresher.stop()
+    cookable_job.stop()
+    assistant_batcher.stop()
+    popularity_counters.stop()
+    stop_logging()
 
 @app.get("/", tags=["public"])
 def hello_world():
@@ -111,6 +195,11 @@ def hello_world():
 def health_check():
     return {"status": "healthy", "database": "connected"}
 
+@app.get("/metrics", tags=["public"], include_in_schema=False)
+def metrics_endpoint():
+    """Prometheus scrape endpoint"""
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
 @app.get("/protected", tags=["auth"])
 async def protected_endpoint(api_key: str = Depends(get_api_key)):
     """Test endpoint to verify API key authentication"""
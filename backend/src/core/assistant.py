@@ -0,0 +1,204 @@
+"""
+Cost controls in front of the assistant model (see core/assistant_model).
+
+Inference is the most expensive call the API makes, so every request passes
+three layers before reaching the model:
+
+- response cache: replies are kept per worker, LRU with a TTL, under a key
+  built from the task, the model, the prompt's content words (case, order,
+  punctuation, stop words and plurals ignored) and the resolved ingredient ids
+  or recipe. Rephrasings of the same question over the same ingredients share
+  one entry.
+- micro-batching: misses are queued and a single thread sends up to
+  ASSISTANT_BATCH_SIZE of them in one `generate` call, waiting at most
+  ASSISTANT_BATCH_WAIT_MS for the batch to fill. Identical requests already
+  queued or running join that call instead of adding another (single flight).
+- per-user limit: a user (or a guest's address) can have at most
+  ASSISTANT_MAX_CONCURRENT_PER_USER requests waiting on the model; more get
+  AssistantBusy (429). Cache hits do not count.
+"""
+import hashlib
+import json
+import logging
+import queue
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Optional, Tuple
+
+from .assistant_model import AssistantModel, ModelReply, ModelRequest, content_words, load_model
+from .metrics import metrics
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AssistantBusy(Exception):
+    """Raised when a user already has ASSISTANT_MAX_CONCURRENT_PER_USER requests waiting on the model"""
+
+
+def cache_key(task: str, model: str, prompt: str, *parts) -> str:
+    """Stable key over the task, model, normalized prompt and the request's catalog inputs"""
+    payload = json.dumps([task, model, content_words(prompt), *parts], separators=(",", ":"), default=list)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, capacity: int, ttl: float):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, ModelReply]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[ModelReply]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        metrics.record_cache("assistant", entry is not None)
+        return entry[1] if entry else None
+
+    def put(self, key: str, reply: ModelReply):
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, reply)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class ConcurrencyLimiter:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._active: Counter = Counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, owner: str):
+        with self._lock:
+            if self._active[owner] >= self.limit:
+                raise AssistantBusy(f"At most {self.limit} assistant requests at a time")
+            self._active[owner] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active[owner] -= 1
+                if not self._active[owner]:
+                    del self._active[owner]
+
+
+class MicroBatcher:
+    """Groups queued model requests into batched `generate` calls on one thread; replies go to the cache"""
+
+    def __init__(self, cache: ResponseCache):
+        self.cache = cache
+        self.model: Optional[AssistantModel] = None
+        self.batches = 0
+        self.requests = 0
+        self._queue: "queue.Queue[Tuple[str, ModelRequest, Future]]" = queue.Queue()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._in_flight)
+
+    def start(self, model: Optional[AssistantModel] = None):
+        """Load the model (ASSISTANT_MODEL unless given) and start the batching thread"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self.model = model or self.model or load_model(settings.ASSISTANT_MODEL)
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="assistant-batcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def submit(self, key: str, request: ModelRequest) -> Future:
+        """Queue a request, or join the identical one already queued or running"""
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is None:
+                future = self._in_flight[key] = Future()
+                self._queue.put((key, request, future))
+        return future
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                batch = [self._queue.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + settings.ASSISTANT_BATCH_WAIT_MS / 1000
+            while len(batch) < settings.ASSISTANT_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._run(batch)
+
+    def _run(self, batch):
+        self.batches += 1
+        self.requests += len(batch)
+        metrics.increment("assistant_model_calls")
+        metrics.increment("assistant_model_requests", len(batch))
+        try:
+            replies = self.model.generate([request for _, request, _ in batch])
+            if len(replies) != len(batch):
+                raise RuntimeError(f"Model {self.model.name} returned {len(replies)} replies for {len(batch)} requests")
+        except Exception as e:
+            logger.exception(f"Assistant model call failed for a batch of {len(batch)}")
+            outcomes = [(None, e)] * len(batch)
+        else:
+            outcomes = [(reply, None) for reply in replies]
+        for (key, _, future), (reply, error) in zip(batch, outcomes):
+            if reply is not None:
+                self.cache.put(key, reply)
+            with self._lock:
+                self._in_flight.pop(key, None)
+            if error is None:
+                future.set_result(reply)
+            else:
+                future.set_exception(error)
+
+
+response_cache = ResponseCache(settings.ASSISTANT_CACHE_SIZE, settings.ASSISTANT_CACHE_TTL_SECONDS)
+assistant_batcher = MicroBatcher(response_cache)
+assistant_limiter = ConcurrencyLimiter(settings.ASSISTANT_MAX_CONCURRENT_PER_USER)
+
+metrics.register_gauge("assistant_cache_entries", "Assistant replies cached in this worker", lambda: len(response_cache))
+metrics.register_gauge("assistant_pending_requests", "Distinct assistant requests queued or running on the model", lambda: assistant_batcher.pending)
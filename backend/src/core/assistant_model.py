@@ -0,0 +1,160 @@
+"""
+Model interface behind the AI cooking assistant (/assistant).
+
+A model receives a batch of ModelRequests and returns one ModelReply per
+request, in order: the micro-batcher in core/assistant groups concurrent
+requests into a single `generate` call, so implementations should send the
+batch to the backend in one round trip where it supports that.
+
+ASSISTANT_MODEL selects the implementation: "local" is LocalAssistantModel, a
+deterministic rule-based stand-in (same input, same reply, no network) for
+development and tests; anything else is "package.module:factory", a callable
+returning an AssistantModel, e.g. a client for a hosted LLM.
+"""
+import importlib
+import re
+from typing import List, NamedTuple, Optional
+
+RECIPE, SALVAGE = "recipe", "salvage"
+
+_STOP_WORDS = frozenset(
+    "a about an and are as at be but by can could do for from have how i if in into is it its just me my "
+    "of on or please so some something that the this to too very was what with would you".split()
+)
+
+
+def content_words(text: str) -> List[str]:
+    """Sorted, de-duplicated content words: case, punctuation, word order, stop words and plurals
+    do not change the result, so prompts that only differ in those share a cache entry"""
+    words = set()
+    for word in re.findall(r"[a-z0-9]+", text.casefold()):
+        if word in _STOP_WORDS:
+            continue
+        if len(word) > 4 and word.endswith("ies"):
+            word = word[:-3] + "y"
+        elif len(word) > 4 and word.endswith(("oes", "ches", "shes", "sses", "xes")):
+            word = word[:-2]
+        elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.add(word)
+    return sorted(words)
+
+
+class ModelRequest(NamedTuple):
+    task: str  # RECIPE or SALVAGE
+    prompt: str  # the user's free text
+    context: dict  # catalog data the answer must be grounded in (JSON-serializable)
+
+
+class ModelReply(NamedTuple):
+    text: str
+    recipe_id: Optional[int] = None  # RECIPE: the chosen candidate
+    suggestions: tuple = ()  # SALVAGE: individual fixes
+
+
+class AssistantModel:
+    name = "base"
+
+    def generate(self, requests: List[ModelRequest]) -> List[ModelReply]:
+        raise NotImplementedError
+
+
+# (trigger words, fix for a finished dish, fix while still cooking)
+_SALVAGE_RULES = [
+    ({"salt", "salty"},
+     "Balance the salt with acid (lemon juice or vinegar) and a pinch of sugar, or serve it with unsalted rice, bread or potatoes",
+     "Stop salting and dilute: add unsalted liquid or more of the main ingredients, then taste again before seasoning"),
+    ({"sweet", "sugary"},
+     "Cut the sweetness with acid (lemon, vinegar), a pinch of salt or some heat",
+     "Add more of the unsweetened ingredients and a splash of acid, and hold back the remaining sugar"),
+    ({"spicy", "hot", "burning"},
+     "Tame the heat with dairy (yogurt, sour cream, coconut milk) or a little sugar, and serve it with a starch",
+     "Add more of the base ingredients or a splash of cream or coconut milk before it finishes cooking"),
+    ({"sour", "acidic", "tart", "bitter"},
+     "Round it off with a little sugar or honey and some fat (butter, cream, olive oil)",
+     "For tomato-based sauces, stir in a pinch of baking soda; otherwise add a little sugar and fat as it cooks"),
+    ({"bland", "flavorless", "tasteless", "boring"},
+     "Season in layers: salt first, then acid (lemon, vinegar), then fresh herbs or a drizzle of good oil",
+     "Taste and add salt, aromatics (garlic, onion, spices) and a splash of acid now, while it can still absorb them"),
+    ({"burnt", "burned", "burn", "scorched", "charred"},
+     "Cut away the charred parts and serve with a sauce; strong flavors (lemon, herbs, chili) mask a burnt note",
+     "Take it off the heat and move what is not stuck to a clean pan without scraping the bottom, then lower the heat"),
+    ({"undercooked", "raw", "uncooked", "hard", "crunchy"},
+     "Return it to a low oven or covered pan with a splash of liquid until done; check meat with a thermometer",
+     "Lower the heat, cover and add a splash of liquid so the inside cooks before the outside overcooks"),
+    ({"overcooked", "dry", "tough", "chewy", "rubbery"},
+     "Slice it thin and serve with a sauce, gravy or broth, or turn it into a stew, soup or filling",
+     "Take it off the heat now, add a splash of stock or sauce and rest it covered"),
+    ({"thick", "gluey", "pasty"},
+     "Thin it with warm stock, milk or water, a spoonful at a time",
+     "Stir in warm liquid a little at a time until it loosens"),
+    ({"thin", "watery", "runny"},
+     "Simmer it uncovered to reduce, or thicken with a cornstarch slurry",
+     "Cook it uncovered on higher heat, or stir in a cornstarch slurry (1 tbsp in 2 tbsp cold water)"),
+    ({"greasy", "oily", "fatty"},
+     "Skim the fat off the top or blot with paper towels, and serve with something acidic",
+     "Skim the fat, or chill briefly so it sets and can be lifted off"),
+    ({"curdled", "split", "broken", "separated", "grainy"},
+     "Blend it, or whisk in a spoonful of cold cream or water to bring it back together",
+     "Take it off the heat at once and whisk in an ice cube or a spoonful of cold liquid; keep the heat lower from now on"),
+    ({"lumpy", "lump", "clumpy"},
+     "Strain it through a sieve or blend it smooth",
+     "Whisk vigorously off the heat, or strain it and return it to the pan"),
+]
+
+_GENERIC_FIX = (
+    "Taste and adjust one thing at a time: salt, then acid, then sweetness, then fat",
+    "Lower the heat, taste, and adjust the seasoning in small steps before continuing",
+)
+
+
+class LocalAssistantModel(AssistantModel):
+    """Deterministic stand-in: picks among the catalog candidates by prompt overlap and answers salvage
+    questions from a fixed table of kitchen fixes"""
+    name = "local"
+
+    def generate(self, requests: List[ModelRequest]) -> List[ModelReply]:
+        return [self._recipe(request) if request.task == RECIPE else self._salvage(request) for request in requests]
+
+    @staticmethod
+    def _recipe(request: ModelRequest) -> ModelReply:
+        candidates = request.context.get("candidates", [])
+        if not candidates:
+            return ModelReply("None of our recipes can be made from these ingredients. Try adding a few staples "
+                              "(onion, garlic, eggs, rice) to widen the choice.")
+        wanted = set(content_words(request.prompt))
+        fewest = min(len(candidate["missing"]) for candidate in candidates)
+        best = max(
+            (candidate for candidate in candidates if len(candidate["missing"]) == fewest),
+            key=lambda candidate: (
+                len(wanted.intersection(content_words(f"{candidate['name']} {candidate.get('category') or ''}"))),
+                len(candidate["ingredients"]) - len(candidate["missing"]),
+                -candidate["recipe_id"],
+            ),
+        )
+        used = [name for name in best["ingredients"] if name not in best["missing"]]
+        text = f"Try {best['name']}: it uses your {', '.join(used)}."
+        if best["missing"]:
+            text += f" You would still need {', '.join(best['missing'])}."
+        return ModelReply(text, recipe_id=best["recipe_id"])
+
+    @staticmethod
+    def _salvage(request: ModelRequest) -> ModelReply:
+        words = set(content_words(request.prompt))
+        finished = request.context.get("stage") == "finished"
+        fixes = tuple(
+            finished_fix if finished else cooking_fix
+            for triggers, finished_fix, cooking_fix in _SALVAGE_RULES if triggers & words
+        )[:3] or (_GENERIC_FIX[0] if finished else _GENERIC_FIX[1],)
+        name = request.context.get("recipe", {}).get("name", "your dish")
+        return ModelReply(f"To save {name}: {fixes[0][0].lower()}{fixes[0][1:]}.", suggestions=fixes)
+
+
+def load_model(spec: str) -> AssistantModel:
+    """"local", or "package.module:factory" for a callable returning an AssistantModel"""
+    if spec == "local":
+        return LocalAssistantModel()
+    module_name, _, factory = spec.partition(":")
+    if not factory:
+        raise ValueError(f"ASSISTANT_MODEL must be 'local' or 'package.module:factory', got {spec!r}")
+    return getattr(importlib.import_module(module_name), factory)()
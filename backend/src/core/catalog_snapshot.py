@@ -0,0 +1,456 @@
+"""
+Memory-mapped catalog snapshot shared by all worker processes.
+
+The builder packs recipe ingredient sets, recipe and ingredient names and
+categories into one compact binary file of flat arrays (sorted ids, offsets and
+a single UTF-8 string blob, with categories interned), plus the indexes recipe
+search runs on: ingredient -> recipes and category -> recipes posting lists,
+total times and casefolded names. Every worker maps the
+file read-only, so the pages live once in the OS page cache however many
+workers there are, and a worker that finds an existing file is ready as soon
+as it is mapped.
+
+Rebuilds write a temporary file and `os.replace` it over the old one. Readers
+notice the new inode on their next `get()` (checked at most every
+CATALOG_SNAPSHOT_CHECK_SECONDS) and remap; a reader holding the old snapshot
+keeps a valid mapping until it drops it. A worker that commits recipe or
+ingredient changes (see change_feed) schedules a debounced rebuild in the
+background, and a lock file makes sure only one worker builds at a time.
+
+Settings:
+    CATALOG_SNAPSHOT_PATH            file to build and map ("" disables the snapshot)
+    CATALOG_SNAPSHOT_REBUILD_DELAY   seconds to wait after a catalog write before rebuilding
+    CATALOG_SNAPSHOT_CHECK_SECONDS   how often readers look for a rebuilt file
+"""
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+
+from .change_feed import change_feed
+from .settings import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: builds are not serialized across processes
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"RCATSNAP"
+VERSION = 2
+
+# Section order in the file; typecode "i" is int32, "I" uint32, "B" bytes
+_SECTIONS = (
+    ("ingredient_ids", "i"),              # sorted
+    ("ingredient_name_offsets", "I"),     # n + 1 offsets into strings
+    ("ingredient_categories", "i"),       # index into category_offsets, -1 for none
+    ("recipe_ids", "i"),                  # sorted
+    ("recipe_ingredient_offsets", "I"),   # n + 1 offsets into recipe_ingredient_ids
+    ("recipe_ingredient_ids", "i"),       # sorted within each recipe
+    ("recipe_name_offsets", "I"),         # n + 1 offsets into strings
+    ("recipe_categories", "i"),
+    ("recipe_total_minutes", "i"),        # cook + prep time, -1 when both are unknown
+    ("ingredient_recipe_offsets", "I"),   # n_ingredients + 1 offsets into ingredient_recipes
+    ("ingredient_recipes", "i"),          # positions (not ids) of the recipes using each ingredient, ascending
+    ("category_recipe_offsets", "I"),     # k + 1 offsets into category_recipes
+    ("category_recipes", "i"),            # recipe positions per category, ascending
+    ("recipe_search_offsets", "I"),       # n + 1 offsets into recipe_search_text
+    ("recipe_search_text", "B"),          # casefolded recipe names, each followed by a NUL
+    ("category_offsets", "I"),            # interned categories, k + 1 offsets into strings
+    ("strings", "B"),
+)
+# magic, version, built_at, then (offset, item count) per section
+_HEADER = struct.Struct("<8sId" + "QQ" * len(_SECTIONS))
+
+
+class CatalogSnapshot:
+    """Read-only view of one snapshot file; all lookups read straight from the mapping"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.inode = os.fstat(f.fileno()).st_ino
+        header = _HEADER.unpack_from(self._mmap)
+        magic, version, self.built_at = header[:3]
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} catalog snapshot")
+        view = memoryview(self._mmap)
+        for index, (name, typecode) in enumerate(_SECTIONS):
+            offset, count = header[3 + 2 * index], header[4 + 2 * index]
+            size = count * array(typecode).itemsize
+            setattr(self, f"_{name}", view[offset:offset + size].cast(typecode))
+            if name == "recipe_search_text":
+                self._search_text_start = offset  # searched in place with mmap.find
+        self._category_index = {
+            self._category(index): index for index in range(len(self._category_offsets) - 1)
+        }
+        self.path = path
+        self.size = len(self._mmap)
+
+    @property
+    def recipe_count(self) -> int:
+        return len(self._recipe_ids)
+
+    @property
+    def ingredient_count(self) -> int:
+        return len(self._ingredient_ids)
+
+    def _string(self, offsets, index: int) -> str:
+        return bytes(self._strings[offsets[index]:offsets[index + 1]]).decode("utf-8")
+
+    def _category(self, index: int) -> Optional[str]:
+        return self._string(self._category_offsets, index) if index >= 0 else None
+
+    @staticmethod
+    def _position(ids, key: int) -> int:
+        position = bisect_left(ids, key)
+        return position if position < len(ids) and ids[position] == key else -1
+
+    def ingredient(self, ingredient_id: int) -> Optional[Tuple[str, Optional[str]]]:
+        """(name, category) of an ingredient, or None"""
+        position = self._position(self._ingredient_ids, ingredient_id)
+        if position < 0:
+            return None
+        return (
+            self._string(self._ingredient_name_offsets, position),
+            self._category(self._ingredient_categories[position]),
+        )
+
+    def recipe(self, recipe_id: int) -> Optional[Tuple[str, Optional[str]]]:
+        """(name, category) of a recipe, or None"""
+        position = self._position(self._recipe_ids, recipe_id)
+        if position < 0:
+            return None
+        return self._string(self._recipe_name_offsets, position), self._category(self._recipe_categories[position])
+
+    def recipe_ingredient_ids(self, recipe_id: int):
+        """Sorted ingredient ids of a recipe as a zero-copy int32 view (empty if the recipe is unknown)"""
+        position = self._position(self._recipe_ids, recipe_id)
+        if position < 0:
+            return self._recipe_ingredient_ids[0:0]
+        return self._recipe_ingredient_ids[
+            self._recipe_ingredient_offsets[position]:self._recipe_ingredient_offsets[position + 1]
+        ]
+
+    # Position-based accessors for recipe search: positions index the recipe sections directly
+    # (position order is id order), so filters avoid an id lookup per candidate
+
+    def recipe_position(self, recipe_id: int) -> int:
+        """Position of a recipe in the snapshot, -1 if unknown"""
+        return self._position(self._recipe_ids, recipe_id)
+
+    def recipe_id_at(self, position: int) -> int:
+        return self._recipe_ids[position]
+
+    def ingredient_ids_at(self, position: int):
+        """Sorted ingredient ids of the recipe at `position` (zero-copy view)"""
+        offsets = self._recipe_ingredient_offsets
+        return self._recipe_ingredient_ids[offsets[position]:offsets[position + 1]]
+
+    def total_minutes_at(self, position: int) -> int:
+        """Cook + prep minutes of the recipe at `position`, -1 when neither is known"""
+        return self._recipe_total_minutes[position]
+
+    def recipes_with_ingredient(self, ingredient_id: int):
+        """Ascending positions of the recipes that use an ingredient (zero-copy view)"""
+        position = self._position(self._ingredient_ids, ingredient_id)
+        if position < 0:
+            return self._ingredient_recipes[0:0]
+        offsets = self._ingredient_recipe_offsets
+        return self._ingredient_recipes[offsets[position]:offsets[position + 1]]
+
+    def recipes_in_category(self, category: str):
+        """Ascending positions of the recipes in a category (exact match, zero-copy view)"""
+        index = self._category_index.get(category)
+        if index is None:
+            return self._category_recipes[0:0]
+        offsets = self._category_recipe_offsets
+        return self._category_recipes[offsets[index]:offsets[index + 1]]
+
+    def recipes_matching_name(self, text: str) -> List[int]:
+        """Ascending positions of the recipes whose name contains `text` (case-insensitive),
+        found by scanning the name blob in C with mmap.find"""
+        needle = text.casefold().encode("utf-8")
+        offsets, base = self._recipe_search_offsets, self._search_text_start
+        end = base + offsets[-1]
+        positions = []
+        found = self._mmap.find(needle, base, end)
+        while found >= 0:
+            position = bisect_right(offsets, found - base) - 1
+            positions.append(position)
+            found = self._mmap.find(needle, base + offsets[position + 1], end)
+        return positions
+
+    def name_contains_at(self, position: int, text: str) -> bool:
+        offsets, base = self._recipe_search_offsets, self._search_text_start
+        needle = text.casefold().encode("utf-8")
+        return self._mmap.find(needle, base + offsets[position], base + offsets[position + 1]) >= 0
+
+    # Facet counts over a set of recipe positions; the counting runs in C (Counter over map/views)
+
+    def category_counts(self, positions) -> Dict[str, int]:
+        counts = Counter(map(self._recipe_categories.__getitem__, positions))
+        return {self._category(index): count for index, count in counts.items() if index >= 0}
+
+    def total_minutes_counts(self, positions) -> Counter:
+        """Recipes per total time in minutes (-1 for unknown)"""
+        return Counter(map(self._recipe_total_minutes.__getitem__, positions))
+
+    def ingredient_counts(self, positions) -> Counter:
+        """Recipes per ingredient id"""
+        offsets, ingredient_ids = self._recipe_ingredient_offsets, self._recipe_ingredient_ids
+        if len(positions) == self.recipe_count:
+            return Counter(ingredient_ids)
+        counts = Counter()
+        for position in positions:
+            counts.update(ingredient_ids[offsets[position]:offsets[position + 1]])
+        return counts
+
+    def iter_recipe_ingredients(self) -> Iterator[Tuple[int, memoryview]]:
+        """(recipe_id, sorted ingredient ids) for every recipe, in id order"""
+        offsets, ingredient_ids = self._recipe_ingredient_offsets, self._recipe_ingredient_ids
+        for position, recipe_id in enumerate(self._recipe_ids):
+            yield recipe_id, ingredient_ids[offsets[position]:offsets[position + 1]]
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "built_at": self.built_at,
+            "bytes": self.size,
+            "recipes": self.recipe_count,
+            "ingredients": self.ingredient_count,
+            "recipe_ingredients": len(self._recipe_ingredient_ids),
+            "categories": len(self._category_offsets) - 1,
+        }
+
+
+def _invert(keys, values, key_count: int) -> Tuple[array, array]:
+    """Group `values` by key index (counting sort, -1 keys skipped) into `key_count + 1` offsets
+    and the grouped values; values keep their order within each group"""
+    offsets = array("I", bytes(4 * (key_count + 1)))
+    for key in keys:
+        if key >= 0:
+            offsets[key + 1] += 1
+    for key in range(key_count):
+        offsets[key + 1] += offsets[key]
+    cursor = array("I", offsets[:-1])
+    grouped = array("i", bytes(4 * offsets[-1]))
+    for key, value in zip(keys, values):
+        if key >= 0:
+            grouped[cursor[key]] = value
+            cursor[key] += 1
+    return offsets, grouped
+
+
+def _is_current(path: str) -> bool:
+    """Whether `path` holds a snapshot this version of the code can map"""
+    try:
+        with open(path, "rb") as f:
+            magic, version = struct.unpack("<8sI", f.read(12))
+    except (OSError, struct.error):
+        return False
+    return magic == MAGIC and version == VERSION
+
+
+def build_snapshot(engine: Engine, path: str) -> str:
+    """Read the catalog and write a new snapshot over `path` atomically"""
+    from ..models import Ingredient, Recipe, RecipeIngredient
+
+    # Each kind of string gets its own contiguous pool so `n + 1` offsets delimit every entry;
+    # the pools are concatenated (and their offsets shifted) when the file is written
+    pools = {"ingredient_name_offsets": bytearray(), "recipe_name_offsets": bytearray(), "category_offsets": bytearray()}
+    categories = {}
+    sections = {name: array(typecode) for name, typecode in _SECTIONS if name != "strings"}
+    for name in pools:
+        sections[name].append(0)
+    sections["recipe_ingredient_offsets"].append(0)
+    sections["recipe_search_offsets"].append(0)
+    search_text = bytearray()
+
+    def add_string(section: str, value: str):
+        pools[section].extend(value.encode("utf-8"))
+        sections[section].append(len(pools[section]))
+
+    def intern(category: Optional[str]) -> int:
+        if category is None:
+            return -1
+        if category not in categories:
+            add_string("category_offsets", category)
+            categories[category] = len(categories)
+        return categories[category]
+
+    with engine.connect() as conn:
+        conn = conn.execution_options(stream_results=True, yield_per=10_000)
+        for ingredient_id, name, category in conn.execute(
+            select(Ingredient.id, Ingredient.name, Ingredient.category).order_by(Ingredient.id)
+        ):
+            sections["ingredient_ids"].append(ingredient_id)
+            add_string("ingredient_name_offsets", name)
+            sections["ingredient_categories"].append(intern(category))
+
+        for recipe_id, name, category, cook, prep in conn.execute(
+            select(Recipe.id, Recipe.name, Recipe.category, Recipe.cook_time_in_minutes, Recipe.prep_time_in_minutes)
+            .order_by(Recipe.id)
+        ):
+            sections["recipe_ids"].append(recipe_id)
+            add_string("recipe_name_offsets", name)
+            sections["recipe_categories"].append(intern(category))
+            sections["recipe_total_minutes"].append(-1 if cook is None and prep is None else (cook or 0) + (prep or 0))
+            search_text.extend(name.casefold().encode("utf-8") + b"\0")
+            sections["recipe_search_offsets"].append(len(search_text))
+
+        # Both sides are ordered by recipe id, so the ingredient sets are filled in one merge pass
+        recipe_ids, offsets = sections["recipe_ids"], sections["recipe_ingredient_offsets"]
+        flat = sections["recipe_ingredient_ids"]
+        position = 0
+        for recipe_id, ingredient_id in conn.execute(
+            select(RecipeIngredient.recipe_id, RecipeIngredient.ingredient_id)
+            .order_by(RecipeIngredient.recipe_id, RecipeIngredient.ingredient_id)
+        ):
+            while position < len(recipe_ids) and recipe_ids[position] < recipe_id:
+                offsets.append(len(flat))
+                position += 1
+            if position < len(recipe_ids) and recipe_ids[position] == recipe_id:
+                flat.append(ingredient_id)
+        while len(offsets) <= len(recipe_ids):
+            offsets.append(len(flat))
+
+    sections["recipe_search_text"] = array("B", search_text)
+    ingredient_positions = {ingredient_id: position for position, ingredient_id in enumerate(sections["ingredient_ids"])}
+    sections["ingredient_recipe_offsets"], sections["ingredient_recipes"] = _invert(
+        array("i", (ingredient_positions.get(ingredient_id, -1) for ingredient_id in flat)),
+        array("i", (position for position in range(len(recipe_ids))
+                    for _ in range(offsets[position + 1] - offsets[position]))),
+        len(ingredient_positions),
+    )
+    sections["category_recipe_offsets"], sections["category_recipes"] = _invert(
+        sections["recipe_categories"], array("i", range(len(recipe_ids))), len(categories)
+    )
+
+    strings = bytearray()
+    for name, pool in pools.items():
+        base = len(strings)
+        if base:
+            sections[name] = array("I", (offset + base for offset in sections[name]))
+        strings.extend(pool)
+    sections["strings"] = array("B", strings)
+
+    # Lay the sections out after the header, each 8-byte aligned
+    layout, offset = [], _HEADER.size
+    for name, _ in _SECTIONS:
+        offset += -offset % 8
+        layout.append((offset, len(sections[name])))
+        offset += sections[name].itemsize * len(sections[name])
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    partial = f"{path}.{os.getpid()}.partial"
+    with open(partial, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, time.time(), *[value for pair in layout for value in pair]))
+        for (name, _), (section_offset, _) in zip(_SECTIONS, layout):
+            f.write(b"\0" * (section_offset - f.tell()))
+            sections[name].tofile(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(partial, path)
+    return path
+
+
+class CatalogSnapshotStore:
+    """Holds this worker's mapping of the snapshot file and keeps it current"""
+
+    def __init__(self, path: str, rebuild_delay: float = 2.0, check_interval: float = 1.0):
+        self.path = path
+        self.rebuild_delay = rebuild_delay
+        self.check_interval = check_interval
+        self.engine: Optional[Engine] = None
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._rebuild_timer: Optional[threading.Timer] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def ensure(self, engine: Engine):
+        """Map the snapshot, building it first if no worker has yet (startup)"""
+        self.engine = engine
+        if not self.enabled:
+            return
+        if not _is_current(self.path):
+            self.rebuild(if_missing=True)
+        self.get()
+
+    def get(self) -> Optional[CatalogSnapshot]:
+        """Current snapshot, remapped if the file was replaced since the last check"""
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        if self._snapshot is not None and now - self._checked_at < self.check_interval:
+            return self._snapshot
+        with self._lock:
+            self._checked_at = now
+            try:
+                inode = os.stat(self.path).st_ino
+            except FileNotFoundError:
+                return self._snapshot
+            if self._snapshot is None or self._snapshot.inode != inode:
+                self._snapshot = CatalogSnapshot(self.path)
+        return self._snapshot
+
+    def rebuild(self, if_missing: bool = False) -> Optional[CatalogSnapshot]:
+        """Build a fresh file (serialized across workers by a lock file) and map it.
+        With `if_missing`, workers that waited for another one's startup build just map its file
+        (a missing file or one written by an older version is rebuilt)."""
+        if not self.enabled or self.engine is None:
+            return None
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path + ".lock", "w") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            if if_missing and _is_current(self.path):
+                return self.get()
+            started = time.perf_counter()
+            build_snapshot(self.engine, self.path)
+            logger.info(f"Catalog snapshot rebuilt in {time.perf_counter() - started:.2f}s: {self.path}")
+        self._checked_at = 0.0
+        return self.get()
+
+    def schedule_rebuild(self):
+        """Rebuild once, `rebuild_delay` seconds after the last of a burst of catalog writes"""
+        if not self.enabled or self.engine is None:
+            return
+        with self._lock:
+            if self._rebuild_timer is not None:
+                self._rebuild_timer.cancel()
+            self._rebuild_timer = threading.Timer(self.rebuild_delay, self._rebuild_in_background)
+            self._rebuild_timer.daemon = True
+            self._rebuild_timer.start()
+
+    def _rebuild_in_background(self):
+        try:
+            self.rebuild()
+        except Exception as e:
+            logger.error(f"Catalog snapshot rebuild failed: {e}")
+
+
+catalog_snapshot = CatalogSnapshotStore(
+    settings.CATALOG_SNAPSHOT_PATH,
+    settings.CATALOG_SNAPSHOT_REBUILD_DELAY,
+    settings.CATALOG_SNAPSHOT_CHECK_SECONDS,
+)
+
+
+# The worker that committed the change rebuilds the shared file; the others remap it
+change_feed.subscribe_local(lambda entities, version: catalog_snapshot.schedule_rebuild())
@@ -0,0 +1,218 @@
+"""
+Catalog change feed for cross-worker cache invalidation.
+
+Every transaction that writes to a catalog table (through the ORM, Core or raw
+SQL alike, detected from the statements on its connection) appends one
+`catalog_change` row per entity it touched, inside the same transaction and
+just before it commits. The row id is a monotonically increasing catalog
+version: a change is visible to other workers exactly when the data is.
+
+Each worker polls `catalog_change` for ids above the last version it saw (a
+primary-key range scan that is empty almost every time) and calls the
+subscribers registered with `change_feed.subscribe(callback)` with the set of
+changed entities. Subscribers registered with `subscribe_local` are called
+right after this worker's own commits instead, for work that must happen once
+per change rather than once per worker (rebuilding a shared file).
+
+Ids are allocated when a row is inserted but become visible at commit, and on
+MySQL transactions can commit out of id order: id 11 may be read while id 10
+is still uncommitted. Ids skipped below the version are therefore remembered
+as gaps and re-queried on every poll until they show up or are older than
+CATALOG_CHANGE_GAP_SECONDS (ids of rolled-back transactions never do).
+
+Only writes made in Session transactions are recorded; the bookkeeping of
+connections used directly (engine.begin(), batch jobs) is dropped at their
+commit or rollback so it cannot leak into the next session on that connection.
+
+Entities: "recipe" (recipe, recipe_ingredient, recipe_step) and "ingredient"
+(ingredient, ingredient_substitute). Category lists derive from both.
+
+Settings:
+    CATALOG_CHANGE_POLL_SECONDS      poll interval (0 disables polling)
+    CATALOG_CHANGE_RETENTION_HOURS   age after which feed rows are pruned
+    CATALOG_CHANGE_GAP_SECONDS       how long a skipped id is waited for
+"""
+import logging
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Set
+
+from sqlalchemy import delete, event, func, insert, or_, select
+from sqlalchemy.engine import Engine
+
+from .metrics import metrics
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+TABLE_ENTITIES = {
+    "recipe": "recipe",
+    "recipe_ingredient": "recipe",
+    "recipe_step": "recipe",
+    "ingredient": "ingredient",
+    "ingredient_substitute": "ingredient",
+}
+_WRITE_TARGET = re.compile(r"^\s*(?:INSERT\s+(?:OR\s+\w+\s+)?INTO|UPDATE|DELETE\s+FROM)\s+[`\"\[]?(\w+)", re.IGNORECASE)
+_PRUNE_EVERY_SECONDS = 3600
+_MAX_GAPS = 1000  # skipped ids tracked at once (the newest are kept)
+
+Subscriber = Callable[[Set[str], int], None]
+
+
+def _change_table():
+    from ..models.catalog_change import CatalogChange
+    return CatalogChange.__table__
+
+
+class ChangeFeed:
+    def __init__(self, poll_interval: float, retention_hours: float, gap_seconds: float):
+        self.poll_interval = poll_interval
+        self.retention = timedelta(hours=retention_hours)
+        self.gap_seconds = gap_seconds
+        self.version = 0
+        self._gaps: Dict[int, float] = {}  # id skipped below the version -> when it was first missed
+        self.engine: Optional[Engine] = None
+        self._subscribers: List[Subscriber] = []
+        self._local_subscribers: List[Subscriber] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pruned_at = 0.0
+
+    def subscribe(self, callback: Subscriber):
+        """Call `callback(entities, version)` when any worker commits catalog changes (within one poll interval)"""
+        self._subscribers.append(callback)
+
+    def subscribe_local(self, callback: Subscriber):
+        """Call `callback(entities, version)` right after this worker commits catalog changes"""
+        self._local_subscribers.append(callback)
+
+    def start(self, engine: Engine):
+        """Start from the current version and poll in the background (app startup)"""
+        self.engine = engine
+        with engine.connect() as conn:
+            self.version = conn.execute(select(func.max(_change_table().c.id))).scalar() or 0
+        self._gaps.clear()
+        if self.poll_interval > 0 and (self._thread is None or not self._thread.is_alive()):
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="catalog-change-feed", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def poll(self) -> Set[str]:
+        """Check the feed once; notifies subscribers and returns the entities changed since the last poll"""
+        table = _change_table()
+        condition = table.c.id > self.version
+        if self._gaps:
+            condition = or_(condition, table.c.id.in_(sorted(self._gaps)))
+        with self.engine.connect() as conn:
+            rows = conn.execute(select(table.c.id, table.c.entity).where(condition)).all()
+        self._track_gaps({change_id for change_id, _ in rows})
+        if not rows:
+            return set()
+        entities = {entity for _, entity in rows}
+        self._notify(self._subscribers, entities, self.version)
+        return entities
+
+    def _track_gaps(self, seen: Set[int]):
+        """Advance the version past `seen`, remember the ids it skipped, forget filled and expired gaps"""
+        now = time.monotonic()
+        for change_id in seen:
+            self._gaps.pop(change_id, None)
+        top = max(seen, default=self.version)
+        if top > self.version:
+            for change_id in range(max(self.version + 1, top - _MAX_GAPS), top):
+                if change_id not in seen:
+                    self._gaps[change_id] = now
+            self.version = top
+        for change_id, missed_at in list(self._gaps.items()):
+            if now - missed_at > self.gap_seconds:
+                del self._gaps[change_id]
+        if len(self._gaps) > _MAX_GAPS:
+            for change_id in sorted(self._gaps)[:len(self._gaps) - _MAX_GAPS]:
+                del self._gaps[change_id]
+
+    def changes_since(self, version: int, limit: int) -> List[dict]:
+        table = _change_table()
+        with self.engine.connect() as conn:
+            rows = conn.execute(select(table).where(table.c.id > version).order_by(table.c.id).limit(limit)).all()
+        return [dict(row._mapping) for row in rows]
+
+    def prune(self) -> int:
+        cutoff = datetime.now(timezone.utc) - self.retention
+        with self.engine.begin() as conn:
+            return conn.execute(delete(_change_table()).where(_change_table().c.changed_at < cutoff)).rowcount
+
+    def committed_locally(self, entities: Set[str]):
+        self._notify(self._local_subscribers, entities, self.version)
+
+    def _notify(self, subscribers: List[Subscriber], entities: Set[str], version: int):
+        for callback in subscribers:
+            try:
+                callback(entities, version)
+            except Exception as e:
+                logger.error(f"Catalog change subscriber {callback!r} failed: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll()
+                if time.monotonic() - self._pruned_at > _PRUNE_EVERY_SECONDS:
+                    self._pruned_at = time.monotonic()
+                    self.prune()
+            except Exception as e:
+                logger.warning(f"Catalog change feed poll failed: {e}")
+
+
+change_feed = ChangeFeed(
+    settings.CATALOG_CHANGE_POLL_SECONDS, settings.CATALOG_CHANGE_RETENTION_HOURS, settings.CATALOG_CHANGE_GAP_SECONDS
+)
+metrics.register_gauge("catalog_version", "Latest catalog_change id this worker has seen", lambda: change_feed.version)
+
+
+def install_change_feed(engine, session_factory):
+    """Record catalog writes made through `session_factory` sessions in the feed (idempotent)"""
+    if event.contains(engine, "after_cursor_execute", _after_cursor_execute):
+        return
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "rollback", _forget_connection_writes)
+    event.listen(engine, "commit", _forget_connection_writes)
+    event.listen(session_factory, "before_commit", _before_commit)
+    event.listen(session_factory, "after_commit", _after_commit)
+    event.listen(session_factory, "after_rollback", _forget_session_writes)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    match = _WRITE_TARGET.match(statement)
+    if match:
+        entity = TABLE_ENTITIES.get(match.group(1).lower())
+        if entity:
+            conn.info.setdefault("catalog_entities", set()).add(entity)
+
+
+def _forget_connection_writes(conn):
+    conn.info.pop("catalog_entities", None)
+
+
+def _before_commit(session):
+    if not session.in_transaction():
+        return
+    session.flush()  # pending ORM writes must hit the connection before we look at it
+    conn = session.connection()
+    entities = conn.info.pop("catalog_entities", None)
+    if entities:
+        conn.execute(insert(_change_table()), [{"entity": entity} for entity in sorted(entities)])
+        session.info["catalog_entities"] = entities
+
+
+def _after_commit(session):
+    entities = session.info.pop("catalog_entities", None)
+    if entities:
+        change_feed.committed_locally(entities)
+
+
+def _forget_session_writes(session):
+    session.info.pop("catalog_entities", None)
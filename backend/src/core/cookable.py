@@ -0,0 +1,308 @@
+"""
+Precomputed "what can I cook" lists, behind GET /users/{id}/cookable.
+
+For every user, `user_recipe_match` holds the top COOKABLE_TOP_N recipes they
+can make from their pantry, or nearly make (at most COOKABLE_MAX_MISSING
+ingredients short), ranked by ingredients missing, then by the share of the
+recipe's ingredients on hand. A home screen is then one primary-key range read.
+
+The batch job holds the catalog as bitsets over the recipes (bit i = the i-th
+recipe by id): one per ingredient, from the `recipe_ingredient` postings, and
+one per ingredient count, from `recipe_summary`. A pantry is summed into
+bit-sliced counters (plane j holds bit j of every recipe's matched count), so
+each pantry ingredient costs a few int operations over the whole catalog
+instead of a step per recipe using it; the recipes `missing` short are then
+read off with one mask per recipe size, fewest missing first, stopping at
+COOKABLE_TOP_N. Memory is one bit per recipe and ingredient (~30 MB for 100k
+recipes x 2,500 ingredients).
+
+Writes that change a result only queue the affected ids in
+`user_recipe_match_queue`, in the same transaction:
+
+    UserPantryRepository.create / delete, user delete      queue_users
+    RecipeRepository.create / delete                       queue_recipes
+    ingredient delete                                      both (its recipes and the pantries holding it)
+
+`refresh_pending` drains the queue and recomputes only the users involved: the
+queued ones, those holding an ingredient of a queued recipe, and those whose
+list shows a queued (deleted) recipe. It reads the postings of the ingredients
+in those users' pantries only, plus each recipe's ingredient count. Quantities are not compared, so pantry
+quantity updates and recipe edits (which do not touch ingredients) queue nothing.
+
+Settings:
+    COOKABLE_TOP_N              recipes kept per user
+    COOKABLE_MAX_MISSING        ingredients a near-makeable recipe may lack
+    COOKABLE_REFRESH_SECONDS    interval for refresh_pending on a background thread (0 = off; set on one worker)
+
+Usage (from the backend/ directory):
+    python -m src.core.cookable                 # full rebuild
+    python -m src.core.cookable --pending       # apply the queued changes (e.g. every minute from cron)
+    python -m src.core.cookable --database-url mysql+mysqlconnector://...
+"""
+import argparse
+import logging
+import time
+from collections import defaultdict
+from itertools import chain, groupby
+from operator import itemgetter
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import create_engine, delete, exists, func, insert, select
+from sqlalchemy.engine import Engine
+
+from .jobs import BackgroundJob
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+_CHUNK = 500  # ids per IN list
+
+
+def _tables():
+    from ..models import RecipeIngredient, RecipeSummary, UserPantry, UserRecipeMatch, UserRecipeMatchQueue
+    return (
+        UserRecipeMatch.__table__, UserRecipeMatchQueue.__table__,
+        RecipeSummary.__table__, UserPantry.__table__, RecipeIngredient.__table__,
+    )
+
+
+def _chunks(ids: List[int]):
+    for start in range(0, len(ids), _CHUNK):
+        yield ids[start:start + _CHUNK]
+
+
+def queue_users(conn, user_ids: Iterable[int]):
+    """Mark users whose pantry changed (call inside the writing transaction)"""
+    queue = _tables()[1]
+    rows = [{"user_id": user_id, "recipe_id": None} for user_id in sorted(set(user_ids))]
+    if rows:
+        conn.execute(insert(queue), rows)
+
+
+def queue_recipes(conn, recipe_ids: Iterable[int]):
+    """Mark recipes added, deleted or whose ingredients changed (call inside the writing transaction)"""
+    queue = _tables()[1]
+    rows = [{"user_id": None, "recipe_id": recipe_id} for recipe_id in sorted(set(recipe_ids))]
+    if rows:
+        conn.execute(insert(queue), rows)
+
+
+def pending_changes(conn) -> int:
+    return conn.execute(select(func.count()).select_from(_tables()[1])).scalar()
+
+
+class _Catalog(NamedTuple):
+    recipe_ids: List[int]  # recipe at each bit position, by id
+    sizes: List[int]  # ingredient count at each bit position
+    by_size: Dict[int, int]  # ingredient count -> bitset of the recipes with that many
+    by_ingredient: Dict[int, int]  # ingredient id -> bitset of the recipes using it
+
+
+def _bitset(positions: List[int], length: int) -> int:
+    bits = bytearray(length // 8 + 1)
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _catalog(conn, ingredient_ids: Optional[List[int]] = None) -> _Catalog:
+    """The recipe bitsets, with postings for `ingredient_ids` only when given"""
+    _, _, summary, _, recipe_ingredient = _tables()
+    recipe_ids, sizes = [], []
+    for recipe_id, size in conn.execute(
+        select(summary.c.recipe_id, summary.c.ingredient_count).order_by(summary.c.recipe_id)
+    ):
+        recipe_ids.append(recipe_id)
+        sizes.append(size)
+    positions = {recipe_id: position for position, recipe_id in enumerate(recipe_ids)}
+    by_size = defaultdict(list)
+    for position, size in enumerate(sizes):
+        by_size[size].append(position)
+
+    postings = defaultdict(list)
+    query = select(recipe_ingredient.c.ingredient_id, recipe_ingredient.c.recipe_id)
+    for chunk in _chunks(ingredient_ids) if ingredient_ids is not None else [None]:
+        rows = conn.execute(query if chunk is None else query.where(recipe_ingredient.c.ingredient_id.in_(chunk)))
+        for ingredient_id, recipe_id in rows:
+            position = positions.get(recipe_id)
+            if position is not None:
+                postings[ingredient_id].append(position)
+    length = len(recipe_ids)
+    return _Catalog(
+        recipe_ids, sizes,
+        {size: _bitset(members, length) for size, members in by_size.items()},
+        {ingredient_id: _bitset(members, length) for ingredient_id, members in postings.items()},
+    )
+
+
+def _matches(user_id: int, pantry: List[int], catalog: _Catalog, top_n: int, max_missing: int) -> List[dict]:
+    """One user's ranked rows: recipes with at least one ingredient on hand and at most `max_missing` lacking"""
+    # planes[j] = bit j of every recipe's matched-ingredient count (ripple-carry add of each ingredient)
+    planes: List[int] = []
+    for ingredient_id in pantry:
+        carry = catalog.by_ingredient.get(ingredient_id, 0)
+        for j, plane in enumerate(planes):
+            if not carry:
+                break
+            planes[j], carry = plane ^ carry, plane & carry
+        if carry:
+            planes.append(carry)
+    touched = 0
+    for plane in planes:
+        touched |= plane
+
+    rows = []
+    for missing in range(max_missing + 1):
+        # Recipes of `size` ingredients missing `missing` have matched == size - missing: compare the planes
+        by_share = defaultdict(int)
+        for size, recipes in catalog.by_size.items():
+            matched = size - missing
+            if matched < 1 or matched >> len(planes):
+                continue
+            found = recipes & touched
+            for j, plane in enumerate(planes):
+                if not found:
+                    break
+                found &= plane if matched >> j & 1 else ~plane
+            if found:
+                by_share[matched / size] |= found
+        # Highest share of the recipe on hand first, then by id (bit order)
+        for share in sorted(by_share, reverse=True):
+            found = by_share[share]
+            while found and len(rows) < top_n:
+                lowest = found & -found
+                found ^= lowest
+                position = lowest.bit_length() - 1
+                rows.append({
+                    "user_id": user_id, "rank": len(rows), "recipe_id": catalog.recipe_ids[position],
+                    "matched": catalog.sizes[position] - missing, "missing": missing,
+                    "match_percentage": round(share * 100, 1),
+                })
+            if len(rows) >= top_n:
+                return rows
+    return rows
+
+
+def _pantries(conn, user_ids: List[int]) -> Dict[int, List[int]]:
+    pantry = _tables()[3]
+    pantries = {user_id: [] for user_id in user_ids}
+    for chunk in _chunks(user_ids):
+        for user_id, ingredient_id in conn.execute(
+            select(pantry.c.user_id, pantry.c.ingredient_id).where(pantry.c.user_id.in_(chunk))
+        ):
+            pantries[user_id].append(ingredient_id)
+    return pantries
+
+
+def _affected_users(conn, user_ids: set, recipe_ids: List[int]) -> List[int]:
+    """Queued users plus everyone a queued recipe can enter or leave the list of"""
+    match, _, summary, pantry, _ = _tables()
+    users = set(user_ids)
+    for chunk in _chunks(recipe_ids):
+        users.update(conn.execute(select(match.c.user_id).where(match.c.recipe_id.in_(chunk)).distinct()).scalars())
+        ingredient_ids = sorted(set(chain.from_iterable(conn.execute(
+            select(summary.c.ingredient_ids).where(summary.c.recipe_id.in_(chunk))
+        ).scalars())))
+        for ingredients in _chunks(ingredient_ids):
+            users.update(conn.execute(
+                select(pantry.c.user_id).where(pantry.c.ingredient_id.in_(ingredients)).distinct()
+            ).scalars())
+    return sorted(users)
+
+
+def refresh_pending(engine: Engine, top_n: Optional[int] = None, max_missing: Optional[int] = None) -> dict:
+    """Recompute the lists of the users affected by the queued changes, then drop those queue rows"""
+    match, queue, _, _, _ = _tables()
+    top_n = top_n or settings.COOKABLE_TOP_N
+    max_missing = settings.COOKABLE_MAX_MISSING if max_missing is None else max_missing
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        queued = conn.execute(select(queue.c.id, queue.c.user_id, queue.c.recipe_id).order_by(queue.c.id)).all()
+        if not queued:
+            return {"changes": 0, "users": 0, "rows": 0, "seconds": round(time.perf_counter() - started, 3)}
+        user_ids = _affected_users(
+            conn,
+            {user_id for _, user_id, _ in queued if user_id is not None},
+            sorted({recipe_id for _, _, recipe_id in queued if recipe_id is not None}),
+        )
+        pantries = _pantries(conn, user_ids)
+        # Postings of the ingredients these pantries hold only, not the whole catalog
+        catalog = _catalog(conn, sorted(set(chain.from_iterable(pantries.values()))))
+        rows = []
+        for user_id, ingredient_ids in pantries.items():
+            rows.extend(_matches(user_id, ingredient_ids, catalog, top_n, max_missing))
+        for chunk in _chunks(user_ids):
+            conn.execute(delete(match).where(match.c.user_id.in_(chunk)))
+        if rows:
+            conn.execute(insert(match), rows)
+        for chunk in _chunks([queue_id for queue_id, _, _ in queued]):
+            conn.execute(delete(queue).where(queue.c.id.in_(chunk)))
+    return {"changes": len(queued), "users": len(user_ids), "rows": len(rows),
+            "seconds": round(time.perf_counter() - started, 3)}
+
+
+def rebuild_all(engine: Engine, top_n: Optional[int] = None, max_missing: Optional[int] = None,
+                batch_size: int = 10000) -> dict:
+    """Recompute every user's list in one transaction (the queued changes up to now are included)"""
+    match, queue, _, pantry, _ = _tables()
+    top_n = top_n or settings.COOKABLE_TOP_N
+    max_missing = settings.COOKABLE_MAX_MISSING if max_missing is None else max_missing
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        last_queued = conn.execute(select(func.max(queue.c.id))).scalar()
+        catalog = _catalog(conn)
+        pantries = conn.execute(
+            select(pantry.c.user_id, pantry.c.ingredient_id).order_by(pantry.c.user_id)
+        ).all()
+
+        conn.execute(delete(match))
+        pending = []
+        users = rows = 0
+        for user_id, group in groupby(pantries, key=itemgetter(0)):
+            users += 1
+            pending.extend(_matches(user_id, [ingredient_id for _, ingredient_id in group], catalog, top_n, max_missing))
+            if len(pending) >= batch_size:
+                conn.execute(insert(match), pending)
+                rows += len(pending)
+                pending = []
+        if pending:
+            conn.execute(insert(match), pending)
+            rows += len(pending)
+        changes = conn.execute(delete(queue).where(queue.c.id <= last_queued)).rowcount if last_queued is not None else 0
+    return {"changes": changes, "users": users, "rows": rows, "seconds": round(time.perf_counter() - started, 3)}
+
+
+def ensure_cookable(engine: Engine):
+    """Build the lists at startup if they are empty while there are pantries"""
+    match, _, _, pantry, _ = _tables()
+    with engine.connect() as conn:
+        missing = conn.execute(select(exists().select_from(pantry))).scalar() and not conn.execute(
+            select(exists().select_from(match))
+        ).scalar()
+    if missing:
+        stats = rebuild_all(engine)
+        logger.info(f"Cookable recipes built: {stats['rows']} rows for {stats['users']} users in {stats['seconds']}s")
+
+
+cookable_job = BackgroundJob("cookable", refresh_pending)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute the recipes every user can cook from their pantry")
+    parser.add_argument("--pending", action="store_true", help="Only apply the queued pantry and recipe changes")
+    parser.add_argument("--top-n", type=int, default=settings.COOKABLE_TOP_N, help="Recipes kept per user")
+    parser.add_argument("--max-missing", type=int, default=settings.COOKABLE_MAX_MISSING,
+                        help="Ingredients a near-makeable recipe may lack")
+    parser.add_argument("--database-url", default=None, help="Database to update (defaults to the configured one)")
+    args = parser.parse_args(argv)
+
+    from .. import models  # noqa: F401  (registers the tables)
+    engine = create_engine(args.database_url or settings.database_url)
+    job = refresh_pending if args.pending else rebuild_all
+    stats = job(engine, args.top_n, args.max_missing)
+    print(f"Stored {stats['rows']} cookable recipes for {stats['users']} users "
+          f"({stats['changes']} queued changes) in {stats['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
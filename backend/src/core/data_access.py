@@ -0,0 +1,54 @@
+"""
+Data-access strategy selection.
+
+Each service can read and write through the ORM (repositories), SQLAlchemy
+Core expressions or raw `text()` SQL. The strategy is picked per service from
+settings so the fastest path per endpoint can be chosen from benchmark data
+(see benchmarks/data_access.py):
+
+    DATA_ACCESS_STRATEGY=core                        # every service
+    DATA_ACCESS_STRATEGIES=ingredient=raw,recipe=orm # per-service overrides
+"""
+from enum import Enum
+from functools import lru_cache
+from typing import Dict, Optional
+from .settings import settings
+
+
+class DataAccessStrategy(str, Enum):
+    orm = "orm"
+    core = "core"
+    raw = "raw"
+
+
+@lru_cache(maxsize=8)
+def _parse_overrides(raw: str) -> Dict[str, DataAccessStrategy]:
+    overrides = {}
+    for item in raw.split(","):
+        if not item.strip():
+            continue
+        service, _, value = item.partition("=")
+        try:
+            overrides[service.strip().lower()] = DataAccessStrategy(value.strip().lower())
+        except ValueError:
+            raise ValueError(f"Invalid data access strategy '{value}' for service '{service}' in DATA_ACCESS_STRATEGIES")
+    return overrides
+
+
+def resolve_strategy(service: str, default: DataAccessStrategy,
+                     override: Optional[DataAccessStrategy] = None) -> DataAccessStrategy:
+    """Pick the strategy for a service: explicit override > per-service setting > global setting > service default"""
+    if override is not None:
+        return DataAccessStrategy(override)
+    per_service = _parse_overrides(settings.DATA_ACCESS_STRATEGIES)
+    if service in per_service:
+        return per_service[service]
+    if settings.DATA_ACCESS_STRATEGY:
+        return DataAccessStrategy(settings.DATA_ACCESS_STRATEGY.lower())
+    return default
+
+
+def like_contains(value: str) -> str:
+    """`%value%` for raw SQL `LIKE ... ESCAPE '/'`, with the wildcards in `value` matched literally
+    (what `icontains(..., autoescape=True)` does for the ORM and Core strategies)"""
+    return "%" + value.replace("/", "//").replace("%", "/%").replace("_", "/_") + "%"
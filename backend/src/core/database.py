@@ -1,7 +1,12 @@
-from sqlalchemy import create_engine, inspect
+from sqlalchemy import create_engine, event, inspect
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from src.core.settings import settings
+from src.core.query_counter import install_query_counter
+from src.core.slow_query import install_slow_query_log
+from src.core.tracing import install_sql_tracing
+from src.core.change_feed import install_change_feed
+from src.core.recipe_similarity import install_similarity_index
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,10 +14,23 @@ logger = logging.getLogger(__name__)
 # Create Base class for models
 Base = declarative_base()
 
+def _sqlite_wal(dbapi_connection, connection_record):
+    # Readers (other workers' requests and startup) keep going while a long write transaction,
+    # such as a derived table build, is open; the default rollback journal locks them out
+    dbapi_connection.execute("PRAGMA journal_mode=WAL")
+
+
 try:
     engine = create_engine(settings.database_url)
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _sqlite_wal)
+    install_query_counter(engine)
+    install_slow_query_log(engine)
+    install_sql_tracing(engine)
     # Test connection and table existence
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    install_change_feed(engine, SessionLocal)
+    install_similarity_index(SessionLocal)
     logger.info("Database engine and session initialized successfully")
 except Exception as e:
     logger.error(f"Failed to initialize database: {e}")
@@ -0,0 +1,39 @@
+"""
+Sparse fieldsets: `?fields=id,name,category` on list and detail endpoints.
+
+Only top-level fields of the response schema can be selected; unknown names are
+a 400 so typos do not silently return empty objects.
+"""
+from typing import Iterable, List, Optional, Type, Union
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[List[str]]:
+    """Requested field names in the schema's declaration order, or None for all fields"""
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(schema.model_fields)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(schema.model_fields)}",
+        )
+    return [name for name in schema.model_fields if name in requested]
+
+
+def project(item: Union[BaseModel, dict], fields: Optional[List[str]]):
+    """Keep only the selected fields of one schema instance or dict of the same shape (as a dict),
+    or the item itself"""
+    if fields is None:
+        return item
+    if isinstance(item, dict):
+        return {name: item[name] for name in fields}
+    return {name: getattr(item, name) for name in fields}
+
+
+def project_all(items: Iterable[Union[BaseModel, dict]], fields: Optional[List[str]]):
+    if fields is None:
+        return list(items)
+    return [project(item, fields) for item in items]
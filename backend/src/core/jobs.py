@@ -0,0 +1,91 @@
+"""
+Background batch jobs run on a daemon thread of the worker.
+
+A job is a function of the engine that returns a stats dict. Runs never
+overlap: `trigger` starts one now (admin endpoints) and fails with JobBusy
+while another is in progress, `start` repeats the job every `interval` seconds
+(skipping a tick while a run is still going). The last stats and error are kept
+for the admin status endpoints.
+
+`host_lock` serializes work across the worker processes of a host with a lock
+file in JOB_LOCK_DIR, as the catalog snapshot build does.
+"""
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from sqlalchemy.engine import Engine
+
+from .settings import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: not serialized across processes
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[Engine], dict]
+
+
+class JobBusy(Exception):
+    """Raised when a job is triggered while it is already running"""
+
+
+@contextmanager
+def host_lock(name: str):
+    """Hold JOB_LOCK_DIR/<name>.lock exclusively, waiting for the worker that holds it"""
+    os.makedirs(settings.JOB_LOCK_DIR or ".", exist_ok=True)
+    with open(os.path.join(settings.JOB_LOCK_DIR, f"{name}.lock"), "w") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+
+class BackgroundJob:
+    def __init__(self, name: str, job: Job):
+        self.name = name
+        self.job = job
+        self.last_run: Optional[dict] = None
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def trigger(self, engine: Engine, job: Optional[Job] = None):
+        """Run `job` (default: the periodic one) now, in the background"""
+        if not self._lock.acquire(blocking=False):
+            raise JobBusy(f"{self.name} is already running")
+        threading.Thread(target=self._run, args=(engine, job or self.job), name=self.name, daemon=True).start()
+
+    def start(self, engine: Engine, interval: float):
+        """Repeat the job every `interval` seconds (no-op when interval <= 0 or already started)"""
+        if interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, args=(engine, interval), name=f"{self.name}-periodic", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self, engine: Engine, interval: float):
+        while not self._stop.wait(interval):
+            if self._lock.acquire(blocking=False):
+                self._run(engine, self.job)
+
+    def _run(self, engine: Engine, job: Job):
+        try:
+            self.last_run = job(engine)
+            self.last_error = None
+        except Exception as e:
+            logger.exception(f"Background job {self.name} failed")
+            self.last_error = str(e)
+        finally:
+            self._lock.release()
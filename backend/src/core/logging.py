@@ -1,8 +1,11 @@
+import json
 import logging
 import logging.handlers
-import os
+import queue
+import random
 from pathlib import Path
 from .settings import settings
+from .metrics import metrics
 from . import strings
 
 # Define the logs directory in the main project directory (backend/logs/)
@@ -21,33 +24,112 @@ LOG_FORMAT = logging.Formatter(
     "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line (enabled with LOG_JSON=true)"""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "logger": record.name,
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DebugSampler(logging.Filter):
+    """Keep only a fraction of DEBUG records (LOG_DEBUG_SAMPLE_RATE); other levels always pass"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno != logging.DEBUG or self.rate >= 1 or random.random() < self.rate
+
+
+class LevelFileFilter(logging.Filter):
+    """Records for one level's file: everything from its `app.<level>` logger, plus module loggers'
+    records (logging.getLogger(__name__)) of exactly that level"""
+
+    def __init__(self, name: str, level: int):
+        super().__init__(name)
+        self.level = level
+
+    def filter(self, record):
+        if record.name.startswith("app."):
+            return super().filter(record)
+        return record.levelno == self.level
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the background listener without blocking.
+
+    When the queue is full the record is dropped and counted
+    (`log_records_dropped_total` on /metrics) instead of stalling the request.
+    """
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.increment("log_records_dropped")
+
+    def prepare(self, record):
+        # Only merge the message arguments here; timestamps and formatting happen on the listener thread
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+# Shared by every app logger; formatting and file I/O (including rotation) run on the listener thread
+log_queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+queue_handler = BoundedQueueHandler(log_queue)
+queue_handler.addFilter(DebugSampler(settings.LOG_DEBUG_SAMPLE_RATE))
+
+_formatter = JsonFormatter() if settings.LOG_JSON else LOG_FORMAT
+_listener_handlers = []
+_listener = None
+
+
 def setup_logger(name, log_file, level):
     """
-    Set up a logger with a RotatingFileHandler.
-    
+    Set up a logger whose records are written to a rotating file by the background listener.
+
     Args:
         name (str): Logger name (usually module name).
         log_file (Path): Path to the log file.
         level (int): Logging level (e.g., logging.DEBUG).
-    
+
     Returns:
         logging.Logger: Configured logger instance.
     """
     logger = logging.getLogger(name)
     logger.setLevel(level)
-    
-    # Create RotatingFileHandler: 1MB per file
+    logger.propagate = False
+
+    # Create RotatingFileHandler: 1MB per file, only fed records from this logger
     handler = logging.handlers.RotatingFileHandler(
         log_file,
         maxBytes=1_000_000,  # 1MB
         backupCount=2
     )
-    handler.setFormatter(LOG_FORMAT)
-    
+    handler.setFormatter(_formatter)
+    handler.addFilter(LevelFileFilter(name, level))
+    _listener_handlers.append(handler)
+
     # Clear any existing handlers to avoid duplicates
     logger.handlers = []
-    logger.addHandler(handler)
-    
+    logger.addHandler(queue_handler)
+
     return logger
 
 # Initialize loggers for each level
@@ -57,12 +139,31 @@ warning_logger = setup_logger("app.warning", WARNING_LOG, logging.WARNING)
 error_logger = setup_logger("app.error", ERROR_LOG, logging.ERROR)
 critical_logger = setup_logger("app.critical", CRITICAL_LOG, logging.CRITICAL)
 
+# Module loggers (`src.*`, via logging.getLogger(__name__)) and library warnings reach the root
+# logger; it feeds the same queue, and the listener routes them to the level files
+logging.getLogger("src").setLevel(logging.DEBUG if settings.DEBUG else logging.INFO)
+logging.getLogger().addHandler(queue_handler)
+
 # Optional: Add a console handler for debugging in development
 if settings.DEBUG:
     console_handler = logging.StreamHandler()
-    console_handler.setFormatter(LOG_FORMAT)
-    debug_logger.addHandler(console_handler)
-    info_logger.addHandler(console_handler)
-    warning_logger.addHandler(console_handler)
-    error_logger.addHandler(console_handler)
-    critical_logger.addHandler(console_handler)
\ No newline at end of file
+    console_handler.setFormatter(_formatter)
+    _listener_handlers.append(console_handler)
+
+metrics.register_gauge("log_queue_depth", "Log records waiting for the background writer", log_queue.qsize)
+
+
+def start_logging():
+    """Start the background writer thread (idempotent); records queued before this are written then"""
+    global _listener
+    if _listener is None:
+        _listener = logging.handlers.QueueListener(log_queue, *_listener_handlers, respect_handler_level=True)
+        _listener.start()
+
+
+def stop_logging():
+    """Flush the queue and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
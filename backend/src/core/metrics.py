@@ -0,0 +1,222 @@
+"""
+Prometheus-style metrics for the `/metrics` endpoint.
+
+Every thread records into its own shard (plain dicts reached through a
+thread-local), so the hot path takes no lock and never contends with other
+threads; shards are only summed when `/metrics` is scraped. A scrape may read a
+shard while its owner is writing to it, which at worst makes one sample lag by
+a single observation.
+
+Counters are per process: when running several uvicorn workers, each worker
+serves its own numbers, and a scrape through the load balancer reaches any one
+of them. Every sample therefore carries a `worker` label (the process id), so
+each series stays monotonic and belongs to one process; aggregate across
+workers in the query, e.g. `sum without (worker) (rate(http_requests_total[5m]))`.
+A restarted worker starts new series, which `rate()` handles like any reset.
+"""
+import bisect
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Label used for requests that matched no route, so unknown paths cannot blow up cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Shard:
+    """Counters owned and written by a single thread"""
+
+    __slots__ = ("requests", "latency", "in_flight", "cache", "counters")
+
+    def __init__(self):
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        # (method, route) -> [bucket counts..., +Inf count, sum]
+        self.latency: Dict[Tuple[str, str], List[float]] = {}
+        self.in_flight = 0
+        self.cache: Dict[Tuple[str, str], int] = {}
+        self.counters: Dict[str, int] = {}
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._register_lock = threading.Lock()  # taken once per thread, on its first observation
+        self._gauges = {}
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard()
+            with self._register_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def request_started(self):
+        self._shard().in_flight += 1
+
+    def request_finished(self, method: str, route: str, status: int, elapsed: float):
+        shard = self._shard()
+        shard.in_flight -= 1
+        key = (method, route, status)
+        shard.requests[key] = shard.requests.get(key, 0) + 1
+
+        series = shard.latency.get((method, route))
+        if series is None:
+            series = shard.latency[(method, route)] = [0] * (len(LATENCY_BUCKETS) + 2)
+        series[bisect.bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+        series[-1] += elapsed
+
+    def record_cache(self, cache: str, hit: bool):
+        """Count a lookup against a named in-process cache"""
+        shard = self._shard()
+        key = (cache, "hit" if hit else "miss")
+        shard.cache[key] = shard.cache.get(key, 0) + 1
+
+    def increment(self, name: str, amount: int = 1):
+        """Bump a free-form counter (exported as `<name>_total`)"""
+        shard = self._shard()
+        shard.counters[name] = shard.counters.get(name, 0) + amount
+
+    def register_gauge(self, name: str, help_text: str, read):
+        """Export a value computed at scrape time; `read()` returns a number or {labels tuple: number}"""
+        self._gauges[name] = (help_text, read)
+
+    def render(self) -> str:
+        """Aggregate every shard into the Prometheus text exposition format"""
+        requests: Dict[Tuple[str, str, int], int] = {}
+        latency: Dict[Tuple[str, str], List[float]] = {}
+        cache: Dict[Tuple[str, str], int] = {}
+        counters: Dict[str, int] = {}
+        in_flight = 0
+        worker = f'worker="{os.getpid()}"'
+        for shard in list(self._shards):
+            in_flight += shard.in_flight
+            for key, value in list(shard.requests.items()):
+                requests[key] = requests.get(key, 0) + value
+            for key, series in list(shard.latency.items()):
+                total = latency.setdefault(key, [0] * len(series))
+                for i, value in enumerate(list(series)):
+                    total[i] += value
+            for key, value in list(shard.cache.items()):
+                cache[key] = cache.get(key, 0) + value
+            for key, value in list(shard.counters.items()):
+                counters[key] = counters.get(key, 0) + value
+
+        lines = [
+            "# HELP http_requests_total HTTP requests by route template and status code",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), value in sorted(requests.items()):
+            lines.append(f'http_requests_total{{{worker},method="{method}",route="{_escape(route)}",status="{status}"}} {value}')
+
+        lines += [
+            "# HELP http_request_duration_seconds HTTP request latency by route template",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), series in sorted(latency.items()):
+            labels = f'{worker},method="{method}",route="{_escape(route)}"'
+            cumulative = 0
+            for bound, value in zip(LATENCY_BUCKETS + ("+Inf",), series[:-1]):
+                cumulative += value
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {int(cumulative)}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {series[-1]:.6f}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {int(cumulative)}")
+
+        lines += [
+            "# HELP http_requests_in_flight HTTP requests currently being served",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight{{{worker}}} {in_flight}",
+            "# HELP cache_requests_total In-process cache lookups by result",
+            "# TYPE cache_requests_total counter",
+        ]
+        for (name, result), value in sorted(cache.items()):
+            lines.append(f'cache_requests_total{{{worker},cache="{_escape(name)}",result="{result}"}} {value}')
+        hit_rates = {}
+        for (name, result), value in cache.items():
+            hits, total = hit_rates.get(name, (0, 0))
+            hit_rates[name] = (hits + (value if result == "hit" else 0), total + value)
+        lines += [
+            "# HELP cache_hit_ratio Share of cache lookups that were hits",
+            "# TYPE cache_hit_ratio gauge",
+        ]
+        for name, (hits, total) in sorted(hit_rates.items()):
+            lines.append(f'cache_hit_ratio{{{worker},cache="{_escape(name)}"}} {hits / total:.6f}')
+
+        for name, value in sorted(counters.items()):
+            lines += [f"# TYPE {name}_total counter", f"{name}_total{{{worker}}} {value}"]
+
+        for name, (help_text, read) in sorted(self._gauges.items()):
+            value = read()
+            if value is None:
+                continue
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            if isinstance(value, dict):
+                for labels, sample in sorted(value.items()):
+                    rendered = ",".join([worker] + [f'{k}="{_escape(str(v))}"' for k, v in labels])
+                    lines.append(f"{name}{{{rendered}}} {sample}")
+            else:
+                lines.append(f"{name}{{{worker}}} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = MetricsRegistry()
+
+
+def register_pool_gauges(engine):
+    """Export connection pool utilization (pools without these counters, e.g. SQLite's, are skipped)"""
+    pool = engine.pool
+
+    def read(attribute):
+        method = getattr(pool, attribute, None)
+        return method() if callable(method) else None
+
+    metrics.register_gauge("db_pool_size", "Configured connection pool size", lambda: read("size"))
+    metrics.register_gauge("db_pool_checked_out", "Connections currently checked out of the pool", lambda: read("checkedout"))
+    metrics.register_gauge("db_pool_checked_in", "Idle connections in the pool", lambda: read("checkedin"))
+    metrics.register_gauge("db_pool_overflow", "Connections opened beyond the pool size", lambda: read("overflow"))
+
+
+class MetricsMiddleware:
+    """ASGI middleware: request counts, latency histograms and in-flight gauge per route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status: Optional[int] = None
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics.request_started()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope; label by its template, not the raw path
+            route = scope.get("route")
+            metrics.request_finished(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status or 500,
+                time.perf_counter() - started,
+            )
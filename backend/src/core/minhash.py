@@ -0,0 +1,70 @@
+"""
+MinHash signatures and LSH band keys for integer sets (recipe ingredient sets).
+
+A signature holds, for each of `num_perm` universal hash functions
+`(a * x + b) mod p`, the minimum over the set; two sets agree on a position
+with probability equal to their Jaccard similarity. The signature is cut into
+`bands` bands of `num_perm // bands` rows and each band is hashed to a 64-bit
+bucket key: sets sharing any key are candidates, which happens with
+probability `1 - (1 - J ** rows) ** bands` (an S-curve around
+`(1 / bands) ** (1 / rows)`).
+
+Hash parameters come from a fixed seed and keys from blake2b, so signatures
+and keys are identical across processes and restarts and can be stored.
+"""
+import hashlib
+import random
+import struct
+from typing import Iterable, List, Sequence
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = 96, bands: int = 32, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = random.Random(seed)
+        self._params = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+        self._cache = {}
+
+    @property
+    def threshold(self) -> float:
+        """Approximate Jaccard similarity at which sets become likely candidates"""
+        return (1 / self.bands) ** (1 / self.rows)
+
+    def signature(self, values: Iterable[int]) -> List[int]:
+        vectors = [self._hashes(value) for value in set(values)]
+        if not vectors:
+            return [_MAX_HASH] * self.num_perm
+        return list(map(min, *vectors)) if len(vectors) > 1 else list(vectors[0])
+
+    def _hashes(self, value: int) -> tuple:
+        """All `num_perm` hashes of one element, cached: ingredient ids come from a small universe"""
+        hashes = self._cache.get(value)
+        if hashes is None:
+            hashes = tuple(((a * value + b) % _PRIME) & _MAX_HASH for a, b in self._params)
+            self._cache[value] = hashes
+        return hashes
+
+    def band_keys(self, signature: Sequence[int]) -> List[int]:
+        """One signed 64-bit key per band (fits a BIGINT column); the band index is part of the key"""
+        rows = self.rows
+        keys = []
+        for band in range(self.bands):
+            chunk = struct.pack(f"<H{rows}I", band, *signature[band * rows:(band + 1) * rows])
+            keys.append(int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), "little", signed=True))
+        return keys
+
+    def keys(self, values: Iterable[int]) -> List[int]:
+        return self.band_keys(self.signature(values))
+
+
+def jaccard(a, b) -> float:
+    a, b = set(a), set(b)
+    union = len(a | b)
+    return len(a & b) / union if union else 0.0
@@ -0,0 +1,388 @@
+"""
+Popular and trending recipe leaderboards, behind GET /recipes/popular and
+GET /recipes/trending.
+
+Each worker keeps the counters in memory: favorites per recipe (popular) and
+a time-decayed score of views and new favorites (trending), each in a sorted
+leaderboard so a top-k read is a slice. Favorite changes and recipe views
+update the local counters at once and are queued as deltas; every
+POPULARITY_FLUSH_SECONDS a background thread adds the queued deltas to
+`recipe_popularity` (write-behind, one UPDATE per changed recipe) and reloads
+the rows written since its previous reload (`updated_at`), which brings in the
+other workers' counts without re-reading the whole table. A full reload runs at
+startup, after a rebuild and when rows have disappeared (deleted recipes). A
+home-page load never counts favorites in SQL.
+
+Trending uses forward decay: an event at time t weighs
+2 ** ((t - era start) / half-life), so stored scores only ever grow and keep
+their order as time passes; the score "now" is the stored one scaled by
+2 ** ((era start - now) / half-life). To keep the weights finite, time is cut
+into eras of ERA_HALF_LIVES half-lives and scores are rescaled by
+2 ** -ERA_HALF_LIVES when they move into the next era.
+
+The favorite counts drift when favorites disappear without going through the
+API (deleted users, raw SQL); `python -m src.core.popularity` or
+POST /admin/popularity/rebuild recounts them from favorite_recipe.
+
+Settings:
+    POPULARITY_FLUSH_SECONDS     write-behind and reload interval (0 disables the thread)
+    TRENDING_HALF_LIFE_HOURS     age at which a view counts half (reset trending after changing)
+    TRENDING_FAVORITE_WEIGHT     views a new favorite is worth in trending
+"""
+import argparse
+import logging
+import threading
+import time
+from datetime import timedelta
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import bindparam, case, create_engine, func, insert, select, update
+from sqlalchemy.engine import Engine
+
+from .metrics import metrics
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+ERA_HALF_LIVES = 64
+# Changed rows are read from this long before the previous reload, so writes committed late
+# (updated_at is set when the UPDATE runs) or within the same second are not missed
+RELOAD_OVERLAP_SECONDS = 60
+
+
+def _tables():
+    from ..models import FavoriteRecipe, Recipe, RecipePopularity
+    return RecipePopularity.__table__, FavoriteRecipe.__table__, Recipe.__table__
+
+
+class Leaderboard:
+    """Scores by key plus a list of (-score, key) kept sorted, so the top k is a slice (ties by key)"""
+
+    def __init__(self):
+        self._scores: Dict[int, float] = {}
+        self._order: List[Tuple[float, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def add(self, key: int, delta: float):
+        old = self._scores.get(key)
+        if old is not None:
+            del self._order[bisect_left(self._order, (-old, key))]
+        score = (old or 0) + delta
+        self._scores[key] = score
+        insort(self._order, (-score, key))
+
+    def replace(self, scores: Dict[int, float]):
+        self._scores = dict(scores)
+        self._order = sorted((-score, key) for key, score in self._scores.items())
+
+    def update(self, scores: Dict[int, float]):
+        """Set the scores of the given keys (0 removes a key); re-sorts once when many keys change"""
+        if len(scores) * 32 > len(self._scores):
+            merged = {**self._scores, **scores}
+            self.replace({key: score for key, score in merged.items() if score})
+            return
+        for key, score in scores.items():
+            old = self._scores.pop(key, None)
+            if old is not None:
+                del self._order[bisect_left(self._order, (-old, key))]
+            if score:
+                self._scores[key] = score
+                insort(self._order, (-score, key))
+
+    def scale(self, factor: float):
+        """Multiply every score by a positive factor (the order is unchanged)"""
+        self._scores = {key: score * factor for key, score in self._scores.items()}
+        self._order = [(score * factor, key) for score, key in self._order]
+
+    def top(self, k: int, skip: int = 0) -> List[Tuple[int, float]]:
+        return [(key, -score) for score, key in self._order[skip:skip + k] if score < 0]
+
+
+class PopularityCounters:
+    def __init__(self, flush_interval: float, half_life_hours: float, favorite_weight: float):
+        self.flush_interval = flush_interval
+        self.half_life = half_life_hours * 3600
+        self.favorite_weight = favorite_weight
+        self.engine: Optional[Engine] = None
+        self.popular = Leaderboard()
+        self.trending = Leaderboard()
+        self.views: Dict[int, int] = {}
+        self._era = self._era_at(time.time())
+        self._pending: Dict[int, List[float]] = {}  # recipe_id -> [views, favorites, trending] not yet flushed
+        self._loaded_at = None  # database time of the last reload
+        self._loaded: Set[int] = set()  # recipe ids read from recipe_popularity
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _era_at(self, now: float) -> int:
+        return int(now // (self.half_life * ERA_HALF_LIVES))
+
+    def _weight(self, now: float) -> float:
+        """Weight of an event happening now, relative to the start of the current era"""
+        return 2 ** ((now - self._era * self.half_life * ERA_HALF_LIVES) / self.half_life)
+
+    def _roll(self, now: float):
+        """Move the in-memory trending scores into the era of `now` (lock held)"""
+        era = self._era_at(now)
+        if era != self._era:
+            factor = 2.0 ** (-ERA_HALF_LIVES * (era - self._era))
+            self.trending.scale(factor)
+            for delta in self._pending.values():
+                delta[2] *= factor
+            self._era = era
+
+    def record_view(self, recipe_id: int):
+        self._record(recipe_id, 1, 0)
+
+    def record_favorite(self, recipe_id: int, delta: int):
+        """A favorite added (+1) or removed (-1); removals lower `popular` but not `trending`"""
+        self._record(recipe_id, 0, delta)
+
+    def _record(self, recipe_id: int, views: int, favorites: int):
+        now = time.time()
+        with self._lock:
+            self._roll(now)
+            trend = (views + self.favorite_weight * max(favorites, 0)) * self._weight(now)
+            pending = self._pending.setdefault(recipe_id, [0, 0, 0.0])
+            pending[0] += views
+            pending[1] += favorites
+            pending[2] += trend
+            if views:
+                self.views[recipe_id] = self.views.get(recipe_id, 0) + views
+            if favorites:
+                self.popular.add(recipe_id, favorites)
+            if trend:
+                self.trending.add(recipe_id, trend)
+
+    def top_popular(self, limit: int, skip: int = 0) -> List[Tuple[int, int]]:
+        """(recipe_id, favorites) by favorites, most first"""
+        with self._lock:
+            return [(recipe_id, int(score)) for recipe_id, score in self.popular.top(limit, skip)]
+
+    def top_trending(self, limit: int, skip: int = 0) -> List[Tuple[int, float]]:
+        """(recipe_id, decayed score now) by trending score, highest first"""
+        now = time.time()
+        with self._lock:
+            self._roll(now)
+            scale = 1 / self._weight(now)
+            return [(recipe_id, score * scale) for recipe_id, score in self.trending.top(limit, skip)]
+
+    def start(self, engine: Engine):
+        """Load the counters and start the write-behind thread (app startup)"""
+        self.engine = engine
+        self.reload()
+        if self.flush_interval > 0 and (self._thread is None or not self._thread.is_alive()):
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="popularity-flush", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the thread and write what is still queued (app shutdown)"""
+        self._stop.set()
+        if self.engine is not None:
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Popularity flush on shutdown failed: {e}")
+
+    def flush(self) -> int:
+        """Add the queued deltas to recipe_popularity; returns the number of recipes written"""
+        popularity, _, recipe = _tables()
+        with self._lock:
+            self._roll(time.time())
+            pending, self._pending = self._pending, {}
+            era = self._era
+        if not pending:
+            return 0
+        carry = 2.0 ** -ERA_HALF_LIVES
+        try:
+            with self.engine.begin() as conn:
+                now = conn.execute(select(func.now())).scalar()
+                ids = list(pending)
+                existing = set(conn.execute(
+                    select(popularity.c.recipe_id).where(popularity.c.recipe_id.in_(ids))
+                ).scalars())
+                missing = [recipe_id for recipe_id in ids if recipe_id not in existing]
+                if missing:
+                    # Recipes deleted since the event are skipped
+                    live = conn.execute(select(recipe.c.id).where(recipe.c.id.in_(missing))).scalars().all()
+                    if live:
+                        conn.execute(insert(popularity), [
+                            {"recipe_id": recipe_id, "favorites": 0, "views": 0, "trending": 0.0, "trending_era": era,
+                             "updated_at": now}
+                            for recipe_id in live
+                        ])
+                conn.execute(
+                    update(popularity)
+                    .where(popularity.c.recipe_id == bindparam("key"))
+                    .values(
+                        views=popularity.c.views + bindparam("add_views"),
+                        favorites=popularity.c.favorites + bindparam("add_favorites"),
+                        trending=case(
+                            (popularity.c.trending_era == era, popularity.c.trending + bindparam("add_trending")),
+                            (popularity.c.trending_era == era - 1, popularity.c.trending * carry + bindparam("add_trending")),
+                            else_=bindparam("add_trending"),
+                        ),
+                        trending_era=era,
+                        updated_at=now,
+                    ),
+                    [
+                        {"key": recipe_id, "add_views": views, "add_favorites": favorites, "add_trending": trend}
+                        for recipe_id, (views, favorites, trend) in pending.items()
+                    ],
+                )
+        except Exception:
+            # Keep the deltas for the next flush
+            with self._lock:
+                factor = 2.0 ** (-ERA_HALF_LIVES * (self._era - era))
+                for recipe_id, (views, favorites, trend) in pending.items():
+                    queued = self._pending.setdefault(recipe_id, [0, 0, 0.0])
+                    queued[0] += views
+                    queued[1] += favorites
+                    queued[2] += trend * factor
+            raise
+        return len(pending)
+
+    def _columns(self):
+        popularity, _, _ = _tables()
+        return (popularity.c.recipe_id, popularity.c.favorites, popularity.c.views,
+                popularity.c.trending, popularity.c.trending_era)
+
+    def _trending(self, score: float, score_era: int, era: int) -> float:
+        """A stored trending score moved into `era` (0 when it is more than one era old)"""
+        if not score or score_era < era - 1:
+            return 0.0
+        return score * 2.0 ** (-ERA_HALF_LIVES * (era - score_era))
+
+    def reload(self):
+        """Replace the counters with recipe_popularity plus the deltas not flushed yet"""
+        with self.engine.connect() as conn:
+            loaded_at = conn.execute(select(func.now())).scalar()
+            rows = conn.execute(select(*self._columns())).all()
+        with self._lock:
+            self._roll(time.time())
+            era = self._era
+            views = {}
+            favorites = {}
+            trending = {}
+            for recipe_id, favorite_count, view_count, score, score_era in rows:
+                views[recipe_id] = view_count
+                if favorite_count:
+                    favorites[recipe_id] = favorite_count
+                score = self._trending(score, score_era, era)
+                if score:
+                    trending[recipe_id] = score
+            for recipe_id, (view_count, favorite_count, score) in self._pending.items():
+                views[recipe_id] = views.get(recipe_id, 0) + view_count
+                favorites[recipe_id] = favorites.get(recipe_id, 0) + favorite_count
+                trending[recipe_id] = trending.get(recipe_id, 0.0) + score
+            self.views = views
+            self.popular.replace({recipe_id: count for recipe_id, count in favorites.items() if count})
+            self.trending.replace(trending)
+            self._loaded = {row[0] for row in rows}
+            self._loaded_at = loaded_at
+
+    def reload_changed(self):
+        """Apply the recipe_popularity rows written since the last reload (by any worker) to the counters;
+        falls back to reload() when rows have been deleted"""
+        if self._loaded_at is None:
+            return self.reload()
+        popularity, _, _ = _tables()
+        since = self._loaded_at - timedelta(seconds=RELOAD_OVERLAP_SECONDS)
+        with self.engine.connect() as conn:
+            loaded_at = conn.execute(select(func.now())).scalar()
+            rows = conn.execute(select(*self._columns()).where(popularity.c.updated_at >= since)).all()
+            total = conn.execute(select(func.count()).select_from(popularity)).scalar()
+        loaded = self._loaded | {row[0] for row in rows}
+        if total < len(loaded):
+            # Fewer rows than ids seen: recipes were deleted, drop them with a full reload
+            return self.reload()
+        with self._lock:
+            self._roll(time.time())
+            era = self._era
+            favorites = {}
+            trending = {}
+            for recipe_id, favorite_count, view_count, score, score_era in rows:
+                view_delta, favorite_delta, score_delta = self._pending.get(recipe_id, (0, 0, 0.0))
+                self.views[recipe_id] = view_count + view_delta
+                favorites[recipe_id] = favorite_count + favorite_delta
+                trending[recipe_id] = self._trending(score, score_era, era) + score_delta
+            self.popular.update(favorites)
+            self.trending.update(trending)
+            self._loaded = loaded
+            self._loaded_at = loaded_at
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+                self.reload_changed()
+            except Exception as e:
+                logger.warning(f"Popularity flush failed: {e}")
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+
+popularity_counters = PopularityCounters(
+    settings.POPULARITY_FLUSH_SECONDS, settings.TRENDING_HALF_LIFE_HOURS, settings.TRENDING_FAVORITE_WEIGHT
+)
+metrics.register_gauge("popularity_pending_recipes", "Recipes with counter deltas waiting to be flushed", lambda: popularity_counters.pending)
+
+
+def recount_favorites(engine: Engine) -> dict:
+    """Set every recipe's favorite count from favorite_recipe (views and trending are kept)"""
+    popularity, favorite, recipe = _tables()
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        now = conn.execute(select(func.now())).scalar()
+        counts = dict(conn.execute(
+            select(favorite.c.recipe_id, func.count()).group_by(favorite.c.recipe_id)
+        ).all())
+        existing = set(conn.execute(select(popularity.c.recipe_id)).scalars())
+        recipe_ids = conn.execute(select(recipe.c.id)).scalars().all()
+        missing = [recipe_id for recipe_id in recipe_ids if recipe_id not in existing]
+        if missing:
+            conn.execute(insert(popularity), [
+                {"recipe_id": recipe_id, "favorites": counts.get(recipe_id, 0), "views": 0, "trending": 0.0, "trending_era": 0,
+                 "updated_at": now}
+                for recipe_id in missing
+            ])
+        if existing:
+            conn.execute(
+                update(popularity).where(popularity.c.recipe_id == bindparam("key")).values(favorites=bindparam("count"), updated_at=now),
+                [{"key": recipe_id, "count": counts.get(recipe_id, 0)} for recipe_id in existing],
+            )
+    return {"recipes": len(recipe_ids), "favorites": sum(counts.values()), "seconds": round(time.perf_counter() - started, 3)}
+
+
+def ensure_popularity(engine: Engine):
+    """Count favorites at startup if recipe_popularity is empty while there are recipes"""
+    popularity, _, recipe = _tables()
+    with engine.connect() as conn:
+        missing = conn.execute(select(func.count()).select_from(recipe)).scalar() and not conn.execute(
+            select(func.count()).select_from(popularity)
+        ).scalar()
+    if missing:
+        stats = recount_favorites(engine)
+        logger.info(f"Recipe popularity built: {stats['favorites']} favorites over {stats['recipes']} recipes in {stats['seconds']}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recount the favorite counts behind /recipes/popular")
+    parser.add_argument("--database-url", default=None, help="Database to update (defaults to the configured one)")
+    args = parser.parse_args(argv)
+
+    from .. import models  # noqa: F401  (registers the tables)
+    engine = create_engine(args.database_url or settings.database_url)
+    stats = recount_favorites(engine)
+    print(f"Counted {stats['favorites']} favorites over {stats['recipes']} recipes in {stats['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+On-demand profiling of a running worker, without restarts.
+
+CPU: a pure-Python sampler thread reads every thread's current stack through
+`sys._current_frames()` at a fixed interval. Unlike cProfile it sees the
+threadpool threads that run the sync endpoints, and its overhead is bounded by
+the sampling rate rather than the number of calls. Results are exported as
+collapsed stacks (flamegraph.pl / speedscope) or as a pstats file synthesized
+from the samples (`python -m pstats`, snakeviz).
+
+Memory: tracemalloc snapshots kept by id so any two can be diffed.
+"""
+import marshal
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+# One frame: (filename, first line of the function, function name), the key pstats uses
+Frame = Tuple[str, int, str]
+
+# Leaf frames of threads parked on a lock, queue or selector; skipped unless idle samples are asked for
+_IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+}
+
+
+class ProfilerBusy(Exception):
+    """Raised when a CPU profile is requested while another one is running"""
+
+
+class CpuProfile:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples = 0
+        self.stacks: Counter = Counter()  # tuple of frames, root first -> samples
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed stack format: `root;child;leaf count` per line"""
+        lines = []
+        for stack, count in self.stacks.most_common():
+            frames = ";".join(f"{func} ({os.path.basename(filename)}:{line})" for filename, line, func in stack)
+            lines.append(f"{frames} {count}")
+        return "\n".join(lines) + "\n"
+
+    def pstats(self) -> bytes:
+        """Marshalled stats dict in the layout `pstats.Stats` loads; sample counts become seconds"""
+        self_samples: Counter = Counter()
+        total_samples: Counter = Counter()
+        callers: Dict[Frame, Counter] = {}
+        for stack, count in self.stacks.items():
+            self_samples[stack[-1]] += count
+            for frame in set(stack):
+                total_samples[frame] += count
+            for caller, callee in zip(stack, stack[1:]):
+                callers.setdefault(callee, Counter())[caller] += count
+
+        stats = {}
+        for frame, total in total_samples.items():
+            frame_callers = {
+                caller: (n, n, 0.0, n * self.interval) for caller, n in callers.get(frame, {}).items()
+            }
+            stats[frame] = (total, total, self_samples[frame] * self.interval, total * self.interval, frame_callers)
+        return marshal.dumps(stats)
+
+
+class SamplingProfiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def profile(self, seconds: float, interval: float, include_idle: bool = False) -> CpuProfile:
+        """Sample every thread except the caller for `seconds`; blocks for that long"""
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A CPU profile is already running in this worker")
+        try:
+            result = CpuProfile(interval)
+            own = threading.get_ident()
+            deadline = time.perf_counter() + seconds
+            while time.perf_counter() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        code = frame.f_code
+                        stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                        frame = frame.f_back
+                    leaf_file, _, leaf_func = stack[0]
+                    if not include_idle and (os.path.basename(leaf_file), leaf_func) in _IDLE_LEAVES:
+                        continue
+                    stack.reverse()
+                    result.stacks[tuple(stack)] += 1
+                result.samples += 1
+                time.sleep(interval)
+            return result
+        finally:
+            self._lock.release()
+
+
+class MemoryProfiler:
+    """tracemalloc snapshots, newest `capacity` kept by id"""
+
+    def __init__(self, capacity: int = 10):
+        self.capacity = capacity
+        self.snapshots: "OrderedDict[int, Tuple[datetime, tracemalloc.Snapshot]]" = OrderedDict()
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self):
+        tracemalloc.stop()
+        self.snapshots.clear()
+
+    def take(self) -> Tuple[int, datetime, tracemalloc.Snapshot]:
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+        taken_at = datetime.now(timezone.utc)
+        with self._lock:
+            snapshot_id = self._next_id
+            self._next_id += 1
+            self.snapshots[snapshot_id] = (taken_at, snapshot)
+            while len(self.snapshots) > self.capacity:
+                self.snapshots.popitem(last=False)
+        return snapshot_id, taken_at, snapshot
+
+    def get(self, snapshot_id: int) -> Optional[tracemalloc.Snapshot]:
+        entry = self.snapshots.get(snapshot_id)
+        return entry[1] if entry else None
+
+
+def tracemalloc_memory() -> Tuple[int, int]:
+    """(currently traced, peak) bytes"""
+    return tracemalloc.get_traced_memory()
+
+
+def top_allocations(snapshot: tracemalloc.Snapshot, group_by: str, limit: int) -> List[dict]:
+    return [
+        {"location": _location(stat.traceback), "size_kib": round(stat.size / 1024, 1), "count": stat.count}
+        for stat in snapshot.statistics(group_by)[:limit]
+    ]
+
+
+def diff_allocations(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, group_by: str, limit: int) -> List[dict]:
+    """Largest growth first"""
+    return [
+        {
+            "location": _location(stat.traceback),
+            "size_kib": round(stat.size / 1024, 1),
+            "count": stat.count,
+            "size_diff_kib": round(stat.size_diff / 1024, 1),
+            "count_diff": stat.count_diff,
+        }
+        for stat in after.compare_to(before, group_by)[:limit]
+    ]
+
+
+def _location(traceback: tracemalloc.Traceback) -> str:
+    # Innermost frame (where the allocation happened) first
+    return " <- ".join(f"{frame.filename}:{frame.lineno}" for frame in reversed(traceback))
+
+
+cpu_profiler = SamplingProfiler()
+memory_profiler = MemoryProfiler()
@@ -0,0 +1,118 @@
+"""
+Per-request SQL instrumentation.
+
+The shared statement timing (core/sql_timing) attributes every statement to the request being served
+(through a contextvar, which also follows sync endpoints into the threadpool).
+The middleware reports the totals as a `Server-Timing` header and flags
+requests that exceed the query budget or repeat one statement shape many
+times (the N+1 pattern, e.g. lazy loads inside a loop).
+
+Settings:
+    QUERY_BUDGET              max statements per request before warning
+    N_PLUS_ONE_THRESHOLD      repeats of one statement shape before warning
+    QUERY_BUDGET_STRICT       raise QueryBudgetExceeded instead of logging (for tests)
+"""
+import logging
+import re
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+from .settings import settings
+from .sql_timing import add_statement_observer
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r"\((?:\s*(?:\?|%s|:\w+)\s*,)+\s*(?:\?|%s|:\w+)\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in strict mode when a request breaks the query budget or repeats a statement"""
+
+
+class RequestQueryStats:
+    """SQL statements executed while serving one request"""
+
+    __slots__ = ("count", "duration", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.duration += elapsed
+        self.shapes[statement_shape(statement)] += 1
+
+    def problems(self, budget: int, repeat_threshold: int) -> list:
+        found = []
+        if budget and self.count > budget:
+            found.append(f"{self.count} queries (budget {budget})")
+        for shape, repeats in self.shapes.items():
+            if repeat_threshold and repeats >= repeat_threshold:
+                found.append(f"statement repeated {repeats}x (possible N+1): {shape[:200]}")
+        return found
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.2f};desc="{self.count} queries"'
+
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a statement so calls that differ only in IN-list length or spacing compare equal"""
+    return _IN_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    return _current_stats.get()
+
+
+def install_query_counter(engine):
+    """Count the engine's statements against the current request (idempotent)"""
+    add_statement_observer(engine, _observe)
+
+
+def _observe(statement, parameters, executemany, elapsed, error):
+    stats = _current_stats.get()
+    if stats is not None and error is None:
+        stats.record(statement, elapsed)
+
+
+class QueryCounterMiddleware:
+    """ASGI middleware: collects per-request query stats and emits them as Server-Timing"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                self._check(scope, stats)
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+
+    def _check(self, scope, stats: RequestQueryStats):
+        problems = stats.problems(settings.QUERY_BUDGET, settings.N_PLUS_ONE_THRESHOLD)
+        if not problems:
+            return
+        message = f"{scope.get('method')} {scope.get('path')}: " + "; ".join(problems)
+        if settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
@@ -0,0 +1,202 @@
+"""
+Item-item co-occurrence of favorites, behind "users who favorited this also
+favorited" and GET /users/{id}/recommendations.
+
+The batch job reads `favorite_recipe` once as a sparse user x recipe matrix
+(one list of recipe ids per user), accumulates the item-item co-occurrence
+counts (X^T X) with one Counter per recipe, and keeps the top
+RECIPE_NEIGHBORS_TOP_N neighbors of every recipe by cosine similarity,
+`shared / sqrt(favorites(a) * favorites(b))`, in `recipe_neighbor`. A user's
+recommendations are then a merge of the neighbor lists of their favorites:
+O(favorites x N) rows and no self-join of favorite_recipe at request time.
+
+Between rebuilds, adding or removing a favorite updates the lists in the same
+transaction: the co-occurrence of the recipe with each of the user's other
+favorites is recounted (one query bounded by the recipe's popularity) and
+merged into both recipes' lists. This is exact for the pairs it touches; the
+drift it leaves (scores of untouched pairs as popularity changes, a neighbor
+falling out of a list that an unlisted recipe should replace, deleted users)
+is corrected by the next rebuild.
+
+Settings:
+    RECIPE_NEIGHBORS_TOP_N              neighbors kept per recipe
+    RECIPE_NEIGHBORS_REFRESH_SECONDS    rebuild interval on a background thread (0 = off; set on one worker)
+
+Usage (from the backend/ directory, e.g. nightly from cron):
+    python -m src.core.recipe_neighbors
+    python -m src.core.recipe_neighbors --database-url mysql+mysqlconnector://...
+"""
+import argparse
+import heapq
+import logging
+import math
+import time
+from collections import Counter, defaultdict
+from itertools import groupby
+from operator import itemgetter
+from typing import Optional
+
+from sqlalchemy import bindparam, create_engine, delete, exists, func, insert, select, update
+from sqlalchemy.engine import Engine
+
+from .jobs import BackgroundJob
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _tables():
+    from ..models import FavoriteRecipe, RecipeNeighbor
+    return FavoriteRecipe.__table__, RecipeNeighbor.__table__
+
+
+def _cosine(shared: int, favorites_a: int, favorites_b: int) -> float:
+    return shared / math.sqrt(favorites_a * favorites_b) if shared else 0.0
+
+
+def rebuild_neighbors(engine: Engine, top_n: Optional[int] = None, batch_size: int = 10000) -> dict:
+    """Recompute every recipe's neighbor list from favorite_recipe in one transaction"""
+    favorite, neighbor = _tables()
+    top_n = top_n or settings.RECIPE_NEIGHBORS_TOP_N
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        rows = conn.execute(
+            select(favorite.c.user_id, favorite.c.recipe_id).order_by(favorite.c.user_id)
+        ).all()
+
+        popularity = Counter()
+        cooccurrence = defaultdict(Counter)
+        users = 0
+        for _, group in groupby(rows, key=itemgetter(0)):
+            recipe_ids = [recipe_id for _, recipe_id in group]
+            users += 1
+            popularity.update(recipe_ids)
+            if len(recipe_ids) > 1:
+                for recipe_id in recipe_ids:
+                    cooccurrence[recipe_id].update(recipe_ids)
+
+        pending = []
+        pairs = 0
+        conn.execute(delete(neighbor))
+        for recipe_id, counts in cooccurrence.items():
+            del counts[recipe_id]
+            favorites = popularity[recipe_id]
+            best = heapq.nsmallest(
+                top_n, ((-_cosine(shared, favorites, popularity[other]), other, shared) for other, shared in counts.items())
+            )
+            pending.extend(
+                {"recipe_id": recipe_id, "neighbor_id": other, "shared": shared, "score": -score}
+                for score, other, shared in best
+            )
+            if len(pending) >= batch_size:
+                conn.execute(insert(neighbor), pending)
+                pairs += len(pending)
+                pending = []
+        if pending:
+            conn.execute(insert(neighbor), pending)
+            pairs += len(pending)
+    return {"users": users, "recipes": len(cooccurrence), "pairs": pairs, "seconds": round(time.perf_counter() - started, 3)}
+
+
+def update_neighbors(conn, user_id: int, recipe_id: int, top_n: Optional[int] = None):
+    """Fold one added or removed favorite (already written on `conn`) into the neighbor lists"""
+    favorite, neighbor = _tables()
+    top_n = top_n or settings.RECIPE_NEIGHBORS_TOP_N
+    others = conn.execute(
+        select(favorite.c.recipe_id).where(favorite.c.user_id == user_id, favorite.c.recipe_id != recipe_id)
+    ).scalars().all()
+    if not others:
+        return
+
+    co_favorite = favorite.alias("co_favorite")
+    shared = dict(conn.execute(
+        select(co_favorite.c.recipe_id, func.count())
+        .select_from(favorite.join(co_favorite, favorite.c.user_id == co_favorite.c.user_id))
+        .where(favorite.c.recipe_id == recipe_id, co_favorite.c.recipe_id.in_(others))
+        .group_by(co_favorite.c.recipe_id)
+    ).all())
+    popularity = dict(conn.execute(
+        select(favorite.c.recipe_id, func.count())
+        .where(favorite.c.recipe_id.in_([*others, recipe_id]))
+        .group_by(favorite.c.recipe_id)
+    ).all())
+    lists = defaultdict(dict)
+    for row in conn.execute(select(neighbor).where(neighbor.c.recipe_id.in_([*others, recipe_id]))):
+        lists[row.recipe_id][row.neighbor_id] = row.score
+
+    changes = {"delete": [], "update": [], "insert": []}
+    for other in others:
+        count = shared.get(other, 0)
+        score = _cosine(count, popularity.get(recipe_id, 0), popularity.get(other, 0))
+        _merge(lists[recipe_id], recipe_id, other, count, score, top_n, changes)
+        _merge(lists[other], other, recipe_id, count, score, top_n, changes)
+
+    if changes["delete"]:
+        conn.execute(
+            delete(neighbor).where(neighbor.c.recipe_id == bindparam("a"), neighbor.c.neighbor_id == bindparam("b")),
+            changes["delete"],
+        )
+    if changes["update"]:
+        conn.execute(
+            update(neighbor)
+            .where(neighbor.c.recipe_id == bindparam("a"), neighbor.c.neighbor_id == bindparam("b"))
+            .values(shared=bindparam("new_shared"), score=bindparam("new_score")),
+            changes["update"],
+        )
+    if changes["insert"]:
+        conn.execute(insert(neighbor), changes["insert"])
+
+
+def _merge(current: dict, recipe_id: int, other: int, shared: int, score: float, top_n: int, changes: dict):
+    """Apply one recounted pair to `recipe_id`'s list (neighbor -> score), recording the statements"""
+    if other in current:
+        if shared:
+            changes["update"].append({"a": recipe_id, "b": other, "new_shared": shared, "new_score": score})
+            current[other] = score
+        else:
+            changes["delete"].append({"a": recipe_id, "b": other})
+            del current[other]
+        return
+    if not shared:
+        return
+    if len(current) >= top_n:
+        # Same order as the rebuild: higher score first, then lower id
+        weakest = min(current, key=lambda neighbor_id: (current[neighbor_id], -neighbor_id))
+        if (score, -other) <= (current[weakest], -weakest):
+            return
+        changes["delete"].append({"a": recipe_id, "b": weakest})
+        del current[weakest]
+    changes["insert"].append({"recipe_id": recipe_id, "neighbor_id": other, "shared": shared, "score": score})
+    current[other] = score
+
+
+def ensure_neighbors(engine: Engine):
+    """Build the neighbor lists at startup if they are empty while there are favorites"""
+    favorite, neighbor = _tables()
+    with engine.connect() as conn:
+        missing = conn.execute(select(exists().select_from(favorite))).scalar() and not conn.execute(
+            select(exists().select_from(neighbor))
+        ).scalar()
+    if missing:
+        stats = rebuild_neighbors(engine)
+        logger.info(f"Recipe neighbors built: {stats['pairs']} pairs for {stats['recipes']} recipes in {stats['seconds']}s")
+
+
+neighbor_refresher = BackgroundJob("recipe-neighbors", rebuild_neighbors)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild the co-favorite neighbor lists behind recipe recommendations")
+    parser.add_argument("--top-n", type=int, default=settings.RECIPE_NEIGHBORS_TOP_N, help="Neighbors kept per recipe")
+    parser.add_argument("--database-url", default=None, help="Database to index (defaults to the configured one)")
+    args = parser.parse_args(argv)
+
+    from .. import models  # noqa: F401  (registers the tables)
+    engine = create_engine(args.database_url or settings.database_url)
+    stats = rebuild_neighbors(engine, args.top_n)
+    print(f"Stored {stats['pairs']} neighbor pairs for {stats['recipes']} recipes from "
+          f"{stats['users']} users' favorites in {stats['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+MinHash LSH index of recipe ingredient sets, behind GET /recipes/{id}/similar.
+
+Each recipe's ingredient set gets a MinHash signature, cut into bands; every
+band key is stored in `recipe_lsh_bucket` as one (bucket, recipe_id) row.
+Recipes sharing a bucket with the query recipe are candidates, and the ones
+sharing the most buckets (the highest estimated Jaccard similarity) are
+re-ranked exactly, so a lookup never compares against the whole catalog.
+
+The index is kept current incrementally: an `after_flush` hook on the session
+factory re-keys every recipe whose recipe_ingredient rows were inserted,
+changed or deleted in the flush, in the same transaction. Recipe writes go
+through the ORM, so created, edited and deleted recipes are all covered; the
+Core / raw SQL ingredient delete (IngredientService) calls reindex_recipes itself.
+A full rebuild is needed once after the migration, after changing the MinHash
+settings and after loading recipes with raw SQL; startup builds the index in
+the background when the table is empty.
+
+Settings:
+    RECIPE_SIMILARITY_PERMUTATIONS   signature length
+    RECIPE_SIMILARITY_BANDS          bands (rows per band = permutations / bands)
+
+Usage (from the backend/ directory):
+    python -m src.core.recipe_similarity
+    python -m src.core.recipe_similarity --database-url mysql+mysqlconnector://...
+"""
+import argparse
+import logging
+import time
+from itertools import chain, groupby
+from typing import Iterable
+
+from sqlalchemy import create_engine, delete, event, exists, insert, select
+from sqlalchemy.engine import Engine
+
+from .minhash import MinHasher
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+recipe_minhash = MinHasher(settings.RECIPE_SIMILARITY_PERMUTATIONS, settings.RECIPE_SIMILARITY_BANDS)
+
+
+def _tables():
+    from ..models import RecipeIngredient, RecipeLshBucket
+    return RecipeIngredient.__table__, RecipeLshBucket.__table__
+
+
+def install_similarity_index(session_factory):
+    """Re-key recipes whose ingredients change in `session_factory` sessions (idempotent)"""
+    if not event.contains(session_factory, "after_flush", _after_flush):
+        event.listen(session_factory, "after_flush", _after_flush)
+
+
+def _after_flush(session, flush_context):
+    from ..models import RecipeIngredient
+    # new / dirty / deleted still describe what this flush wrote
+    recipe_ids = {
+        obj.recipe_id for obj in chain(session.new, session.dirty, session.deleted)
+        if isinstance(obj, RecipeIngredient) and obj.recipe_id is not None
+    }
+    if recipe_ids:
+        reindex_recipes(session.connection(), recipe_ids)
+
+
+def reindex_recipes(conn, recipe_ids: Iterable[int]):
+    """Replace the bucket rows of some recipes from their current ingredients (recipes without
+    ingredients, deleted ones included, end up with none)"""
+    recipe_ingredient, bucket = _tables()
+    recipe_ids = sorted(set(recipe_ids))
+    if not recipe_ids:
+        return
+    ingredient_sets = {}
+    for recipe_id, ingredient_id in conn.execute(
+        select(recipe_ingredient.c.recipe_id, recipe_ingredient.c.ingredient_id)
+        .where(recipe_ingredient.c.recipe_id.in_(recipe_ids))
+    ):
+        ingredient_sets.setdefault(recipe_id, set()).add(ingredient_id)
+    conn.execute(delete(bucket).where(bucket.c.recipe_id.in_(recipe_ids)))
+    rows = [
+        {"bucket": key, "recipe_id": recipe_id}
+        for recipe_id, ingredient_ids in ingredient_sets.items()
+        for key in set(recipe_minhash.keys(ingredient_ids))
+    ]
+    if rows:
+        conn.execute(insert(bucket), rows)
+
+
+def rebuild_index(engine: Engine, batch_size: int = 5000) -> dict:
+    """Recompute every recipe's buckets in one transaction, `batch_size` recipes at a time
+    (keyset-paged on recipe id, so no cursor stays open while rows are written)"""
+    recipe_ingredient, bucket = _tables()
+    started = time.perf_counter()
+    recipes = buckets = 0
+    last_id = None
+    with engine.begin() as conn:
+        conn.execute(delete(bucket))
+        while True:
+            stmt = select(recipe_ingredient.c.recipe_id).distinct().order_by(recipe_ingredient.c.recipe_id).limit(batch_size)
+            if last_id is not None:
+                stmt = stmt.where(recipe_ingredient.c.recipe_id > last_id)
+            recipe_ids = conn.execute(stmt).scalars().all()
+            if not recipe_ids:
+                break
+            last_id = recipe_ids[-1]
+            rows = conn.execute(
+                select(recipe_ingredient.c.recipe_id, recipe_ingredient.c.ingredient_id)
+                .where(recipe_ingredient.c.recipe_id.in_(recipe_ids))
+                .order_by(recipe_ingredient.c.recipe_id)
+            ).all()
+            pending = [
+                {"bucket": key, "recipe_id": recipe_id}
+                for recipe_id, group in groupby(rows, key=lambda row: row[0])
+                for key in set(recipe_minhash.keys(ingredient_id for _, ingredient_id in group))
+            ]
+            conn.execute(insert(bucket), pending)
+            recipes += len(recipe_ids)
+            buckets += len(pending)
+    return {"recipes": recipes, "buckets": buckets, "seconds": round(time.perf_counter() - started, 3)}
+
+
+def ensure_index(engine: Engine):
+    """Build the index at startup if it is empty while recipes have ingredients"""
+    recipe_ingredient, bucket = _tables()
+    with engine.connect() as conn:
+        missing = conn.execute(select(exists().select_from(recipe_ingredient))).scalar() and not conn.execute(
+            select(exists().select_from(bucket))
+        ).scalar()
+    if missing:
+        stats = rebuild_index(engine)
+        logger.info(f"Recipe similarity index built: {stats['recipes']} recipes, {stats['buckets']} buckets in {stats['seconds']}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild the MinHash LSH index behind /recipes/{id}/similar")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Recipes per batch")
+    parser.add_argument("--database-url", default=None, help="Database to index (defaults to the configured one)")
+    args = parser.parse_args(argv)
+
+    from .. import models  # noqa: F401  (registers the tables)
+    engine = create_engine(args.database_url or settings.database_url)
+    stats = rebuild_index(engine, args.batch_size)
+    print(f"Indexed {stats['recipes']} recipes into {stats['buckets']} buckets in {stats['seconds']:.2f}s "
+          f"({recipe_minhash.num_perm} permutations, {recipe_minhash.bands} bands)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Maintenance of the `recipe_summary` read model.
+
+Each row holds what list and matching views need about one recipe: name,
+category, times (and their total), the ingredient ids and names, and the
+favorite count. The rows are rewritten inside the transaction that changes
+their sources, so readers never see a summary that disagrees with the
+committed data:
+
+    RecipeRepository.create / update / delete      refresh_summaries
+    favorite add / remove, user delete             refresh_favorite_counts
+    ingredient rename / delete                     refresh_summaries_using
+
+Writes that bypass these paths (bulk loads, raw SQL) need a rebuild.
+
+Usage (from the backend/ directory):
+    python -m src.core.recipe_summary
+    python -m src.core.recipe_summary --database-url mysql+mysqlconnector://...
+"""
+import argparse
+import logging
+import time
+from typing import Iterable
+
+from sqlalchemy import create_engine, delete, exists, func, insert, select, update
+from sqlalchemy.engine import Engine
+
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _tables():
+    from ..models import FavoriteRecipe, Ingredient, Recipe, RecipeIngredient, RecipeSummary
+    return (
+        RecipeSummary.__table__, Recipe.__table__, RecipeIngredient.__table__,
+        Ingredient.__table__, FavoriteRecipe.__table__,
+    )
+
+
+def _summaries(conn, recipe_ids) -> list:
+    """Summary rows for the given recipes that still exist"""
+    _, recipe, recipe_ingredient, ingredient, favorite = _tables()
+    recipes = conn.execute(select(recipe).where(recipe.c.id.in_(recipe_ids))).all()
+    if not recipes:
+        return []
+    ingredients = {}
+    for recipe_id, ingredient_id, name in conn.execute(
+        select(recipe_ingredient.c.recipe_id, recipe_ingredient.c.ingredient_id, ingredient.c.name)
+        .select_from(recipe_ingredient.outerjoin(ingredient, recipe_ingredient.c.ingredient_id == ingredient.c.id))
+        .where(recipe_ingredient.c.recipe_id.in_(recipe_ids))
+        .order_by(recipe_ingredient.c.recipe_id, recipe_ingredient.c.ingredient_id)
+    ):
+        ids, names = ingredients.setdefault(recipe_id, ([], []))
+        ids.append(ingredient_id)
+        names.append(name)
+    favorites = dict(conn.execute(
+        select(favorite.c.recipe_id, func.count()).where(favorite.c.recipe_id.in_(recipe_ids)).group_by(favorite.c.recipe_id)
+    ).all())
+    rows = []
+    for row in recipes:
+        ids, names = ingredients.get(row.id, ([], []))
+        unknown = row.cook_time_in_minutes is None and row.prep_time_in_minutes is None
+        rows.append({
+            "recipe_id": row.id,
+            "name": row.name,
+            "category": row.category,
+            "cook_time_in_minutes": row.cook_time_in_minutes,
+            "prep_time_in_minutes": row.prep_time_in_minutes,
+            "total_time_in_minutes": None if unknown else (row.cook_time_in_minutes or 0) + (row.prep_time_in_minutes or 0),
+            "ingredient_count": len(ids),
+            "ingredient_ids": ids,
+            "ingredient_names": names,
+            "favorite_count": favorites.get(row.id, 0),
+        })
+    return rows
+
+
+def refresh_summaries(conn, recipe_ids: Iterable[int]):
+    """Rewrite the summaries of some recipes from their current rows (deleted recipes lose theirs)"""
+    summary = _tables()[0]
+    recipe_ids = sorted(set(recipe_ids))
+    if not recipe_ids:
+        return
+    rows = _summaries(conn, recipe_ids)
+    conn.execute(delete(summary).where(summary.c.recipe_id.in_(recipe_ids)))
+    if rows:
+        conn.execute(insert(summary), rows)
+
+
+def refresh_summaries_using(conn, ingredient_id: int):
+    """Rewrite the summaries of every recipe that uses an ingredient (after renaming it)"""
+    recipe_ingredient = _tables()[2]
+    refresh_summaries(conn, conn.execute(
+        select(recipe_ingredient.c.recipe_id).where(recipe_ingredient.c.ingredient_id == ingredient_id)
+    ).scalars().all())
+
+
+def refresh_favorite_counts(conn, recipe_ids: Iterable[int]):
+    """Recount favorite_count of some recipes (indexed count per recipe, so concurrent writers cannot drift it)"""
+    summary, _, _, _, favorite = _tables()
+    recipe_ids = sorted(set(recipe_ids))
+    if not recipe_ids:
+        return
+    conn.execute(
+        update(summary)
+        .where(summary.c.recipe_id.in_(recipe_ids))
+        .values(favorite_count=(
+            select(func.count()).select_from(favorite)
+            .where(favorite.c.recipe_id == summary.c.recipe_id)
+            .scalar_subquery()
+        ))
+    )
+
+
+def rebuild_summaries(engine: Engine, batch_size: int = 2000) -> dict:
+    """Recompute every summary in one transaction, `batch_size` recipes at a time (keyset-paged on id)"""
+    summary, recipe, _, _, _ = _tables()
+    started = time.perf_counter()
+    recipes = 0
+    last_id = None
+    with engine.begin() as conn:
+        conn.execute(delete(summary))
+        while True:
+            stmt = select(recipe.c.id).order_by(recipe.c.id).limit(batch_size)
+            if last_id is not None:
+                stmt = stmt.where(recipe.c.id > last_id)
+            recipe_ids = conn.execute(stmt).scalars().all()
+            if not recipe_ids:
+                break
+            last_id = recipe_ids[-1]
+            conn.execute(insert(summary), _summaries(conn, recipe_ids))
+            recipes += len(recipe_ids)
+    return {"recipes": recipes, "seconds": round(time.perf_counter() - started, 3)}
+
+
+def ensure_summaries(engine: Engine):
+    """Build the summaries at startup if the table is empty while there are recipes"""
+    summary, recipe, _, _, _ = _tables()
+    with engine.connect() as conn:
+        missing = conn.execute(select(exists().select_from(recipe))).scalar() and not conn.execute(
+            select(exists().select_from(summary))
+        ).scalar()
+    if missing:
+        stats = rebuild_summaries(engine)
+        logger.info(f"Recipe summaries built: {stats['recipes']} recipes in {stats['seconds']}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild the recipe_summary read model")
+    parser.add_argument("--batch-size", type=int, default=2000, help="Recipes per batch")
+    parser.add_argument("--database-url", default=None, help="Database to rebuild (defaults to the configured one)")
+    args = parser.parse_args(argv)
+
+    from .. import models  # noqa: F401  (registers the tables)
+    engine = create_engine(args.database_url or settings.database_url)
+    stats = rebuild_summaries(engine, args.batch_size)
+    print(f"Summarized {stats['recipes']} recipes in {stats['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+orjson-backed JSON responses.
+
+`FastJSONResponse` is the app's default response class. Routers can also
+return one directly with service output that is already a validated schema
+(the services build their Pydantic models from DB rows): FastAPI then skips
+the second `response_model` validation and re-serialization pass, and the
+route keeps its `response_model` for the OpenAPI schema only.
+
+Models are dumped with Pydantic's JSON mode (aliases, field serializers and
+computed fields included, Decimal as a string, datetimes in ISO format);
+orjson still does the encoding.
+"""
+from decimal import Decimal
+from typing import Any
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _default(obj: Any):
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json", by_alias=True)
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -3,6 +3,7 @@ import os
 import logging
 
 logger = logging.getLogger(__name__)
+_database_url_logged = False
 
 class Settings(BaseSettings):
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
@@ -10,29 +11,87 @@ class Settings(BaseSettings):
     DATABASE_USER: str = os.getenv("DATABASE_USER", "root")
     DATABASE_PASSWORD: str = os.getenv("DATABASE_PASSWORD", "")
     DATABASE_NAME: str = os.getenv("DATABASE_NAME", "dev")
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "")  # full URL override, e.g. a generated benchmark catalog
     DEBUG: bool = os.getenv("DEBUG", "True").lower() == "true"
     API_KEY: str = os.getenv("API_KEY", "dev")
     SECRET_KEY: str = os.getenv("SECRET_KEY", "secretkey")
+    DATA_ACCESS_STRATEGY: str = os.getenv("DATA_ACCESS_STRATEGY", "")  # orm, core or raw for every service
+    DATA_ACCESS_STRATEGIES: str = os.getenv("DATA_ACCESS_STRATEGIES", "")  # per service, e.g. "ingredient=raw,recipe=orm"
+    QUERY_BUDGET: int = int(os.getenv("QUERY_BUDGET", "50"))  # max SQL statements per request before warning
+    N_PLUS_ONE_THRESHOLD: int = int(os.getenv("N_PLUS_ONE_THRESHOLD", "10"))  # repeats of one statement shape per request
+    QUERY_BUDGET_STRICT: bool = os.getenv("QUERY_BUDGET_STRICT", "False").lower() == "true"  # raise instead of log (tests)
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # records buffered for the log writer before dropping
+    LOG_JSON: bool = os.getenv("LOG_JSON", "False").lower() == "true"  # one JSON object per log line
+    SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", "100"))  # statements slower than this are logged (0 disables)
+    SLOW_QUERY_BUFFER: int = int(os.getenv("SLOW_QUERY_BUFFER", "200"))  # slow queries kept for /admin/slow-queries
+    SLOW_QUERY_LOG: str = os.getenv("SLOW_QUERY_LOG", "logs/slow_queries.jsonl")  # JSONL sink ("" disables)
+    SLOW_QUERY_EXPLAIN: bool = os.getenv("SLOW_QUERY_EXPLAIN", "True").lower() == "true"  # capture query plans
+    TRACE_SAMPLE_RATE: float = float(os.getenv("TRACE_SAMPLE_RATE", "0"))  # fraction of requests traced (0 disables)
+    TRACE_BUFFER: int = int(os.getenv("TRACE_BUFFER", "100"))  # finished traces kept for /admin/traces
+    TRACE_LOG: str = os.getenv("TRACE_LOG", "")  # JSONL sink for finished traces ("" disables)
+    LOG_DEBUG_SAMPLE_RATE: float = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))  # fraction of DEBUG records kept
+    SNAPSHOT_DIR: str = os.getenv("SNAPSHOT_DIR", "snapshots")  # Parquet snapshots written by /admin/snapshots
+    SNAPSHOT_BATCH_SIZE: int = int(os.getenv("SNAPSHOT_BATCH_SIZE", "50000"))  # rows per read batch and Parquet row group
+    SNAPSHOT_COMPRESSION: str = os.getenv("SNAPSHOT_COMPRESSION", "zstd")  # Parquet codec
+    INGREDIENT_CATALOG: bool = os.getenv("INGREDIENT_CATALOG", "True").lower() == "true"  # serve ingredient reads from an in-process snapshot
+    CATALOG_SNAPSHOT_PATH: str = os.getenv("CATALOG_SNAPSHOT_PATH", "snapshots/catalog.bin")  # mmap'd catalog shared by workers ("" disables)
+    CATALOG_SNAPSHOT_REBUILD_DELAY: float = float(os.getenv("CATALOG_SNAPSHOT_REBUILD_DELAY", "2"))  # debounce after catalog writes
+    CATALOG_CHANGE_POLL_SECONDS: float = float(os.getenv("CATALOG_CHANGE_POLL_SECONDS", "1"))  # catalog_change poll interval (0 disables)
+    CATALOG_CHANGE_RETENTION_HOURS: float = float(os.getenv("CATALOG_CHANGE_RETENTION_HOURS", "24"))  # feed rows older than this are pruned
+    CATALOG_CHANGE_GAP_SECONDS: float = float(os.getenv("CATALOG_CHANGE_GAP_SECONDS", "60"))  # how long an id skipped by an out-of-order commit is re-polled
+    JOB_LOCK_DIR: str = os.getenv("JOB_LOCK_DIR", "snapshots")  # lock files serializing startup builds across the workers of a host
+    CATALOG_SNAPSHOT_CHECK_SECONDS: float = float(os.getenv("CATALOG_SNAPSHOT_CHECK_SECONDS", "1"))  # how often workers look for a rebuilt file
+    RECIPE_SEARCH_INDEX: bool = os.getenv("RECIPE_SEARCH_INDEX", "True").lower() == "true"  # run /recipes/search on the catalog snapshot when mapped
+    RECIPE_SIMILARITY_PERMUTATIONS: int = int(os.getenv("RECIPE_SIMILARITY_PERMUTATIONS", "64"))  # MinHash signature length (rebuild after changing)
+    RECIPE_SIMILARITY_BANDS: int = int(os.getenv("RECIPE_SIMILARITY_BANDS", "32"))  # LSH bands; rows per band = permutations / bands
+    RECIPE_SIMILARITY_CANDIDATES: int = int(os.getenv("RECIPE_SIMILARITY_CANDIDATES", "500"))  # LSH candidates re-ranked by exact Jaccard
+    RECIPE_NEIGHBORS_TOP_N: int = int(os.getenv("RECIPE_NEIGHBORS_TOP_N", "50"))  # co-favorited recipes kept per recipe for recommendations
+    RECIPE_NEIGHBORS_REFRESH_SECONDS: float = float(os.getenv("RECIPE_NEIGHBORS_REFRESH_SECONDS", "0"))  # full rebuild interval on a background thread (0 = off, use cron)
+    POPULARITY_FLUSH_SECONDS: float = float(os.getenv("POPULARITY_FLUSH_SECONDS", "10"))  # write-behind of view/favorite counters to recipe_popularity (0 disables)
+    TRENDING_HALF_LIFE_HOURS: float = float(os.getenv("TRENDING_HALF_LIFE_HOURS", "24"))  # a view this old counts half in /recipes/trending
+    TRENDING_FAVORITE_WEIGHT: float = float(os.getenv("TRENDING_FAVORITE_WEIGHT", "5"))  # views a new favorite is worth in trending
+    COOKABLE_TOP_N: int = int(os.getenv("COOKABLE_TOP_N", "20"))  # cookable recipes precomputed per user
+    COOKABLE_MAX_MISSING: int = int(os.getenv("COOKABLE_MAX_MISSING", "3"))  # pantry ingredients a near-makeable recipe may lack
+    COOKABLE_REFRESH_SECONDS: float = float(os.getenv("COOKABLE_REFRESH_SECONDS", "0"))  # interval for applying queued pantry/recipe changes (0 = off, use cron)
+    ASSISTANT_MODEL: str = os.getenv("ASSISTANT_MODEL", "local")  # "local" (deterministic stand-in) or "package.module:factory"
+    ASSISTANT_BATCH_SIZE: int = int(os.getenv("ASSISTANT_BATCH_SIZE", "8"))  # requests sent to the model in one call
+    ASSISTANT_BATCH_WAIT_MS: float = float(os.getenv("ASSISTANT_BATCH_WAIT_MS", "20"))  # how long a batch waits to fill
+    ASSISTANT_CACHE_SIZE: int = int(os.getenv("ASSISTANT_CACHE_SIZE", "10000"))  # replies cached per worker (0 disables)
+    ASSISTANT_CACHE_TTL_SECONDS: float = float(os.getenv("ASSISTANT_CACHE_TTL_SECONDS", "3600"))
+    ASSISTANT_MAX_CONCURRENT_PER_USER: int = int(os.getenv("ASSISTANT_MAX_CONCURRENT_PER_USER", "2"))  # requests per user waiting on the model
+    ASSISTANT_TIMEOUT_SECONDS: float = float(os.getenv("ASSISTANT_TIMEOUT_SECONDS", "30"))
+    ASSISTANT_CANDIDATES: int = int(os.getenv("ASSISTANT_CANDIDATES", "10"))  # catalog recipes offered to the model per suggestion
 
     @property
     def database_url(self):
-        # Debug logging to see what's happening
-        logger.info(f"ENVIRONMENT: '{self.ENVIRONMENT}'")
-        logger.info(f"DATABASE_HOST: '{self.DATABASE_HOST}'")
-        logger.info(f"DATABASE_USER: '{self.DATABASE_USER}'")
-        logger.info(f"DATABASE_NAME: '{self.DATABASE_NAME}'")
-        logger.info(f"DATABASE_PASSWORD set: {bool(self.DATABASE_PASSWORD)}")
-        
+        url, description = self._resolve_database_url()
+        # Resolution details are logged once, not on every access
+        global _database_url_logged
+        if not _database_url_logged:
+            _database_url_logged = True
+            logger.debug(f"ENVIRONMENT: '{self.ENVIRONMENT}'")
+            logger.debug(f"DATABASE_HOST: '{self.DATABASE_HOST}'")
+            logger.debug(f"DATABASE_USER: '{self.DATABASE_USER}'")
+            logger.debug(f"DATABASE_NAME: '{self.DATABASE_NAME}'")
+            logger.debug(f"DATABASE_PASSWORD set: {bool(self.DATABASE_PASSWORD)}")
+            logger.debug(description)
+        return url
+
+    def _resolve_database_url(self):
+        if self.DATABASE_URL:
+            return self.DATABASE_URL, "Using DATABASE_URL override"
+
         if self.ENVIRONMENT == "production" and self.DATABASE_HOST and self.DATABASE_USER and self.DATABASE_PASSWORD and self.DATABASE_NAME:
             # Handle host with or without port
             host_part = self.DATABASE_HOST
             if ":" not in host_part:
                 host_part += ":3306"  # Default to 3306 if no port specified
-            logger.info(f"Using MySQL connection: mysql+mysqlconnector://{self.DATABASE_USER}:***@{host_part}/{self.DATABASE_NAME}")
-            return f"mysql+mysqlconnector://{self.DATABASE_USER}:{self.DATABASE_PASSWORD}@{host_part}/{self.DATABASE_NAME}"
-        
-        logger.info("Using SQLite connection: sqlite:///./dev.db")
-        return "sqlite:///./dev.db"  # Default to SQLite for development
+            return (
+                f"mysql+mysqlconnector://{self.DATABASE_USER}:{self.DATABASE_PASSWORD}@{host_part}/{self.DATABASE_NAME}",
+                f"Using MySQL connection: mysql+mysqlconnector://{self.DATABASE_USER}:***@{host_part}/{self.DATABASE_NAME}",
+            )
+
+        return "sqlite:///./dev.db", "Using SQLite connection: sqlite:///./dev.db"  # Default to SQLite for development
 
     class Config:
         env_file = f".env.{os.getenv('ENVIRONMENT', 'development')}"
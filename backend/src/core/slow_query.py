@@ -0,0 +1,155 @@
+"""
+Slow query log.
+
+Statements slower than SLOW_QUERY_MS are captured with their bound-parameter
+shape (types only, never values), the repository/service method that issued
+them and their duration. A background worker then runs EXPLAIN (EXPLAIN QUERY
+PLAN on SQLite) on a separate connection and appends the entry to the JSONL
+file sink, so neither the plan nor the file write costs the request anything.
+The latest entries are kept in a ring buffer served by `GET /admin/slow-queries`.
+
+Settings:
+    SLOW_QUERY_MS         threshold in milliseconds (0 disables the log)
+    SLOW_QUERY_BUFFER     entries kept in memory
+    SLOW_QUERY_LOG        JSONL file sink ("" disables it)
+    SLOW_QUERY_EXPLAIN    capture query plans for SELECT statements
+"""
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import List, Optional
+from .settings import settings
+from .sql_timing import add_statement_observer
+
+logger = logging.getLogger(__name__)
+
+# Frames from these packages name the call site; the first one found walking up the stack wins
+_CALL_SITE_DIRS = (os.sep + os.path.join("src", "repositories") + os.sep, os.sep + os.path.join("src", "services") + os.sep)
+
+_EXPLAIN_PREFIX = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "mysql": "EXPLAIN ",
+    "mariadb": "EXPLAIN ",
+    "postgresql": "EXPLAIN ",
+}
+
+
+def parameter_shape(parameters, executemany: bool = False):
+    """Replace bound values with their type names so entries can be shared without leaking data"""
+    if executemany and parameters:
+        return {"executemany": len(parameters), "row": parameter_shape(parameters[0])}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def call_site() -> Optional[str]:
+    """`module.function:line` of the nearest repository or service frame on the current stack"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if any(directory in filename for directory in _CALL_SITE_DIRS):
+            module = frame.f_globals.get("__name__", filename)
+            function = getattr(frame.f_code, "co_qualname", frame.f_code.co_name)
+            return f"{module}.{function}:{frame.f_lineno}"
+        frame = frame.f_back
+    return None
+
+
+class SlowQueryLog:
+    def __init__(self, threshold_ms: float, capacity: int, log_path: str = "", explain: bool = True):
+        self.threshold = threshold_ms / 1000
+        self.entries = deque(maxlen=capacity)
+        self.log_path = log_path
+        self.explain = explain
+        self.engine = None
+        self._pending = queue.Queue(maxsize=capacity)
+        self._worker: Optional[threading.Thread] = None
+        self._worker_thread = threading.local()
+
+    def install(self, engine):
+        """Observe the engine's statements (idempotent)"""
+        self.engine = engine
+        add_statement_observer(engine, self._observe)
+
+    def recent(self, limit: int = 50) -> List[dict]:
+        """Newest first"""
+        return list(reversed(self.entries))[:limit]
+
+    def clear(self):
+        self.entries.clear()
+
+    def _observe(self, statement, parameters, executemany, elapsed, error):
+        if error is not None:
+            return
+        if elapsed < self.threshold or getattr(self._worker_thread, "active", False):
+            return  # fast, or one of our own EXPLAIN statements
+        entry = {
+            "time": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round(elapsed * 1000, 3),
+            "statement": statement,
+            "parameters": parameter_shape(parameters, executemany),
+            "call_site": call_site(),
+            "plan": None,
+        }
+        self.entries.append(entry)
+        try:
+            # The plan is explained with the real parameters but only the shape is stored
+            self._pending.put_nowait((entry, None if executemany else parameters))
+        except queue.Full:
+            return
+        self._ensure_worker()
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._work, name="slow-query-log", daemon=True)
+            self._worker.start()
+
+    def _work(self):
+        self._worker_thread.active = True
+        while True:
+            entry, parameters = self._pending.get()
+            if self.explain:
+                entry["plan"] = self._explain(entry["statement"], parameters)
+            if self.log_path:
+                self._write(entry)
+
+    def _explain(self, statement: str, parameters) -> Optional[List[str]]:
+        prefix = _EXPLAIN_PREFIX.get(self.engine.dialect.name)
+        if prefix is None or parameters is None or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            return None
+        try:
+            # Separate connection: never runs inside (or holds locks for) the request's transaction
+            with self.engine.connect() as conn:
+                rows = conn.exec_driver_sql(prefix + statement, parameters).fetchall()
+            return [" | ".join(str(value) for value in row) for row in rows]
+        except Exception as e:
+            return [f"EXPLAIN failed: {e}"]
+
+    def _write(self, entry: dict):
+        try:
+            os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+            with open(self.log_path, "a") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not write slow query log {self.log_path}: {e}")
+
+
+slow_query_log = SlowQueryLog(
+    settings.SLOW_QUERY_MS,
+    settings.SLOW_QUERY_BUFFER,
+    settings.SLOW_QUERY_LOG,
+    settings.SLOW_QUERY_EXPLAIN,
+)
+
+
+def install_slow_query_log(engine):
+    if settings.SLOW_QUERY_MS > 0:
+        slow_query_log.install(engine)
@@ -0,0 +1,197 @@
+"""
+Columnar (Parquet) snapshots of the catalog and user tables for analytics.
+
+Each table is read through a server-side cursor in large batches and every
+batch is written as one compressed Parquet row group, so memory stays at one
+batch per table whatever the table size. A snapshot is a directory:
+
+    <SNAPSHOT_DIR>/<UTC timestamp>/
+        recipe.parquet  recipe_ingredient.parquet  ingredient.parquet
+        user_pantry.parquet  favorite_recipe.parquet  manifest.json
+
+Files are written under a `.partial` name and renamed when complete; the
+manifest (row counts, sizes, duration) is written last, so a directory with a
+manifest is a finished snapshot.
+
+pyarrow is only imported when a snapshot is written.
+
+Usage (from the backend/ directory):
+    python -m src.core.snapshot
+    python -m src.core.snapshot --out /data/snapshots --batch-size 100000 --database-url mysql+mysqlconnector://...
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence
+
+from sqlalchemy import Boolean, DateTime, Enum, Integer, Numeric, create_engine, select
+from sqlalchemy.engine import Engine
+
+from .database import Base
+from .settings import settings
+from .. import models  # noqa: F401  (registers the tables on Base.metadata)
+
+SNAPSHOT_TABLES = ("recipe", "recipe_ingredient", "ingredient", "user_pantry", "favorite_recipe")
+MANIFEST = "manifest.json"
+
+
+class SnapshotBusy(Exception):
+    """Raised when a snapshot is requested while another one is being written"""
+
+
+def _arrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Parquet snapshots need pyarrow: pip install pyarrow")
+    return pyarrow, pyarrow.parquet
+
+
+def arrow_schema(table):
+    """Arrow schema for a SQLAlchemy table, so empty or all-NULL batches keep their column types"""
+    pa, _ = _arrow()
+    fields = []
+    for column in table.columns:
+        sql_type = column.type
+        if isinstance(sql_type, Boolean):
+            arrow_type = pa.bool_()
+        elif isinstance(sql_type, Integer):
+            arrow_type = pa.int64()
+        elif isinstance(sql_type, Numeric) and sql_type.precision is not None:
+            arrow_type = pa.decimal128(sql_type.precision, sql_type.scale or 0)
+        elif isinstance(sql_type, Numeric):
+            arrow_type = pa.float64()
+        elif isinstance(sql_type, DateTime):
+            arrow_type = pa.timestamp("us", tz="UTC" if sql_type.timezone else None)
+        else:
+            arrow_type = pa.string()  # String, Text, Enum
+        fields.append(pa.field(column.name, arrow_type, nullable=column.nullable))
+    return pa.schema(fields)
+
+
+def _column_values(sql_type, values):
+    if isinstance(sql_type, Enum):
+        return [value.value if hasattr(value, "value") else value for value in values]
+    return values
+
+
+def write_table(engine: Engine, table, path: str, batch_size: int, compression: str) -> int:
+    """Stream one table into a Parquet file, one row group per batch; returns the row count"""
+    pa, pq = _arrow()
+    schema = arrow_schema(table)
+    columns = list(table.columns)
+    rows_written = 0
+    partial = path + ".partial"
+    stmt = select(table).order_by(*table.primary_key.columns)
+    with engine.connect() as conn, pq.ParquetWriter(partial, schema, compression=compression) as writer:
+        result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(stmt)
+        for rows in result.partitions():
+            arrays = [
+                pa.array(_column_values(column.type, values), type=field.type)
+                for column, field, values in zip(columns, schema, zip(*rows))
+            ]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            rows_written += len(rows)
+    os.replace(partial, path)
+    return rows_written
+
+
+def write_snapshot(engine: Engine, out_dir: str, tables: Sequence[str] = SNAPSHOT_TABLES,
+                   batch_size: int = 50_000, compression: str = "zstd") -> dict:
+    """Write every table of a snapshot into a new timestamped directory and return its manifest"""
+    started = time.perf_counter()
+    created_at = datetime.now(timezone.utc)
+    directory = os.path.join(out_dir, created_at.strftime("%Y%m%dT%H%M%SZ"))
+    os.makedirs(directory, exist_ok=True)
+
+    manifest = {
+        "name": os.path.basename(directory),
+        "created_at": created_at.isoformat(),
+        "compression": compression,
+        "tables": {},
+    }
+    for name in tables:
+        table = Base.metadata.tables[name]
+        path = os.path.join(directory, f"{name}.parquet")
+        table_started = time.perf_counter()
+        rows = write_table(engine, table, path, batch_size, compression)
+        manifest["tables"][name] = {
+            "file": os.path.basename(path),
+            "rows": rows,
+            "bytes": os.path.getsize(path),
+            "seconds": round(time.perf_counter() - table_started, 3),
+        }
+    manifest["seconds"] = round(time.perf_counter() - started, 3)
+
+    with open(os.path.join(directory, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def list_snapshots(out_dir: str) -> List[dict]:
+    """Manifests of the finished snapshots in `out_dir`, newest first"""
+    if not os.path.isdir(out_dir):
+        return []
+    manifests = []
+    for name in sorted(os.listdir(out_dir), reverse=True):
+        path = os.path.join(out_dir, name, MANIFEST)
+        if os.path.isfile(path):
+            with open(path) as f:
+                manifests.append(json.load(f))
+    return manifests
+
+
+class SnapshotRunner:
+    """Runs one snapshot at a time on a background thread (used by the admin endpoint)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.last_error: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def start(self, engine: Engine):
+        _arrow()  # fail in the request, not on the thread, when pyarrow is missing
+        if not self._lock.acquire(blocking=False):
+            raise SnapshotBusy("A snapshot is already being written")
+        threading.Thread(target=self._run, args=(engine,), name="snapshot-writer", daemon=True).start()
+
+    def _run(self, engine: Engine):
+        try:
+            write_snapshot(engine, settings.SNAPSHOT_DIR, batch_size=settings.SNAPSHOT_BATCH_SIZE,
+                           compression=settings.SNAPSHOT_COMPRESSION)
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+        finally:
+            self._lock.release()
+
+
+snapshot_runner = SnapshotRunner()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a Parquet snapshot of the catalog and user tables")
+    parser.add_argument("--out", default=settings.SNAPSHOT_DIR, help="Directory that receives the snapshot")
+    parser.add_argument("--tables", nargs="+", choices=SNAPSHOT_TABLES, default=list(SNAPSHOT_TABLES))
+    parser.add_argument("--batch-size", type=int, default=settings.SNAPSHOT_BATCH_SIZE, help="Rows per read batch and row group")
+    parser.add_argument("--compression", default=settings.SNAPSHOT_COMPRESSION, help="Parquet codec (zstd, snappy, gzip, none)")
+    parser.add_argument("--database-url", default=None, help="Source database (defaults to the configured one)")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.database_url or settings.database_url)
+    print(f"Snapshotting {', '.join(args.tables)} from {engine.url.render_as_string(hide_password=True)}")
+    manifest = write_snapshot(engine, args.out, args.tables, args.batch_size, args.compression)
+    for name, table in manifest["tables"].items():
+        print(f"  {name:<20} {table['rows']:>10} rows {table['bytes'] / 1024:>10.0f} KiB {table['seconds']:>8.2f}s")
+    print(f"Wrote {os.path.join(args.out, manifest['name'])} in {manifest['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Statement timing shared by the SQL instrumentation.
+
+One pair of cursor listeners per engine times every statement and passes it
+to the registered observers (query counter, slow query log, tracing), so the
+start-time bookkeeping on the connection exists once. A failed statement never
+reaches after_cursor_execute: the handle_error listener drops its start time
+and reports it to the observers with the error.
+
+An observer is called as observer(statement, parameters, executemany, elapsed, error),
+with error None for a statement that succeeded.
+"""
+import logging
+import time
+import weakref
+from typing import Callable
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+_observers: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()  # engine -> [observer]
+
+
+def add_statement_observer(engine, observer: Callable):
+    """Call `observer` after every statement on the engine (idempotent)"""
+    observers = _observers.setdefault(engine, [])
+    if observer not in observers:
+        observers.append(observer)
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+def _notify(engine, statement, parameters, executemany, elapsed, error):
+    for observer in _observers.get(engine, ()):
+        observer(statement, parameters, executemany, elapsed, error)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("statement_start_time", []).append(time.perf_counter())
+    if context is not None:
+        context._statement_timed = True
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["statement_start_time"].pop()
+    if context is not None:
+        context._statement_timed = False
+    _notify(conn.engine, statement, parameters, executemany, elapsed, None)
+
+
+def _handle_error(context):
+    """Drop the failed statement's start time from the connection and report the failure"""
+    execution = context.execution_context
+    if execution is None or not getattr(execution, "_statement_timed", False):
+        return
+    execution._statement_timed = False
+    elapsed = time.perf_counter() - context.connection.info["statement_start_time"].pop()
+    try:
+        _notify(context.engine, context.statement, context.parameters, bool(execution.executemany), elapsed,
+                context.original_exception)
+    except Exception:
+        # Never replace the statement's own error with an instrumentation one
+        logger.exception("Statement observer failed")
@@ -0,0 +1,254 @@
+"""
+Lightweight in-process request tracing.
+
+A sampled request gets a trace; spans for the route handler, service and
+repository methods, each SQL statement and any explicit `span()` blocks are
+attached to it through contextvars (which also follow sync endpoints into the
+threadpool). Finished traces go to an in-memory collector served by
+`/admin/traces` and, optionally, to a JSONL file written by a background thread.
+
+When a request is not sampled the only cost per instrumented call is one
+contextvar lookup, so tracing can stay compiled in with TRACE_SAMPLE_RATE=0.
+
+Settings:
+    TRACE_SAMPLE_RATE   fraction of requests traced (0 disables; `X-Trace: 1` with a valid X-API-Key forces one)
+    TRACE_BUFFER        finished traces kept in memory
+    TRACE_LOG           JSONL file sink ("" disables it)
+"""
+import functools
+import inspect
+import hmac
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+from fastapi.routing import APIRoute
+from .settings import settings
+from .sql_timing import add_statement_observer
+
+logger = logging.getLogger(__name__)
+
+TRACE_ID_HEADER = "X-Trace-Id"
+_FORCE_HEADER = b"x-trace"
+_API_KEY_HEADER = b"x-api-key"
+
+
+class Span:
+    __slots__ = ("span_id", "parent_id", "name", "kind", "start", "duration_ms", "attributes")
+
+    def __init__(self, name: str, kind: str, parent_id: Optional[str], attributes: Optional[dict] = None):
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start = time.time()
+        self.duration_ms = None
+        self.attributes = attributes or {}
+
+    def to_dict(self) -> dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class Trace:
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self):
+        self.trace_id = uuid.uuid4().hex
+        self.spans: List[Span] = []
+
+    def to_dict(self) -> dict:
+        root = self.spans[0] if self.spans else None
+        return {
+            "trace_id": self.trace_id,
+            "name": root.name if root else None,
+            "start": root.start if root else None,
+            "duration_ms": root.duration_ms if root else None,
+            "spans": [span.to_dict() for span in self.spans],
+        }
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_trace_id() -> Optional[str]:
+    trace = _current_trace.get()
+    return trace.trace_id if trace else None
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes):
+    """Time a block as a child of the current span; a no-op outside a sampled request"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    parent = _current_span.get()
+    current = Span(name, kind, parent.span_id if parent else None, attributes)
+    trace.spans.append(current)
+    token = _current_span.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    finally:
+        current.duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        _current_span.reset(token)
+
+
+def traced(kind: str = "internal", name: Optional[str] = None):
+    """Decorator: run the function inside a span named after it"""
+    def decorate(fn):
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current_trace.get() is None:
+                return fn(*args, **kwargs)
+            with span(span_name, kind):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def trace_class(kind: str):
+    """Class decorator: trace every public method (helpers starting with `_` are left alone)"""
+    def decorate(cls):
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith("_") or not inspect.isfunction(value):
+                continue
+            setattr(cls, attr, traced(kind, f"{cls.__name__}.{attr}")(value))
+        return cls
+    return decorate
+
+
+class TracedRoute(APIRoute):
+    """Route class that wraps the whole handler (dependencies, endpoint, serialization) in a span"""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        span_name = f"{self.endpoint.__module__.rsplit('.', 1)[-1]}.{self.endpoint.__name__}"
+
+        async def traced_handler(request):
+            if _current_trace.get() is None:
+                return await handler(request)
+            with span(span_name, "router"):
+                return await handler(request)
+        return traced_handler
+
+
+def install_sql_tracing(engine):
+    """Record every statement of a sampled request as an `sql` span (idempotent)"""
+    add_statement_observer(engine, _observe_statement)
+
+
+def _observe_statement(statement, parameters, executemany, elapsed, error):
+    trace = _current_trace.get()
+    if trace is None:
+        return
+    parent = _current_span.get()
+    attributes = {"statement": statement[:500]}
+    if error is not None:
+        attributes["error"] = type(error).__name__
+    sql_span = Span("sql", "sql", parent.span_id if parent else None, attributes)
+    sql_span.start -= elapsed
+    sql_span.duration_ms = round(elapsed * 1000, 3)
+    trace.spans.append(sql_span)
+
+
+class TraceCollector:
+    """Newest finished traces in memory, plus an optional JSONL sink written off the request path"""
+
+    def __init__(self, capacity: int, log_path: str = ""):
+        self.capacity = capacity
+        self.log_path = log_path
+        self.traces: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending = queue.Queue(maxsize=1000)
+        self._worker: Optional[threading.Thread] = None
+
+    def add(self, trace: Trace):
+        data = trace.to_dict()
+        with self._lock:
+            self.traces[trace.trace_id] = data
+            while len(self.traces) > self.capacity:
+                self.traces.popitem(last=False)
+        if self.log_path:
+            try:
+                self._pending.put_nowait(data)
+            except queue.Full:
+                return
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._write, name="trace-writer", daemon=True)
+                self._worker.start()
+
+    def recent(self, limit: int) -> List[dict]:
+        with self._lock:
+            return list(reversed(self.traces.values()))[:limit]
+
+    def get(self, trace_id: str) -> Optional[dict]:
+        return self.traces.get(trace_id)
+
+    def _write(self):
+        while True:
+            data = self._pending.get()
+            try:
+                os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+                with open(self.log_path, "a") as f:
+                    f.write(json.dumps(data, default=str) + "\n")
+            except OSError as e:
+                logger.warning(f"Could not write trace log {self.log_path}: {e}")
+
+
+collector = TraceCollector(settings.TRACE_BUFFER, settings.TRACE_LOG)
+
+
+class TracingMiddleware:
+    """ASGI middleware: samples requests, opens the root span and returns the trace id header"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._sampled(scope):
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace()
+        trace_token = _current_trace.set(trace)
+
+        async def send_with_trace_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((TRACE_ID_HEADER.lower().encode(), trace.trace_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            with span(f"{scope['method']} {scope['path']}", "http") as root:
+                await self.app(scope, receive, send_with_trace_id)
+                route = scope.get("route")
+                if route is not None:
+                    root.name = f"{scope['method']} {route.path}"
+        finally:
+            _current_trace.reset(trace_token)
+            collector.add(trace)
+
+    @staticmethod
+    def _sampled(scope) -> bool:
+        headers = dict(scope.get("headers", ()))
+        force = headers.get(_FORCE_HEADER)
+        if force == b"0":
+            return False
+        # Forcing a trace costs collector memory and CPU, so only callers holding the API key may do it
+        if force == b"1" and hmac.compare_digest(headers.get(_API_KEY_HEADER, b""), settings.API_KEY.encode()):
+            return True
+        rate = settings.TRACE_SAMPLE_RATE
+        return rate > 0 and (rate >= 1 or random.random() < rate)
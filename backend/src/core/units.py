@@ -0,0 +1,84 @@
+"""
+Cooking unit normalization.
+
+Units are grouped by dimension and converted to that dimension's base unit
+(ml for volume, g for mass). Volume and mass are never converted into each
+other: that would need a density per ingredient. Count-like units ("unit",
+"cloves") and units not listed here are their own dimension, so they only
+add up with themselves.
+"""
+from decimal import Decimal
+from typing import Iterable, Optional, Tuple
+
+VOLUME, MASS = "volume", "mass"
+
+# unit -> (dimension, size in the dimension's base unit)
+UNITS = {
+    "ml": (VOLUME, Decimal("1")),
+    "l": (VOLUME, Decimal("1000")),
+    "pinch": (VOLUME, Decimal("0.3081")),  # 1/16 tsp
+    "tsp": (VOLUME, Decimal("4.92892")),
+    "tbsp": (VOLUME, Decimal("14.7868")),
+    "fl oz": (VOLUME, Decimal("29.5735")),
+    "cup": (VOLUME, Decimal("236.588")),
+    "pint": (VOLUME, Decimal("473.176")),
+    "quart": (VOLUME, Decimal("946.353")),
+    "g": (MASS, Decimal("1")),
+    "kg": (MASS, Decimal("1000")),
+    "oz": (MASS, Decimal("28.3495")),
+    "lb": (MASS, Decimal("453.592")),
+}
+
+ALIASES = {
+    "milliliter": "ml", "milliliters": "ml", "millilitre": "ml", "millilitres": "ml",
+    "liter": "l", "liters": "l", "litre": "l", "litres": "l",
+    "pinches": "pinch",
+    "teaspoon": "tsp", "teaspoons": "tsp",
+    "tablespoon": "tbsp", "tablespoons": "tbsp", "tbs": "tbsp", "tbl": "tbsp",
+    "fluid ounce": "fl oz", "fluid ounces": "fl oz", "floz": "fl oz",
+    "cups": "cup",
+    "pints": "pint", "pt": "pint",
+    "quarts": "quart", "qt": "quart",
+    "gram": "g", "grams": "g", "gr": "g",
+    "kilogram": "kg", "kilograms": "kg", "kgs": "kg",
+    "ounce": "oz", "ounces": "oz",
+    "pound": "lb", "pounds": "lb", "lbs": "lb",
+    "units": "unit", "piece": "unit", "pieces": "unit", "pc": "unit", "pcs": "unit", "whole": "unit",
+    "clove": "cloves",
+}
+
+
+def canonical_unit(unit: Optional[str]) -> str:
+    """Lowercased unit with aliases and plurals resolved; a missing unit counts as "unit" """
+    if not unit or not unit.strip():
+        return "unit"
+    key = " ".join(unit.casefold().replace(".", "").split())
+    return ALIASES.get(key, key)
+
+
+def dimension(unit: Optional[str]) -> str:
+    """Quantities in units of the same dimension can be added"""
+    unit = canonical_unit(unit)
+    return UNITS[unit][0] if unit in UNITS else unit
+
+
+def to_base(quantity: Decimal, unit: Optional[str]) -> Tuple[str, Decimal]:
+    """(dimension, quantity in the dimension's base unit)"""
+    unit = canonical_unit(unit)
+    if unit in UNITS:
+        dim, size = UNITS[unit]
+        return dim, Decimal(quantity) * size
+    return unit, Decimal(quantity)
+
+
+def from_base(quantity: Decimal, dim: str, units: Iterable[str]) -> Tuple[Decimal, str]:
+    """Express a base quantity in one of `units` (the ones it was given in): the largest in which
+    it is at least 1, else the smallest. Dimensions without conversions come back unchanged."""
+    sizes = sorted({UNITS[unit][1]: unit for unit in map(canonical_unit, units) if unit in UNITS and UNITS[unit][0] == dim}.items())
+    if not sizes:
+        return quantity, dim
+    size, unit = sizes[0]
+    for candidate_size, candidate in sizes:
+        if quantity >= candidate_size:
+            size, unit = candidate_size, candidate
+    return quantity / size, unit
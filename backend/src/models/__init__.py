@@ -5,6 +5,12 @@ from .ingredient import Ingredient, IngredientSubstitute
 from .recipe_ingredient import RecipeIngredient
 from .favorite_recipe import FavoriteRecipe
 from .user_pantry import UserPantry
+from .catalog_change import CatalogChange
+from .recipe_lsh_bucket import RecipeLshBucket
+from .recipe_neighbor import RecipeNeighbor
+from .recipe_popularity import RecipePopularity
+from .recipe_summary import RecipeSummary
+from .user_recipe_match import UserRecipeMatch, UserRecipeMatchQueue
 
 # Export all models and enums
 __all__ = [
@@ -14,4 +20,10 @@ __all__ = [
     "RecipeIngredient",
     "FavoriteRecipe",
     "UserPantry",
+    "CatalogChange",
+    "RecipeLshBucket",
+    "RecipeNeighbor",
+    "RecipePopularity",
+    "RecipeSummary",
+    "UserRecipeMatch", "UserRecipeMatchQueue",
 ]
\ No newline at end of file
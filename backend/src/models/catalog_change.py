@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class CatalogChange(Base):
+    """Append-only change feed: one row per catalog entity touched by a committed transaction.
+    The id doubles as the catalog version workers compare to invalidate their caches."""
+    __tablename__ = "catalog_change"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entity = Column(String(32), nullable=False)  # "recipe" or "ingredient"
+    changed_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
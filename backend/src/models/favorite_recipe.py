@@ -8,7 +8,7 @@ class FavoriteRecipe(Base):
     __tablename__ = "favorite_recipe"
 
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
-    recipe_id = Column(Integer, ForeignKey("recipe.id", ondelete="CASCADE"), primary_key=True)
+    recipe_id = Column(Integer, ForeignKey("recipe.id", ondelete="CASCADE"), primary_key=True, index=True)
     user_note = Column(String(500), nullable=True)
     favorited_at = Column(DateTime(timezone=True), server_default=func.now())
 
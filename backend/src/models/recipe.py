@@ -9,7 +9,7 @@ class Recipe(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
-    category = Column(String(64), nullable=True)
+    category = Column(String(64), nullable=True, index=True)
     cook_time_in_minutes = Column(Integer, nullable=True)
     prep_time_in_minutes = Column(Integer, nullable=True)
 
@@ -1,10 +1,12 @@
-from sqlalchemy import Column, Integer, DECIMAL, String, ForeignKey
+from sqlalchemy import Column, Integer, DECIMAL, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from ..core.database import Base
 
 
 class RecipeIngredient(Base):
     __tablename__ = "recipe_ingredient"
+    # The primary key serves lookups by recipe; searches by ingredient need the reverse order
+    __table_args__ = (Index("ix_recipe_ingredient_ingredient_recipe", "ingredient_id", "recipe_id"),)
 
     recipe_id = Column(Integer, ForeignKey("recipe.id", ondelete="CASCADE"), primary_key=True)
     ingredient_id = Column(Integer, ForeignKey("ingredient.id", ondelete="CASCADE"), primary_key=True)
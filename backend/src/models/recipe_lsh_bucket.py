@@ -0,0 +1,11 @@
+from sqlalchemy import BigInteger, Column, ForeignKey, Integer
+from ..core.database import Base
+
+
+class RecipeLshBucket(Base):
+    """MinHash LSH index over recipe ingredient sets: one row per (band key, recipe).
+    Recipes sharing a key are candidates for /recipes/{id}/similar (see core/recipe_similarity)."""
+    __tablename__ = "recipe_lsh_bucket"
+
+    bucket = Column(BigInteger, primary_key=True, autoincrement=False)
+    recipe_id = Column(Integer, ForeignKey("recipe.id", ondelete="CASCADE"), primary_key=True, index=True)
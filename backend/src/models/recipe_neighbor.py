@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Float, ForeignKey, Integer
+from ..core.database import Base
+
+
+class RecipeNeighbor(Base):
+    """Item-item co-occurrence of favorites: the top RECIPE_NEIGHBORS_TOP_N recipes favorited by the
+    same users as `recipe_id`, both directions stored (see core/recipe_neighbors)."""
+    __tablename__ = "recipe_neighbor"
+
+    recipe_id = Column(Integer, ForeignKey("recipe.id", ondelete="CASCADE"), primary_key=True)
+    neighbor_id = Column(Integer, ForeignKey("recipe.id", ondelete="CASCADE"), primary_key=True)
+    shared = Column(Integer, nullable=False)  # users who favorited both
+    score = Column(Float, nullable=False)  # cosine: shared / sqrt(favorites of recipe * favorites of neighbor)
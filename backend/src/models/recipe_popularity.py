@@ -0,0 +1,15 @@
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer
+from ..core.database import Base
+
+
+class RecipePopularity(Base):
+    """Per-recipe counters behind /recipes/popular and /recipes/trending, written behind by
+    every worker's in-memory counters (see core/popularity)."""
+    __tablename__ = "recipe_popularity"
+
+    recipe_id = Column(Integer, ForeignKey("recipe.id", ondelete="CASCADE"), primary_key=True, autoincrement=False)
+    favorites = Column(Integer, nullable=False, default=0)
+    views = Column(Integer, nullable=False, default=0)
+    trending = Column(Float, nullable=False, default=0.0)  # forward-decayed views + favorites, relative to the era start
+    trending_era = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=True, index=True)  # database time of the last write; workers reload only rows changed since their last reload
@@ -0,0 +1,20 @@
+from sqlalchemy import JSON, Column, ForeignKey, Integer, String
+from ..core.database import Base
+
+
+class RecipeSummary(Base):
+    """Denormalized read model: one row per recipe with what list and matching views need, so they
+    read one table instead of joining recipe_ingredient, ingredient and favorite_recipe.
+    Written in the same transaction as the source rows (see core/recipe_summary)."""
+    __tablename__ = "recipe_summary"
+
+    recipe_id = Column(Integer, ForeignKey("recipe.id", ondelete="CASCADE"), primary_key=True, autoincrement=False)
+    name = Column(String(255), nullable=False)
+    category = Column(String(64), nullable=True, index=True)
+    cook_time_in_minutes = Column(Integer, nullable=True)
+    prep_time_in_minutes = Column(Integer, nullable=True)
+    total_time_in_minutes = Column(Integer, nullable=True)  # cook + prep; NULL when both are unknown
+    ingredient_count = Column(Integer, nullable=False, default=0)
+    ingredient_ids = Column(JSON, nullable=False)  # sorted by ingredient id
+    ingredient_names = Column(JSON, nullable=False)  # same order as ingredient_ids
+    favorite_count = Column(Integer, nullable=False, default=0)
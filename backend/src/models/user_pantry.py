@@ -7,7 +7,7 @@ class UserPantry(Base):
     __tablename__ = "user_pantry"
 
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
-    ingredient_id = Column(Integer, ForeignKey("ingredient.id", ondelete="CASCADE"), primary_key=True)
+    ingredient_id = Column(Integer, ForeignKey("ingredient.id", ondelete="CASCADE"), primary_key=True, index=True)
     quantity = Column(DECIMAL(10, 2), nullable=False)
     unit = Column(String(32), nullable=True)
 
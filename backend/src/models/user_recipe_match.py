@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Float, ForeignKey, Integer
+from ..core.database import Base
+
+
+class UserRecipeMatch(Base):
+    """Precomputed "what can I cook": the top COOKABLE_TOP_N recipes each user can make, or nearly
+    make, from their pantry, in rank order (see core/cookable)."""
+    __tablename__ = "user_recipe_match"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    rank = Column(Integer, primary_key=True, autoincrement=False)  # 0 = best
+    recipe_id = Column(Integer, ForeignKey("recipe.id", ondelete="CASCADE"), nullable=False, index=True)
+    matched = Column(Integer, nullable=False)  # recipe ingredients in the pantry
+    missing = Column(Integer, nullable=False)  # recipe ingredients not in the pantry
+    match_percentage = Column(Float, nullable=False)
+
+
+class UserRecipeMatchQueue(Base):
+    """Pantries and recipes changed since user_recipe_match was last refreshed; drained by
+    core/cookable.refresh_pending. No foreign keys: deleted users and recipes must stay queued."""
+    __tablename__ = "user_recipe_match_queue"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, nullable=True)
+    recipe_id = Column(Integer, nullable=True)
@@ -3,8 +3,12 @@ from typing import List, Optional
 from ..models.favorite_recipe import FavoriteRecipe
 from ..models.recipe import Recipe
 from ..schemas.favorite_recipe import FavoriteRecipeCreate, FavoriteRecipeUpdate
+from ..core.tracing import trace_class
+from ..core.recipe_neighbors import update_neighbors
+from ..core.recipe_summary import refresh_favorite_counts
 
 
+@trace_class("repository")
 class FavoriteRecipeRepository:
     def __init__(self, db: Session):
         self.db = db
@@ -34,6 +38,9 @@ class FavoriteRecipeRepository:
             user_note=favorite_data.user_note
         )
         self.db.add(db_favorite)
+        self.db.flush()
+        refresh_favorite_counts(self.db.connection(), [favorite_data.recipe_id])
+        update_neighbors(self.db.connection(), user_id, favorite_data.recipe_id)
         self.db.commit()
         self.db.refresh(db_favorite)
         return db_favorite
@@ -57,6 +64,9 @@ class FavoriteRecipeRepository:
             return False
 
         self.db.delete(db_favorite)
+        self.db.flush()
+        refresh_favorite_counts(self.db.connection(), [recipe_id])
+        update_neighbors(self.db.connection(), user_id, recipe_id)
         self.db.commit()
         return True
 
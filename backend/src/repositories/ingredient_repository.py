@@ -2,8 +2,12 @@ from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from ..models.ingredient import Ingredient, IngredientSubstitute
 from ..schemas.ingredient import IngredientCreate, IngredientUpdate
+from ..core.tracing import trace_class
+from ..core.cookable import queue_recipes, queue_users
+from ..core.recipe_summary import refresh_summaries, refresh_summaries_using
 
 
+@trace_class("repository")
 class IngredientRepository:
     def __init__(self, db: Session):
         self.db = db
@@ -47,12 +51,22 @@ class IngredientRepository:
         return (
             self.db.query(Ingredient)
             .options(joinedload(Ingredient.substitutes))
-            .filter(Ingredient.name.ilike(f"%{name}%"))
+            .filter(Ingredient.name.icontains(name, autoescape=True))
             .offset(skip)
             .limit(limit)
             .all()
         )
 
+    def get_unique_categories(self) -> List[str]:
+        rows = (
+            self.db.query(Ingredient.category)
+            .filter(Ingredient.category.isnot(None))
+            .distinct()
+            .order_by(Ingredient.category)
+            .all()
+        )
+        return [row[0] for row in rows]
+
     def create(self, ingredient_data: IngredientCreate) -> Ingredient:
         db_ingredient = Ingredient(
             name=ingredient_data.name,
@@ -72,6 +86,9 @@ class IngredientRepository:
         for field, value in update_data.items():
             setattr(db_ingredient, field, value)
 
+        if "name" in update_data:
+            self.db.flush()
+            refresh_summaries_using(self.db.connection(), ingredient_id)
         self.db.commit()
         self.db.refresh(db_ingredient)
         return db_ingredient
@@ -81,7 +98,13 @@ class IngredientRepository:
         if not db_ingredient:
             return False
 
+        recipe_ids = [recipe_ingredient.recipe_id for recipe_ingredient in db_ingredient.recipe_ingredients]
+        user_ids = [pantry.user_id for pantry in db_ingredient.user_pantries]
         self.db.delete(db_ingredient)
+        self.db.flush()
+        refresh_summaries(self.db.connection(), recipe_ids)
+        queue_recipes(self.db.connection(), recipe_ids)
+        queue_users(self.db.connection(), user_ids)
         self.db.commit()
         return True
 
@@ -1,11 +1,15 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload
 from typing import List, Optional
 from ..models.recipe import Recipe, RecipeStep
 from ..models.recipe_ingredient import RecipeIngredient
 from ..models.ingredient import Ingredient
 from ..schemas.recipe import RecipeCreate, RecipeUpdate
+from ..core.tracing import trace_class
+from ..core.cookable import queue_recipes
+from ..core.recipe_summary import refresh_summaries
 
 
+@trace_class("repository")
 class RecipeRepository:
     def __init__(self, db: Session):
         self.db = db
@@ -22,6 +26,17 @@ class RecipeRepository:
             .all()
         )
 
+    def get_summaries(self, skip: int = 0, limit: int = 100, category: Optional[str] = None, search: Optional[str] = None):
+        """Narrow SELECT on the recipe table only (no ingredient/step joins) for list views"""
+        query = self.db.query(
+            Recipe.id, Recipe.name, Recipe.category, Recipe.cook_time_in_minutes, Recipe.prep_time_in_minutes
+        )
+        if search:
+            query = query.filter(Recipe.name.icontains(search, autoescape=True))
+        elif category:
+            query = query.filter(Recipe.category == category)
+        return query.order_by(Recipe.id).offset(skip).limit(limit).all()
+
     def get_by_id(self, recipe_id: int) -> Optional[Recipe]:
         return (
             self.db.query(Recipe)
@@ -33,6 +48,20 @@ class RecipeRepository:
             .first()
         )
 
+    def get_by_ids(self, recipe_ids: List[int]) -> List[Recipe]:
+        """Several recipes with ingredients and steps, batch-loaded (no order)"""
+        if not recipe_ids:
+            return []
+        return (
+            self.db.query(Recipe)
+            .options(
+                selectinload(Recipe.recipe_ingredients).joinedload(RecipeIngredient.ingredient),
+                selectinload(Recipe.recipe_steps)
+            )
+            .filter(Recipe.id.in_(recipe_ids))
+            .all()
+        )
+
     def get_by_category(self, category: str, skip: int = 0, limit: int = 100) -> List[Recipe]:
         return (
             self.db.query(Recipe)
@@ -53,7 +82,7 @@ class RecipeRepository:
                 joinedload(Recipe.recipe_ingredients).joinedload(RecipeIngredient.ingredient),
                 joinedload(Recipe.recipe_steps)
             )
-            .filter(Recipe.name.ilike(f"%{name}%"))
+            .filter(Recipe.name.icontains(name, autoescape=True))
             .offset(skip)
             .limit(limit)
             .all()
@@ -90,6 +119,9 @@ class RecipeRepository:
             )
             self.db.add(db_recipe_step)
 
+        self.db.flush()
+        refresh_summaries(self.db.connection(), [db_recipe.id])
+        queue_recipes(self.db.connection(), [db_recipe.id])
         self.db.commit()
         self.db.refresh(db_recipe)
         return db_recipe
@@ -103,6 +135,8 @@ class RecipeRepository:
         for field, value in update_data.items():
             setattr(db_recipe, field, value)
 
+        self.db.flush()
+        refresh_summaries(self.db.connection(), [recipe_id])
         self.db.commit()
         self.db.refresh(db_recipe)
         return db_recipe
@@ -113,5 +147,8 @@ class RecipeRepository:
             return False
 
         self.db.delete(db_recipe)
+        self.db.flush()
+        refresh_summaries(self.db.connection(), [recipe_id])
+        queue_recipes(self.db.connection(), [recipe_id])
         self.db.commit()
         return True
\ No newline at end of file
@@ -3,8 +3,11 @@ from typing import List, Optional
 from ..models.user_pantry import UserPantry
 from ..models.ingredient import Ingredient
 from ..schemas.user_pantry import UserPantryCreate, UserPantryUpdate
+from ..core.cookable import queue_users
+from ..core.tracing import trace_class
 
 
+@trace_class("repository")
 class UserPantryRepository:
     def __init__(self, db: Session):
         self.db = db
@@ -35,6 +38,7 @@ class UserPantryRepository:
             unit=pantry_data.unit
         )
         self.db.add(db_pantry)
+        queue_users(self.db.connection(), [user_id])
         self.db.commit()
         self.db.refresh(db_pantry)
         return db_pantry
@@ -58,6 +62,7 @@ class UserPantryRepository:
             return False
 
         self.db.delete(db_pantry)
+        queue_users(self.db.connection(), [user_id])
         self.db.commit()
         return True
 
@@ -3,8 +3,12 @@ from sqlalchemy.exc import IntegrityError
 from typing import Optional, List
 from ..models.user import User, UserRole
 from ..schemas.user import UserCreate, UserUpdate
+from ..core.tracing import trace_class
+from ..core.cookable import queue_users
+from ..core.recipe_summary import refresh_favorite_counts
 
 
+@trace_class("repository")
 class UserRepository:
     def __init__(self, db: Session):
         self.db = db
@@ -60,7 +64,11 @@ class UserRepository:
         if not db_user:
             return False
         
+        favorited = [favorite.recipe_id for favorite in db_user.favorite_recipes]
         self.db.delete(db_user)
+        self.db.flush()
+        refresh_favorite_counts(self.db.connection(), favorited)
+        queue_users(self.db.connection(), [user_id])
         self.db.commit()
         return True
 
@@ -0,0 +1,243 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Literal
+from ..core.dependencies import get_api_key
+from ..core.profiling import ProfilerBusy, cpu_profiler, memory_profiler, top_allocations, diff_allocations, tracemalloc_memory
+from ..core.slow_query import slow_query_log
+from ..core.snapshot import SnapshotBusy, snapshot_runner, list_snapshots
+from ..core.catalog_snapshot import catalog_snapshot
+from ..core.change_feed import change_feed
+from ..core.recipe_similarity import rebuild_index as rebuild_similarity_index
+from ..core.jobs import JobBusy
+from ..core.recipe_neighbors import neighbor_refresher
+from ..core.popularity import popularity_counters, recount_favorites
+from ..core.recipe_summary import rebuild_summaries
+from ..core.cookable import cookable_job, pending_changes, rebuild_all as rebuild_cookable
+from ..core.assistant import assistant_batcher, response_cache
+from ..core.database import engine
+from ..core.settings import settings
+from ..core.tracing import collector
+from ..schemas.admin import SlowQuery, MemorySnapshot, MemoryDiff, Trace, TraceSummary, Snapshot, CatalogSnapshotStats, CatalogChanges, SimilarityIndexStats, RecipeNeighborStatus, PopularityStats, RecipeSummaryStats, CookableStatus, AssistantStats
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(get_api_key)]
+)
+
+
+@router.get("/slow-queries", response_model=List[SlowQuery])
+def get_slow_queries(limit: int = Query(50, ge=1, le=1000)):
+    """Most recent statements over SLOW_QUERY_MS, newest first, with their captured plans"""
+    return slow_query_log.recent(limit)
+
+
+@router.delete("/slow-queries")
+def clear_slow_queries():
+    """Empty the in-memory slow query buffer (the file sink is kept)"""
+    slow_query_log.clear()
+    return {"message": "Slow query log cleared"}
+
+
+@router.get("/profile/cpu")
+def profile_cpu(
+    seconds: float = Query(10, gt=0, le=120),
+    interval_ms: float = Query(5, ge=1, le=1000),
+    format: Literal["collapsed", "pstats"] = Query("collapsed"),
+    include_idle: bool = Query(False, description="Keep samples of threads blocked on locks, queues and sockets")
+):
+    """Sample every thread of this worker for `seconds`, then download the profile"""
+    try:
+        profile = cpu_profiler.profile(seconds, interval_ms / 1000, include_idle)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    if format == "pstats":
+        return Response(
+            content=profile.pstats(),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": 'attachment; filename="cpu.pstats"'},
+        )
+    return Response(content=profile.collapsed(), media_type="text/plain")
+
+
+@router.post("/profile/memory/start")
+def start_memory_tracing(frames: int = Query(10, ge=1, le=100)):
+    """Start tracemalloc, recording `frames` frames per allocation (slows allocations while on)"""
+    memory_profiler.start(frames)
+    return {"message": "Memory tracing started", "frames": frames}
+
+
+@router.post("/profile/memory/stop")
+def stop_memory_tracing():
+    """Stop tracemalloc and drop the stored snapshots"""
+    memory_profiler.stop()
+    return {"message": "Memory tracing stopped"}
+
+
+@router.post("/profile/memory/snapshots", response_model=MemorySnapshot, status_code=201)
+def take_memory_snapshot(
+    limit: int = Query(25, ge=1, le=500),
+    group_by: Literal["lineno", "filename", "traceback"] = Query("lineno")
+):
+    """Take a tracemalloc snapshot and return its largest allocation sites"""
+    if not memory_profiler.tracing:
+        raise HTTPException(status_code=409, detail="Memory tracing is not running")
+    snapshot_id, taken_at, snapshot = memory_profiler.take()
+    traced, peak = tracemalloc_memory()
+    return MemorySnapshot(
+        id=snapshot_id,
+        taken_at=taken_at,
+        traced_kib=round(traced / 1024, 1),
+        peak_kib=round(peak / 1024, 1),
+        top=top_allocations(snapshot, group_by, limit),
+    )
+
+
+@router.get("/profile/memory/diff", response_model=MemoryDiff)
+def diff_memory_snapshots(
+    before: int,
+    after: int,
+    limit: int = Query(25, ge=1, le=500),
+    group_by: Literal["lineno", "filename", "traceback"] = Query("lineno")
+):
+    """Allocation growth between two snapshots, largest first"""
+    old, new = memory_profiler.get(before), memory_profiler.get(after)
+    if old is None or new is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    return MemoryDiff(before=before, after=after, stats=diff_allocations(old, new, group_by, limit))
+
+
+@router.get("/traces", response_model=List[TraceSummary])
+def get_traces(limit: int = Query(20, ge=1, le=1000)):
+    """Most recent sampled request traces, newest first"""
+    return [
+        TraceSummary(trace_id=t["trace_id"], name=t["name"], start=t["start"], duration_ms=t["duration_ms"], span_count=len(t["spans"]))
+        for t in collector.recent(limit)
+    ]
+
+
+@router.get("/traces/{trace_id}", response_model=Trace)
+def get_trace(trace_id: str):
+    """All spans of one trace, in start order (`parent_id` links them into a tree)"""
+    trace = collector.get(trace_id)
+    if not trace:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return trace
+
+
+@router.post("/snapshots", status_code=202)
+def create_snapshot():
+    """Start writing a Parquet snapshot of the catalog and user tables in the background"""
+    try:
+        snapshot_runner.start(engine)
+    except SnapshotBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    return {"message": "Snapshot started", "directory": settings.SNAPSHOT_DIR}
+
+
+@router.get("/snapshots", response_model=List[Snapshot])
+def get_snapshots(response: Response):
+    """Finished snapshots in SNAPSHOT_DIR, newest first (`X-Snapshot-Running` tells if one is in progress)"""
+    response.headers["X-Snapshot-Running"] = "1" if snapshot_runner.running else "0"
+    if snapshot_runner.last_error:
+        response.headers["X-Snapshot-Error"] = snapshot_runner.last_error[:200]
+    return list_snapshots(settings.SNAPSHOT_DIR)
+
+
+@router.get("/catalog-snapshot", response_model=CatalogSnapshotStats)
+def get_catalog_snapshot():
+    """The memory-mapped catalog snapshot this worker is serving from"""
+    snapshot = catalog_snapshot.get()
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Catalog snapshot is disabled or not built yet")
+    return snapshot.stats()
+
+
+@router.post("/catalog-snapshot/rebuild", response_model=CatalogSnapshotStats)
+def rebuild_catalog_snapshot():
+    """Rebuild the catalog snapshot now; other workers pick the new file up within CATALOG_SNAPSHOT_CHECK_SECONDS"""
+    if not catalog_snapshot.enabled:
+        raise HTTPException(status_code=404, detail="Catalog snapshot is disabled")
+    return catalog_snapshot.rebuild().stats()
+
+
+@router.get("/catalog-changes", response_model=CatalogChanges)
+def get_catalog_changes(since: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=1000)):
+    """Catalog change feed entries after version `since`, oldest first, and the version this worker has seen"""
+    return CatalogChanges(version=change_feed.version, changes=change_feed.changes_since(since, limit))
+
+
+@router.post("/recipe-similarity/rebuild", response_model=SimilarityIndexStats)
+def rebuild_recipe_similarity():
+    """Recompute the MinHash LSH buckets of every recipe (after changing the RECIPE_SIMILARITY_* settings)"""
+    return rebuild_similarity_index(engine)
+
+
+@router.get("/recipe-neighbors", response_model=RecipeNeighborStatus)
+def get_recipe_neighbors():
+    """Whether this worker is rebuilding the co-favorite neighbor lists, and how its last rebuild went"""
+    return RecipeNeighborStatus(running=neighbor_refresher.running, last_run=neighbor_refresher.last_run,
+                                last_error=neighbor_refresher.last_error)
+
+
+@router.post("/recipe-neighbors/rebuild", status_code=202)
+def rebuild_recipe_neighbors():
+    """Start recomputing the co-favorite neighbor lists from every favorite in the background"""
+    try:
+        neighbor_refresher.trigger(engine)
+    except JobBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"message": "Recipe neighbor rebuild started"}
+
+
+@router.post("/popularity/rebuild", response_model=PopularityStats)
+def rebuild_popularity():
+    """Recount favorites per recipe into recipe_popularity (after deleting users or loading favorites with SQL)"""
+    popularity_counters.flush()
+    stats = recount_favorites(engine)
+    popularity_counters.reload()
+    return stats
+
+
+@router.post("/recipe-summary/rebuild", response_model=RecipeSummaryStats)
+def rebuild_recipe_summary():
+    """Recompute every recipe_summary row (after loading recipes, ingredients or favorites with SQL)"""
+    return rebuild_summaries(engine)
+
+
+@router.get("/cookable", response_model=CookableStatus)
+def get_cookable():
+    """Queued pantry / recipe changes, and how this worker's last cookable refresh or rebuild went"""
+    with engine.connect() as conn:
+        pending = pending_changes(conn)
+    return CookableStatus(running=cookable_job.running, pending=pending, last_run=cookable_job.last_run,
+                          last_error=cookable_job.last_error)
+
+
+@router.post("/cookable/rebuild", status_code=202)
+def rebuild_cookable_recipes():
+    """Start recomputing every user's cookable recipes in the background (after changing the COOKABLE_* settings)"""
+    try:
+        cookable_job.trigger(engine, rebuild_cookable)
+    except JobBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"message": "Cookable recipe rebuild started"}
+
+
+@router.get("/assistant", response_model=AssistantStats)
+def get_assistant_stats():
+    """This worker's assistant model, response cache and batching counters"""
+    return AssistantStats(
+        model=assistant_batcher.model.name if assistant_batcher.model else None,
+        cache_entries=len(response_cache), cache_hits=response_cache.hits, cache_misses=response_cache.misses,
+        model_calls=assistant_batcher.batches, model_requests=assistant_batcher.requests, pending=assistant_batcher.pending,
+    )
+
+
+@router.post("/assistant/cache/clear", response_model=AssistantStats)
+def clear_assistant_cache():
+    """Drop this worker's cached assistant replies (after switching ASSISTANT_MODEL or changing prompts)"""
+    response_cache.clear()
+    return get_assistant_stats()
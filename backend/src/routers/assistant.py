@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+from ..core.assistant import AssistantBusy
+from ..core.database import get_db
+from ..core.dependencies import get_api_key
+from ..core.tracing import TracedRoute
+from ..core.responses import FastJSONResponse
+from ..services.assistant_service import AssistantService
+from ..schemas.assistant import RecipeSuggestion, RecipeSuggestionRequest, SalvageAdvice, SalvageRequest
+
+router = APIRouter(
+    prefix="/assistant",
+    tags=["assistant"],
+    dependencies=[Depends(get_api_key)],
+    route_class=TracedRoute
+)
+
+
+def _client(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+@router.post("/recipe", response_model=RecipeSuggestion)
+def suggest_recipe(body: RecipeSuggestionRequest, request: Request, db: Session = Depends(get_db)):
+    """A catalog recipe to cook from the ingredients on hand, guided by an optional free-text prompt
+    (guests may leave out `user_id`)"""
+    try:
+        suggestion = AssistantService(db).suggest_recipe(body, _client(request))
+    except AssistantBusy as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except TimeoutError:
+        raise HTTPException(status_code=504, detail="The assistant did not answer in time")
+    if suggestion is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return FastJSONResponse(suggestion)
+
+
+@router.post("/salvage", response_model=SalvageAdvice)
+def salvage_meal(body: SalvageRequest, request: Request, db: Session = Depends(get_db)):
+    """How to rescue a recipe after a mistake while cooking, or when the finished dish tastes wrong"""
+    try:
+        advice = AssistantService(db).salvage(body, _client(request))
+    except AssistantBusy as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except TimeoutError:
+        raise HTTPException(status_code=504, detail="The assistant did not answer in time")
+    if advice is None:
+        raise HTTPException(status_code=404, detail="User or recipe not found")
+    return FastJSONResponse(advice)
@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from ..core.database import get_db, SessionLocal
+from ..core.dependencies import get_api_key
+from ..core.tracing import TracedRoute
+from ..core.responses import dumps
+from ..services.export_service import ExportService
+
+router = APIRouter(
+    prefix="/export",
+    tags=["export"],
+    dependencies=[Depends(get_api_key)],
+    route_class=TracedRoute
+)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _ndjson(export, batch_size: int, *args, kind: str = None):
+    """Run one export on its own sessions and encode each batch as NDJSON lines.
+
+    The request-scoped session from `get_db` is closed before a streaming body
+    is sent, so the generator opens (and always closes) the ones it reads from.
+    """
+    stream_db, lookup_db = SessionLocal(), SessionLocal()
+    try:
+        service = ExportService(stream_db, lookup_db, batch_size)
+        for batch in getattr(service, export)(*args):
+            if kind:
+                batch = [{"type": kind, "data": item} for item in batch]
+            yield b"".join(dumps(item) + b"\n" for item in batch)
+    finally:
+        stream_db.close()
+        lookup_db.close()
+
+
+def _user_ndjson(user_id: int, batch_size: int):
+    yield from _ndjson("stream_user_pantry", batch_size, user_id, kind="pantry")
+    yield from _ndjson("stream_user_favorites", batch_size, user_id, kind="favorite")
+
+
+def _attachment(filename: str) -> dict:
+    return {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+
+@router.get("/recipes", response_class=StreamingResponse)
+def export_recipes(batch_size: int = Query(500, ge=1, le=10000)):
+    """Every recipe with its ingredients and steps, one JSON object per line"""
+    return StreamingResponse(
+        _ndjson("stream_recipes", batch_size), media_type=NDJSON_MEDIA_TYPE, headers=_attachment("recipes.ndjson")
+    )
+
+
+@router.get("/ingredients", response_class=StreamingResponse)
+def export_ingredients(batch_size: int = Query(500, ge=1, le=10000)):
+    """Every ingredient with its substitutes, one JSON object per line"""
+    return StreamingResponse(
+        _ndjson("stream_ingredients", batch_size), media_type=NDJSON_MEDIA_TYPE, headers=_attachment("ingredients.ndjson")
+    )
+
+
+@router.get("/users/{user_id}", response_class=StreamingResponse)
+def export_user_data(user_id: int, batch_size: int = Query(500, ge=1, le=10000), db: Session = Depends(get_db)):
+    """A user's pantry and favorites as `{"type": "pantry" | "favorite", "data": {...}}` lines"""
+    if not ExportService(db, db).user_exists(user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+    return StreamingResponse(
+        _user_ndjson(user_id, batch_size), media_type=NDJSON_MEDIA_TYPE, headers=_attachment(f"user-{user_id}.ndjson")
+    )
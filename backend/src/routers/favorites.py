@@ -1,15 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from ..core.database import get_db
 from ..core.dependencies import get_api_key
+from ..core.tracing import TracedRoute
+from ..core.responses import FastJSONResponse
+from ..core.fields import parse_fields, project, project_all
 from ..services.favorite_recipe_service import FavoriteRecipeService
 from ..schemas.favorite_recipe import FavoriteRecipe, FavoriteRecipeCreate, FavoriteRecipeUpdate
 
 router = APIRouter(
     prefix="/users/{user_id}/favorites",
     tags=["favorites"],
-    dependencies=[Depends(get_api_key)]
+    dependencies=[Depends(get_api_key)],
+    route_class=TracedRoute
 )
 
 
@@ -18,21 +22,29 @@ def get_user_favorites(
     user_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = Query(None, description="Comma-separated top-level fields to return, e.g. `recipe_id,recipe_name`"),
     db: Session = Depends(get_db)
 ):
     """Get all favorite recipes for a user"""
     service = FavoriteRecipeService(db)
-    return service.get_user_favorites(user_id, skip, limit)
+    selected = parse_fields(fields, FavoriteRecipe)
+    return FastJSONResponse(project_all(service.get_user_favorites(user_id, skip, limit), selected))
 
 
 @router.get("/{recipe_id}", response_model=FavoriteRecipe)
-def get_favorite(user_id: int, recipe_id: int, db: Session = Depends(get_db)):
+def get_favorite(
+    user_id: int,
+    recipe_id: int,
+    fields: Optional[str] = Query(None, description="Comma-separated top-level fields to return"),
+    db: Session = Depends(get_db)
+):
     """Get a specific favorite recipe"""
     service = FavoriteRecipeService(db)
+    selected = parse_fields(fields, FavoriteRecipe)
     favorite = service.get_favorite(user_id, recipe_id)
     if not favorite:
         raise HTTPException(status_code=404, detail="Favorite recipe not found")
-    return favorite
+    return FastJSONResponse(project(favorite, selected))
 
 
 @router.post("/", response_model=FavoriteRecipe, status_code=201)
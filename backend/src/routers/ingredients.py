@@ -1,15 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional
 from ..core.database import get_db
 from ..core.dependencies import get_api_key
+from ..core.tracing import TracedRoute
+from ..core.responses import FastJSONResponse
+from ..core.fields import parse_fields, project, project_all
 from ..services.ingredient_service import IngredientService
-from ..schemas.ingredient import Ingredient, IngredientCreate, IngredientUpdate, IngredientSubstituteCreate
+from ..schemas.ingredient import Ingredient, IngredientCreate, IngredientUpdate, IngredientSubstituteCreate, IngredientNames
 
 router = APIRouter(
     prefix="/ingredients",
     tags=["ingredients"],
-    dependencies=[Depends(get_api_key)]
+    dependencies=[Depends(get_api_key)],
+    route_class=TracedRoute
 )
 
 
@@ -19,17 +23,20 @@ def get_ingredients(
     limit: int = Query(100, ge=1, le=1000),
     category: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma-separated top-level fields to return, e.g. `id,name`"),
     db: Session = Depends(get_db)
 ):
     """Get all ingredients with optional filtering"""
     service = IngredientService(db)
+    selected = parse_fields(fields, Ingredient)
     
     if search:
-        return service.search_ingredients(search, skip, limit)
+        ingredients = service.search_ingredients(search, skip, limit)
     elif category:
-        return service.get_ingredients_by_category(category, skip, limit)
+        ingredients = service.get_ingredients_by_category(category, skip, limit)
     else:
-        return service.get_all_ingredients(skip, limit)
+        ingredients = service.get_all_ingredients(skip, limit)
+    return FastJSONResponse(project_all(ingredients, selected))
 
 
 @router.get("/categories", response_model=List[str])
@@ -39,14 +46,26 @@ def get_ingredient_categories(db: Session = Depends(get_db)):
     return service.get_unique_categories()
 
 
+@router.post("/resolve", response_model=Dict[str, Optional[int]])
+def resolve_ingredient_names(body: IngredientNames, db: Session = Depends(get_db)):
+    """Resolve ingredient names (case-insensitive) to ids in one call; unknown names map to null"""
+    service = IngredientService(db)
+    return service.resolve_names(body.names)
+
+
 @router.get("/{ingredient_id}", response_model=Ingredient)
-def get_ingredient(ingredient_id: int, db: Session = Depends(get_db)):
+def get_ingredient(
+    ingredient_id: int,
+    fields: Optional[str] = Query(None, description="Comma-separated top-level fields to return"),
+    db: Session = Depends(get_db)
+):
     """Get a specific ingredient by ID"""
     service = IngredientService(db)
+    selected = parse_fields(fields, Ingredient)
     ingredient = service.get_ingredient_by_id(ingredient_id)
     if not ingredient:
         raise HTTPException(status_code=404, detail="Ingredient not found")
-    return ingredient
+    return FastJSONResponse(project(ingredient, selected))
 
 
 @router.post("/", response_model=Ingredient, status_code=201)
@@ -3,13 +3,17 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..core.database import get_db
 from ..core.dependencies import get_api_key
+from ..core.tracing import TracedRoute
+from ..core.responses import FastJSONResponse
+from ..core.fields import parse_fields, project, project_all
 from ..services.user_pantry_service import UserPantryService
 from ..schemas.user_pantry import UserPantry, UserPantryCreate, UserPantryUpdate
 
 router = APIRouter(
     prefix="/users/{user_id}/pantry",
     tags=["pantry"],
-    dependencies=[Depends(get_api_key)]
+    dependencies=[Depends(get_api_key)],
+    route_class=TracedRoute
 )
 
 
@@ -19,32 +23,44 @@ def get_user_pantry(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     category: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma-separated top-level fields to return, e.g. `ingredient_name,quantity`"),
     db: Session = Depends(get_db)
 ):
     """Get all pantry items for a user"""
     service = UserPantryService(db)
+    selected = parse_fields(fields, UserPantry)
     
     if category:
-        return service.get_pantry_by_category(user_id, category, skip, limit)
+        items = service.get_pantry_by_category(user_id, category, skip, limit)
     else:
-        return service.get_user_pantry(user_id, skip, limit)
+        items = service.get_user_pantry(user_id, skip, limit)
+    return FastJSONResponse(project_all(items, selected))
 
 
 @router.get("/{ingredient_id}", response_model=UserPantry)
-def get_pantry_item(user_id: int, ingredient_id: int, db: Session = Depends(get_db)):
+def get_pantry_item(
+    user_id: int,
+    ingredient_id: int,
+    fields: Optional[str] = Query(None, description="Comma-separated top-level fields to return"),
+    db: Session = Depends(get_db)
+):
     """Get a specific pantry item"""
     service = UserPantryService(db)
+    selected = parse_fields(fields, UserPantry)
     item = service.get_pantry_item(user_id, ingredient_id)
     if not item:
         raise HTTPException(status_code=404, detail="Pantry item not found")
-    return item
+    return FastJSONResponse(project(item, selected))
 
 
 @router.post("/", response_model=UserPantry, status_code=201)
 def add_pantry_item(user_id: int, pantry_data: UserPantryCreate, db: Session = Depends(get_db)):
-    """Add an item to user's pantry"""
+    """Add an item to user's pantry, by `ingredient_id` or by `ingredient_name`"""
     service = UserPantryService(db)
-    return service.add_pantry_item(user_id, pantry_data)
+    item = service.add_pantry_item(user_id, pantry_data)
+    if not item:
+        raise HTTPException(status_code=404, detail=f"Ingredient '{pantry_data.ingredient_name}' not found")
+    return item
 
 
 @router.put("/{ingredient_id}", response_model=UserPantry)
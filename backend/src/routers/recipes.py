@@ -1,45 +1,124 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Literal, Optional, Union
 from ..core.database import get_db
 from ..core.dependencies import get_api_key
+from ..core.tracing import TracedRoute
+from ..core.responses import FastJSONResponse
+from ..core.fields import parse_fields, project, project_all
+from ..core.popularity import popularity_counters
 from ..services.recipe_service import RecipeService
-from ..schemas.recipe import Recipe, RecipeCreate, RecipeUpdate
+from ..services.recipe_search_service import RecipeSearchService
+from ..services.recipe_similarity_service import RecipeSimilarityService
+from ..services.recommendation_service import RecommendationService
+from ..services.popularity_service import PopularityService
+from ..schemas.recipe import Recipe, RecipeSummary, SimilarRecipe, AlsoFavoritedRecipe, PopularRecipe, TrendingRecipe, RecipeSearchQuery, RecipeSearchResult, RecipeCreate, RecipeUpdate
 
 router = APIRouter(
     prefix="/recipes",
     tags=["recipes"],
-    dependencies=[Depends(get_api_key)]
+    dependencies=[Depends(get_api_key)],
+    route_class=TracedRoute
 )
 
 
-@router.get("/", response_model=List[Recipe])
+@router.get("/", response_model=Union[List[Recipe], List[RecipeSummary]])
 def get_recipes(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     category: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
+    view: Literal["full", "summary"] = Query("full", description="`summary` returns recipe columns only, without ingredients and steps"),
+    fields: Optional[str] = Query(None, description="Comma-separated top-level fields to return, e.g. `id,name`"),
     db: Session = Depends(get_db)
 ):
     """Get all recipes with optional filtering"""
     service = RecipeService(db)
-    
+    selected = parse_fields(fields, Recipe)
+
+    # The summary query never touches recipe_ingredient or recipe_step, so use it whenever it covers the request
+    if view == "summary" or (selected is not None and set(selected) <= set(RecipeSummary.model_fields)):
+        summaries = service.get_recipe_summaries(skip, limit, category, search)
+        return FastJSONResponse(project_all(summaries, selected))
+
+    # Plain dicts in the Recipe shape: nothing validates a page that is only encoded
     if search:
-        return service.search_recipes(search, skip, limit)
+        recipes = service.search_recipes(search, skip, limit, as_dicts=True)
     elif category:
-        return service.get_recipes_by_category(category, skip, limit)
+        recipes = service.get_recipes_by_category(category, skip, limit, as_dicts=True)
     else:
-        return service.get_all_recipes(skip, limit)
+        recipes = service.get_all_recipes(skip, limit, as_dicts=True)
+    # Returning the response skips response_model re-validation
+    return FastJSONResponse(project_all(recipes, selected))
+
+
+@router.get("/search", response_model=RecipeSearchResult)
+def search_recipes(
+    category: Optional[str] = Query(None),
+    q: Optional[str] = Query(None, description="Case-insensitive substring of the recipe name"),
+    max_total_time: Optional[int] = Query(None, ge=0, description="Cook + prep minutes; recipes without times are excluded"),
+    include: List[int] = Query([], description="Ingredient IDs the recipe must use (all of them)"),
+    exclude: List[int] = Query([], description="Ingredient IDs the recipe must not use"),
+    have: List[int] = Query([], description="Ingredient IDs on hand, counted with `include` towards the match percentage"),
+    min_match: Optional[float] = Query(None, ge=0, le=100, description="Minimum share (%) of the recipe's ingredients in `have` + `include`"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    facets: bool = Query(False, description="Also count matches per category, total time bucket and ingredient"),
+    facet_size: int = Query(10, ge=1, le=100, description="Number of ingredient facets"),
+    db: Session = Depends(get_db)
+):
+    """Search recipes by any combination of category, name, time and ingredients in one pass"""
+    query = RecipeSearchQuery(
+        category=category, text=q, max_total_time=max_total_time, include=include, exclude=exclude,
+        have=have, min_match=min_match, skip=skip, limit=limit
+    )
+    return FastJSONResponse(RecipeSearchService(db).search(query, facets, facet_size))
+
+
+@router.get("/popular", response_model=List[PopularRecipe])
+def get_popular_recipes(skip: int = Query(0, ge=0), limit: int = Query(10, ge=1, le=100), db: Session = Depends(get_db)):
+    """Most favorited recipes, from this worker's in-memory counters"""
+    return FastJSONResponse(PopularityService(db).get_popular(skip, limit))
+
+
+@router.get("/trending", response_model=List[TrendingRecipe])
+def get_trending_recipes(skip: int = Query(0, ge=0), limit: int = Query(10, ge=1, le=100), db: Session = Depends(get_db)):
+    """Recipes with the most recent views and new favorites (time-decayed), from this worker's in-memory counters"""
+    return FastJSONResponse(PopularityService(db).get_trending(skip, limit))
 
 
 @router.get("/{recipe_id}", response_model=Recipe)
-def get_recipe(recipe_id: int, db: Session = Depends(get_db)):
+def get_recipe(
+    recipe_id: int,
+    fields: Optional[str] = Query(None, description="Comma-separated top-level fields to return"),
+    db: Session = Depends(get_db)
+):
     """Get a specific recipe by ID"""
     service = RecipeService(db)
+    selected = parse_fields(fields, Recipe)
     recipe = service.get_recipe_by_id(recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
-    return recipe
+    popularity_counters.record_view(recipe_id)
+    return FastJSONResponse(project(recipe, selected))
+
+
+@router.get("/{recipe_id}/similar", response_model=List[SimilarRecipe])
+def get_similar_recipes(recipe_id: int, limit: int = Query(10, ge=1, le=50), db: Session = Depends(get_db)):
+    """Recipes with the most similar ingredient sets (Jaccard), most similar first"""
+    similar = RecipeSimilarityService(db).get_similar_recipes(recipe_id, limit)
+    if similar is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    return FastJSONResponse(similar)
+
+
+@router.get("/{recipe_id}/also-favorited", response_model=List[AlsoFavoritedRecipe])
+def get_also_favorited(recipe_id: int, limit: int = Query(10, ge=1, le=50), db: Session = Depends(get_db)):
+    """Users who favorited this recipe also favorited: most co-favorited (cosine) first"""
+    recipes = RecommendationService(db).get_also_favorited(recipe_id, limit)
+    if recipes is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    return FastJSONResponse(recipes)
 
 
 @router.post("/", response_model=Recipe, status_code=201)
@@ -76,4 +155,4 @@ def get_recipes_by_ingredients(
 ):
     """Find recipes that can be made with the given ingredients"""
     service = RecipeService(db)
-    return service.get_recipes_by_ingredients(ingredient_ids, skip, limit)
\ No newline at end of file
+    return FastJSONResponse(service.get_recipes_by_ingredients(ingredient_ids, skip, limit))
\ No newline at end of file
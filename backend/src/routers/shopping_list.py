@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from ..core.database import get_db
+from ..core.dependencies import get_api_key
+from ..core.tracing import TracedRoute
+from ..core.responses import FastJSONResponse
+from ..services.shopping_list_service import ShoppingListService
+from ..schemas.shopping_list import ShoppingList, ShoppingListRequest
+
+router = APIRouter(
+    prefix="/users/{user_id}/shopping-list",
+    tags=["shopping list"],
+    dependencies=[Depends(get_api_key)],
+    route_class=TracedRoute
+)
+
+
+@router.post("/", response_model=ShoppingList)
+def create_shopping_list(user_id: int, request: ShoppingListRequest, db: Session = Depends(get_db)):
+    """Ingredients still to buy for a set of recipes (and optionally the user's favorites), units
+    normalized and the user's pantry subtracted"""
+    shopping_list = ShoppingListService(db).build(user_id, request)
+    if shopping_list is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return FastJSONResponse(shopping_list)
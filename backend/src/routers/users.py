@@ -1,13 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import List
 from ..core.database import get_db
 from ..core.dependencies import get_api_key
+from ..core.tracing import TracedRoute
+from ..core.responses import FastJSONResponse
 from ..schemas.user import UserCreate, UserUpdate, UserResponse, UserProfile, LoginRequest
+from ..schemas.recipe import CookableRecipe, RecommendedRecipe
 from ..services.user_service import UserService
+from ..services.recommendation_service import RecommendationService
+from ..services.cookable_service import CookableService
 
 
-router = APIRouter(prefix="/users", tags=["users"], dependencies=[Depends(get_api_key)])
+router = APIRouter(prefix="/users", tags=["users"], dependencies=[Depends(get_api_key)], route_class=TracedRoute)
 
 
 def get_user_service(db: Session = Depends(get_db)) -> UserService:
@@ -120,4 +125,22 @@ async def get_user_by_id(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    return user
\ No newline at end of file
+    return user
+
+
+@router.get("/{user_id}/recommendations", response_model=List[RecommendedRecipe])
+def get_recommendations(user_id: int, limit: int = Query(10, ge=1, le=50), db: Session = Depends(get_db)):
+    """Recipes favorited by users with similar favorites, best first (empty until the user has favorites)"""
+    recipes = RecommendationService(db).get_recommendations(user_id, limit)
+    if recipes is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return FastJSONResponse(recipes)
+
+
+@router.get("/{user_id}/cookable", response_model=List[CookableRecipe])
+def get_cookable(user_id: int, limit: int = Query(20, ge=1, le=100), db: Session = Depends(get_db)):
+    """Recipes the user can make from their pantry (missing 0) or nearly make, best first, as of the last refresh"""
+    recipes = CookableService(db).get_cookable(user_id, limit)
+    if recipes is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return FastJSONResponse(recipes)
@@ -1,17 +1,22 @@
 # Schemas package
 from .user import UserResponse as User, UserCreate, UserUpdate, UserRole
-from .recipe import Recipe, RecipeCreate, RecipeUpdate, RecipeStep, RecipeStepCreate, RecipeIngredient, RecipeIngredientCreate
-from .ingredient import Ingredient, IngredientCreate, IngredientUpdate, IngredientSubstitute, IngredientSubstituteCreate
+from .recipe import Recipe, RecipeSummary, SimilarRecipe, AlsoFavoritedRecipe, RecommendedRecipe, PopularRecipe, TrendingRecipe, CookableRecipe, RecipeSearchQuery, RecipeSearchHit, RecipeSearchResult, RecipeFacets, CategoryFacet, TotalTimeFacet, IngredientFacet, RecipeCreate, RecipeUpdate, RecipeStep, RecipeStepCreate, RecipeIngredient, RecipeIngredientCreate
+from .ingredient import Ingredient, IngredientCreate, IngredientUpdate, IngredientSubstitute, IngredientSubstituteCreate, IngredientNames
 from .favorite_recipe import FavoriteRecipe, FavoriteRecipeCreate, FavoriteRecipeUpdate
 from .user_pantry import UserPantry, UserPantryCreate, UserPantryUpdate
+from .shopping_list import ShoppingListRequest, ShoppingListItem, ShoppingList
+from .assistant import RecipeSuggestionRequest, RecipeSuggestion, SalvageRequest, SalvageAdvice
 
 # Export all schemas
 __all__ = [
     "User", "UserCreate", "UserUpdate", "UserRole",
-    "Recipe", "RecipeCreate", "RecipeUpdate", "RecipeStep", "RecipeStepCreate", 
+    "Recipe", "RecipeSummary", "SimilarRecipe", "AlsoFavoritedRecipe", "RecommendedRecipe", "PopularRecipe", "TrendingRecipe", "CookableRecipe", "RecipeSearchQuery", "RecipeSearchHit", "RecipeSearchResult", 
+    "RecipeFacets", "CategoryFacet", "TotalTimeFacet", "IngredientFacet", "RecipeCreate", "RecipeUpdate", "RecipeStep", "RecipeStepCreate", 
     "RecipeIngredient", "RecipeIngredientCreate",
     "Ingredient", "IngredientCreate", "IngredientUpdate", 
-    "IngredientSubstitute", "IngredientSubstituteCreate",
+    "IngredientSubstitute", "IngredientSubstituteCreate", "IngredientNames",
     "FavoriteRecipe", "FavoriteRecipeCreate", "FavoriteRecipeUpdate",
     "UserPantry", "UserPantryCreate", "UserPantryUpdate",
+    "ShoppingListRequest", "ShoppingListItem", "ShoppingList",
+    "RecipeSuggestionRequest", "RecipeSuggestion", "SalvageRequest", "SalvageAdvice",
 ]
\ No newline at end of file
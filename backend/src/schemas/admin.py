@@ -0,0 +1,150 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+class SlowQuery(BaseModel):
+    time: str
+    duration_ms: float
+    statement: str
+    parameters: Any = None
+    call_site: Optional[str] = None
+    plan: Optional[List[str]] = None
+
+
+class AllocationStat(BaseModel):
+    location: str
+    size_kib: float
+    count: int
+    size_diff_kib: Optional[float] = None
+    count_diff: Optional[int] = None
+
+
+class MemorySnapshot(BaseModel):
+    id: int
+    taken_at: datetime
+    traced_kib: float
+    peak_kib: float
+    top: List[AllocationStat] = []
+
+
+class MemoryDiff(BaseModel):
+    before: int
+    after: int
+    stats: List[AllocationStat]
+
+
+class SnapshotTable(BaseModel):
+    file: str
+    rows: int
+    bytes: int
+    seconds: float
+
+
+class Snapshot(BaseModel):
+    name: str
+    created_at: datetime
+    compression: str
+    seconds: float
+    tables: Dict[str, SnapshotTable]
+
+
+class CatalogSnapshotStats(BaseModel):
+    path: str
+    built_at: float
+    bytes: int
+    recipes: int
+    ingredients: int
+    recipe_ingredients: int
+    categories: int
+
+
+class SimilarityIndexStats(BaseModel):
+    recipes: int
+    buckets: int
+    seconds: float
+
+
+class RecipeNeighborStats(BaseModel):
+    users: int
+    recipes: int
+    pairs: int
+    seconds: float
+
+
+class RecipeNeighborStatus(BaseModel):
+    running: bool
+    last_run: Optional[RecipeNeighborStats] = None
+    last_error: Optional[str] = None
+
+
+class PopularityStats(BaseModel):
+    recipes: int
+    favorites: int
+    seconds: float
+
+
+class RecipeSummaryStats(BaseModel):
+    recipes: int
+    seconds: float
+
+
+class CookableStats(BaseModel):
+    changes: int  # queue rows applied
+    users: int
+    rows: int
+    seconds: float
+
+
+class CookableStatus(BaseModel):
+    running: bool
+    pending: int  # queued pantry / recipe changes not applied yet
+    last_run: Optional[CookableStats] = None
+    last_error: Optional[str] = None
+
+
+class AssistantStats(BaseModel):
+    model: Optional[str] = None  # None until the first request loads it
+    cache_entries: int
+    cache_hits: int
+    cache_misses: int
+    model_calls: int  # batched generate calls
+    model_requests: int  # requests answered by those calls
+    pending: int  # distinct requests queued or running
+
+
+class CatalogChange(BaseModel):
+    id: int
+    entity: str
+    changed_at: Optional[datetime] = None
+
+
+class CatalogChanges(BaseModel):
+    version: int
+    changes: List[CatalogChange]
+
+
+class TraceSummary(BaseModel):
+    trace_id: str
+    name: Optional[str] = None
+    start: Optional[float] = None
+    duration_ms: Optional[float] = None
+    span_count: int
+
+
+class Span(BaseModel):
+    span_id: str
+    parent_id: Optional[str] = None
+    name: str
+    kind: str
+    start: float
+    duration_ms: Optional[float] = None
+    attributes: dict = {}
+
+
+class Trace(BaseModel):
+    trace_id: str
+    name: Optional[str] = None
+    start: Optional[float] = None
+    duration_ms: Optional[float] = None
+    spans: List[Span]
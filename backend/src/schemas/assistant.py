@@ -0,0 +1,34 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from .recipe import RecipeSummary
+
+
+class RecipeSuggestionRequest(BaseModel):
+    ingredients: List[str] = Field(..., min_length=1, max_length=50)  # names on hand, matched case-insensitively
+    prompt: str = Field("", max_length=500)  # e.g. "something quick for dinner"
+    user_id: Optional[int] = None  # guests leave it out
+
+
+class RecipeSuggestion(BaseModel):
+    recipe: Optional[RecipeSummary] = None  # None when no catalog recipe uses these ingredients
+    message: str
+    missing_ingredients: List[str] = []  # ingredients of the suggested recipe not in the request
+    unknown_ingredients: List[str] = []  # request names not in the ingredient catalog
+    model: str
+    cached: bool
+
+
+class SalvageRequest(BaseModel):
+    user_id: int  # salvage help needs an account
+    recipe_id: int
+    stage: Literal["cooking", "finished"]  # a mistake while cooking, or how the finished dish tastes
+    problem: str = Field(..., min_length=1, max_length=500)  # e.g. "way too salty"
+
+
+class SalvageAdvice(BaseModel):
+    recipe_id: int
+    stage: str
+    message: str
+    suggestions: List[str]
+    model: str
+    cached: bool
@@ -33,6 +33,10 @@ class IngredientUpdate(BaseModel):
     category: Optional[str] = None
 
 
+class IngredientNames(BaseModel):
+    names: List[str]
+
+
 class Ingredient(IngredientBase):
     id: int
     substitutes: List[IngredientSubstitute] = []
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 from decimal import Decimal
 
@@ -57,6 +57,92 @@ class RecipeUpdate(BaseModel):
     prep_time_in_minutes: Optional[int] = None
 
 
+class RecipeSummary(RecipeBase):
+    """List-view projection: recipe columns only, no ingredients or steps"""
+    id: int
+
+    class Config:
+        from_attributes = True
+
+
+class SimilarRecipe(RecipeSummary):
+    similarity: float  # Jaccard similarity of the ingredient sets, 0-1
+
+
+class AlsoFavoritedRecipe(RecipeSummary):
+    shared: int  # users who favorited both recipes
+    score: float  # cosine similarity of the two recipes' favoriting users, 0-1
+
+
+class RecommendedRecipe(RecipeSummary):
+    score: float  # summed co-favorite scores against the user's favorites
+    because_recipe_id: int  # the favorite that contributed the most
+
+
+class PopularRecipe(RecipeSummary):
+    favorites: int
+    views: int
+
+
+class TrendingRecipe(RecipeSummary):
+    score: float  # views (and weighted new favorites), each halved every TRENDING_HALF_LIFE_HOURS
+
+
+class CookableRecipe(RecipeSummary):
+    matched: int  # ingredients in the user's pantry
+    missing: int  # ingredients still to get (0 = makeable now)
+    match_percentage: float
+
+
+class RecipeSearchQuery(BaseModel):
+    """Filters of a recipe search; every one is optional and they combine with AND"""
+    category: Optional[str] = None
+    text: Optional[str] = None  # case-insensitive substring of the name
+    max_total_time: Optional[int] = Field(None, ge=0)  # cook + prep minutes; recipes with no times are excluded
+    include: List[int] = []  # ingredient ids the recipe must use (all of them)
+    exclude: List[int] = []  # ingredient ids the recipe must not use (allergens)
+    have: List[int] = []  # ingredients on hand, counted towards the match percentage with `include`
+    min_match: Optional[float] = Field(None, ge=0, le=100)  # share of the recipe's ingredients in have + include
+    skip: int = Field(0, ge=0)
+    limit: int = Field(50, ge=1, le=500)
+
+
+class RecipeSearchHit(RecipeSummary):
+    match_percentage: Optional[float] = None  # set when `have` or `include` is given
+
+
+class CategoryFacet(BaseModel):
+    category: str
+    count: int
+
+
+class TotalTimeFacet(BaseModel):
+    max_total_time: int  # recipes taking at most this many minutes (cumulative)
+    count: int
+
+
+class IngredientFacet(BaseModel):
+    ingredient_id: int
+    name: str
+    count: int
+
+
+class RecipeFacets(BaseModel):
+    """Match counts per filter value. Category and total time are counted without their own
+    filter, so every chip shows what selecting it would return; ingredients are the most
+    common ones among the current matches."""
+    categories: List[CategoryFacet]
+    total_time: List[TotalTimeFacet]
+    ingredients: List[IngredientFacet]
+
+
+class RecipeSearchResult(BaseModel):
+    total: int
+    items: List[RecipeSearchHit]
+    plan: List[str]  # the steps the engine ran, most selective first
+    facets: Optional[RecipeFacets] = None
+
+
 class Recipe(RecipeBase):
     id: int
     ingredients: List[RecipeIngredient] = []
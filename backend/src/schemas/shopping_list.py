@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from decimal import Decimal
+
+
+class ShoppingListRequest(BaseModel):
+    recipe_ids: List[int] = Field(default_factory=list, max_length=500)  # repeat an id to cook it more than once
+    include_favorites: bool = False  # also plan every recipe the user has favorited
+
+
+class ShoppingListItem(BaseModel):
+    ingredient_id: int
+    ingredient_name: Optional[str] = None
+    category: Optional[str] = None
+    quantity: Decimal  # still to buy, in `unit`
+    unit: str
+    required: Decimal  # needed by the recipes, in `unit`
+    in_pantry: Decimal  # pantry stock counted against it, in `unit`
+
+
+class ShoppingList(BaseModel):
+    user_id: int
+    recipe_count: int
+    items: List[ShoppingListItem]  # by category, then ingredient name
+    missing_recipe_ids: List[int] = []  # requested ids that are not recipes
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from typing import Optional
 from decimal import Decimal
 
@@ -10,7 +10,14 @@ class UserPantryBase(BaseModel):
 
 
 class UserPantryCreate(UserPantryBase):
-    pass
+    ingredient_id: Optional[int] = None
+    ingredient_name: Optional[str] = None  # resolved case-insensitively when no id is given
+
+    @model_validator(mode="after")
+    def check_ingredient(self):
+        if self.ingredient_id is None and not self.ingredient_name:
+            raise ValueError("Either ingredient_id or ingredient_name is required")
+        return self
 
 
 class UserPantryUpdate(BaseModel):
@@ -0,0 +1,183 @@
+import heapq
+from collections import Counter
+from typing import List, Optional
+from sqlalchemy import Float, cast, func, select
+from sqlalchemy.orm import Session
+from ..core.assistant import assistant_batcher, assistant_limiter, cache_key, response_cache
+from ..core.assistant_model import RECIPE, SALVAGE, ModelReply, ModelRequest
+from ..core.catalog_snapshot import CatalogSnapshot, catalog_snapshot
+from ..core.settings import settings
+from ..core.tracing import trace_class, span
+from ..models.recipe import RecipeStep as RecipeStepModel
+from ..models.recipe_ingredient import RecipeIngredient as RecipeIngredientModel
+from ..models.recipe_summary import RecipeSummary as RecipeSummaryModel
+from ..models.user import User as UserModel
+from ..schemas.assistant import RecipeSuggestion, RecipeSuggestionRequest, SalvageAdvice, SalvageRequest
+from ..schemas.recipe import RecipeSummary
+from .ingredient_catalog import normalize_name
+from .ingredient_service import IngredientService
+
+recipe_ingredient_table = RecipeIngredientModel.__table__
+step_table = RecipeStepModel.__table__
+summary_table = RecipeSummaryModel.__table__
+user_table = UserModel.__table__
+
+
+@trace_class("service")
+class AssistantService:
+    """AI cooking assistant: grounds each request in the catalog, then answers from the response cache
+    or the micro-batched model (see core/assistant)"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def suggest_recipe(self, request: RecipeSuggestionRequest, client: str) -> Optional[RecipeSuggestion]:
+        """A catalog recipe made from the given ingredients (fewest missing); None if `user_id` is unknown"""
+        if request.user_id is not None and not self._user_exists(request.user_id):
+            return None
+        names = list({normalize_name(name): name.strip() for name in request.ingredients if name.strip()}.values())
+        resolved = IngredientService(self.db).resolve_names(names)
+        ingredient_ids = sorted({ingredient_id for ingredient_id in resolved.values() if ingredient_id is not None})
+        unknown = [name for name, ingredient_id in resolved.items() if ingredient_id is None]
+
+        model = self._model_name()
+        key = cache_key(RECIPE, model, request.prompt, ingredient_ids, sorted(map(normalize_name, unknown)))
+        reply = response_cache.get(key)
+        row = self._summary(reply.recipe_id) if reply is not None and reply.recipe_id is not None else None
+        cached = reply is not None and (reply.recipe_id is None or row is not None)
+        if not cached:
+            # Not cached, or the cached pick has been deleted since
+            response_cache.discard(key)
+            # The slot is taken before the context is read, so requests over the limit cost no queries
+            with assistant_limiter.slot(self._owner(request.user_id, client)):
+                context = {
+                    "ingredients": [name for name, ingredient_id in resolved.items() if ingredient_id is not None],
+                    "candidates": self._candidates(ingredient_ids),
+                }
+                reply = self._ask(key, ModelRequest(RECIPE, request.prompt, context))
+            row = self._summary(reply.recipe_id) if reply.recipe_id is not None else None
+
+        wanted = set(ingredient_ids)
+        return RecipeSuggestion(
+            recipe=RecipeSummary(
+                id=row.recipe_id, name=row.name, category=row.category,
+                cook_time_in_minutes=row.cook_time_in_minutes, prep_time_in_minutes=row.prep_time_in_minutes,
+            ) if row is not None else None,
+            message=reply.text,
+            missing_ingredients=self._missing(row, wanted) if row is not None else [],
+            unknown_ingredients=unknown,
+            model=model,
+            cached=cached,
+        )
+
+    def salvage(self, request: SalvageRequest, client: str) -> Optional[SalvageAdvice]:
+        """Fixes for a dish gone wrong while cooking or once finished; None if the user or recipe is unknown"""
+        if not self._user_exists(request.user_id):
+            return None
+        row = self._summary(request.recipe_id)
+        if row is None:
+            return None
+
+        model = self._model_name()
+        key = cache_key(SALVAGE, model, request.problem, request.recipe_id, request.stage)
+        reply = response_cache.get(key)
+        cached = reply is not None
+        if not cached:
+            with assistant_limiter.slot(self._owner(request.user_id, client)):
+                steps = self.db.execute(
+                    select(step_table.c.instruction).where(step_table.c.recipe_id == request.recipe_id).order_by(step_table.c.step_order)
+                ).scalars().all()
+                context = {
+                    "stage": request.stage,
+                    "recipe": {"recipe_id": row.recipe_id, "name": row.name, "ingredients": self._names(row), "steps": steps},
+                }
+                reply = self._ask(key, ModelRequest(SALVAGE, request.problem, context))
+        return SalvageAdvice(
+            recipe_id=request.recipe_id, stage=request.stage, message=reply.text,
+            suggestions=list(reply.suggestions), model=model, cached=cached,
+        )
+
+    @staticmethod
+    def _model_name() -> str:
+        assistant_batcher.start()  # no-op once running; loads ASSISTANT_MODEL on first use
+        return assistant_batcher.model.name
+
+    @staticmethod
+    def _owner(user_id: Optional[int], client: str) -> str:
+        """Who an assistant_limiter slot is counted against"""
+        return f"user:{user_id}" if user_id is not None else f"guest:{client}"
+
+    def _ask(self, key: str, request: ModelRequest) -> ModelReply:
+        """Wait for the batched model call (raises TimeoutError); the caller holds the limiter slot"""
+        # The context is already read: hand the connection back to the pool instead of holding it for
+        # up to ASSISTANT_TIMEOUT_SECONDS (the session checks one out again on its next query)
+        self.db.rollback()
+        with span("assistant.model", task=request.task):
+            return assistant_batcher.submit(key, request).result(timeout=settings.ASSISTANT_TIMEOUT_SECONDS)
+
+    def _candidates(self, ingredient_ids: List[int]) -> List[dict]:
+        """The ASSISTANT_CANDIDATES recipes missing the fewest ingredients, then covering the most"""
+        if not ingredient_ids:
+            return []
+        wanted = set(ingredient_ids)
+        with span("assistant.candidates", ingredient_count=len(wanted)):
+            snapshot = catalog_snapshot.get()
+            ranked = self._rank_snapshot(snapshot, wanted) if snapshot is not None else self._rank_sql(wanted)
+            # Summary rows for the winners only; recipes deleted since the snapshot was built drop out
+            rows = {row.recipe_id: row for row in self.db.execute(
+                select(summary_table).where(summary_table.c.recipe_id.in_(ranked))
+            )}
+        return [
+            {"recipe_id": row.recipe_id, "name": row.name, "category": row.category,
+             "ingredients": self._names(row), "missing": self._missing(row, wanted)}
+            for row in (rows.get(recipe_id) for recipe_id in ranked) if row is not None
+        ]
+
+    @staticmethod
+    def _rank_snapshot(snapshot: CatalogSnapshot, wanted: set) -> List[int]:
+        """Candidate ids scored on the snapshot's ingredient postings (matched ingredients per recipe position)"""
+        matched = Counter()
+        for ingredient_id in wanted:
+            matched.update(snapshot.recipes_with_ingredient(ingredient_id))
+        ingredient_ids_at = snapshot.ingredient_ids_at
+        # Positions are in id order, so they break ties like recipe ids
+        best = heapq.nsmallest(settings.ASSISTANT_CANDIDATES, (
+            (size - count, -count / size, position)
+            for position, count in matched.items()
+            for size in (len(ingredient_ids_at(position)),)
+        ))
+        return [snapshot.recipe_id_at(position) for _, _, position in best]
+
+    def _rank_sql(self, wanted: set) -> List[int]:
+        """Candidate ids counted and ranked in SQL (no snapshot mapped)"""
+        counts = (
+            select(recipe_ingredient_table.c.recipe_id, func.count().label("matched"))
+            .where(recipe_ingredient_table.c.ingredient_id.in_(wanted))
+            .group_by(recipe_ingredient_table.c.recipe_id)
+            .subquery()
+        )
+        return self.db.execute(
+            select(counts.c.recipe_id)
+            .join(summary_table, summary_table.c.recipe_id == counts.c.recipe_id)
+            .order_by(
+                summary_table.c.ingredient_count - counts.c.matched,
+                (cast(counts.c.matched, Float) / summary_table.c.ingredient_count).desc(),
+                counts.c.recipe_id,
+            )
+            .limit(settings.ASSISTANT_CANDIDATES)
+        ).scalars().all()
+
+    def _summary(self, recipe_id: int):
+        return self.db.execute(select(summary_table).where(summary_table.c.recipe_id == recipe_id)).first()
+
+    def _user_exists(self, user_id: int) -> bool:
+        return self.db.execute(select(user_table.c.id).where(user_table.c.id == user_id)).first() is not None
+
+    @staticmethod
+    def _names(row) -> List[str]:
+        return [name if name is not None else f"Ingredient {ingredient_id}"
+                for ingredient_id, name in zip(row.ingredient_ids, row.ingredient_names)]
+
+    @classmethod
+    def _missing(cls, row, wanted: set) -> List[str]:
+        return [name for ingredient_id, name in zip(row.ingredient_ids, cls._names(row)) if ingredient_id not in wanted]
@@ -0,0 +1,33 @@
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..core.tracing import trace_class
+from ..models.recipe import Recipe as RecipeModel
+from ..models.user import User as UserModel
+from ..models.user_recipe_match import UserRecipeMatch as UserRecipeMatchModel
+from ..schemas.recipe import CookableRecipe
+
+recipe_table = RecipeModel.__table__
+user_table = UserModel.__table__
+match_table = UserRecipeMatchModel.__table__
+
+
+@trace_class("service")
+class CookableService:
+    """Reads the precomputed user_recipe_match lists (see core/cookable): one primary-key range per user"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_cookable(self, user_id: int, limit: int = 20) -> Optional[List[CookableRecipe]]:
+        """None if the user does not exist"""
+        if self.db.execute(select(user_table.c.id).where(user_table.c.id == user_id)).first() is None:
+            return None
+        rows = self.db.execute(
+            select(recipe_table, match_table.c.matched, match_table.c.missing, match_table.c.match_percentage)
+            .join(recipe_table, recipe_table.c.id == match_table.c.recipe_id)
+            .where(match_table.c.user_id == user_id)
+            .order_by(match_table.c.rank)
+            .limit(limit)
+        )
+        return [CookableRecipe.model_validate(dict(row._mapping)) for row in rows]
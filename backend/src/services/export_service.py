@@ -0,0 +1,67 @@
+from typing import Iterator, List
+from sqlalchemy.orm import Session
+from sqlalchemy import select
+from ..core.data_access import DataAccessStrategy
+from ..models.recipe import Recipe as RecipeModel
+from ..models.ingredient import Ingredient as IngredientModel
+from ..models.user import User as UserModel
+from .recipe_service import RecipeService
+from .ingredient_service import IngredientService
+from .user_pantry_service import UserPantryService
+from .favorite_recipe_service import FavoriteRecipeService
+from ..schemas.recipe import Recipe
+from ..schemas.ingredient import Ingredient
+from ..schemas.user_pantry import UserPantry
+from ..schemas.favorite_recipe import FavoriteRecipe
+from ..core.tracing import trace_class
+
+recipe_table = RecipeModel.__table__
+ingredient_table = IngredientModel.__table__
+user_table = UserModel.__table__
+
+
+@trace_class("service")
+class ExportService:
+    """Full-table exports, one batch at a time.
+
+    The base table is read through a server-side cursor on `stream_db`
+    (`stream_results` + `yield_per`), so only one batch of rows is held in
+    memory. Each batch's ingredients, steps and substitutes are loaded with one
+    IN query on `lookup_db`: some drivers (MySQL) cannot run a second statement
+    on a connection while an unbuffered cursor is open on it.
+    """
+
+    def __init__(self, stream_db: Session, lookup_db: Session, batch_size: int = 500):
+        self.stream_db = stream_db
+        self.lookup_db = lookup_db
+        self.batch_size = batch_size
+
+    def user_exists(self, user_id: int) -> bool:
+        return self.lookup_db.execute(select(user_table.c.id).where(user_table.c.id == user_id)).first() is not None
+
+    def stream_recipes(self) -> Iterator[List[Recipe]]:
+        hydrator = RecipeService(self.lookup_db, DataAccessStrategy.core)
+        for rows in self._partitions(select(recipe_table).order_by(recipe_table.c.id)):
+            yield hydrator.hydrate(rows)
+
+    def stream_ingredients(self) -> Iterator[List[Ingredient]]:
+        hydrator = IngredientService(self.lookup_db, DataAccessStrategy.core)
+        for rows in self._partitions(select(ingredient_table).order_by(ingredient_table.c.id)):
+            yield hydrator.with_substitutes(rows)
+
+    def stream_user_pantry(self, user_id: int) -> Iterator[List[UserPantry]]:
+        formatter = UserPantryService(self.lookup_db, DataAccessStrategy.core)
+        for rows in self._partitions(UserPantryService.pantry_query(user_id)):
+            yield formatter.format_rows(rows)
+
+    def stream_user_favorites(self, user_id: int) -> Iterator[List[FavoriteRecipe]]:
+        formatter = FavoriteRecipeService(self.lookup_db, DataAccessStrategy.core)
+        for rows in self._partitions(FavoriteRecipeService.favorites_query(user_id)):
+            yield formatter.format_rows(rows)
+
+    def _partitions(self, stmt):
+        result = self.stream_db.execute(stmt, execution_options={"stream_results": True, "yield_per": self.batch_size})
+        try:
+            yield from result.partitions()
+        finally:
+            result.close()
@@ -1,108 +1,179 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import text, select, insert, update, delete, func
+from ..core.data_access import DataAccessStrategy, resolve_strategy
+from ..models.favorite_recipe import FavoriteRecipe as FavoriteRecipeModel
+from ..models.recipe import Recipe as RecipeModel
 from ..repositories.favorite_recipe_repository import FavoriteRecipeRepository
 from ..schemas.favorite_recipe import FavoriteRecipe, FavoriteRecipeCreate, FavoriteRecipeUpdate
+from ..core.tracing import trace_class
+from ..core.recipe_neighbors import update_neighbors
+from ..core.popularity import popularity_counters
+from ..core.recipe_summary import refresh_favorite_counts
 
+favorite_table = FavoriteRecipeModel.__table__
+recipe_table = RecipeModel.__table__
 
+# Core version of the favorite + recipe name join shared by the read paths
+_favorite_select = (
+    select(
+        favorite_table.c.user_id,
+        favorite_table.c.recipe_id,
+        favorite_table.c.user_note,
+        favorite_table.c.favorited_at,
+        recipe_table.c.name.label("recipe_name"),
+    )
+    .select_from(favorite_table.outerjoin(recipe_table, favorite_table.c.recipe_id == recipe_table.c.id))
+)
+
+
+@trace_class("service")
 class FavoriteRecipeService:
-    def __init__(self, db: Session):
+    DEFAULT_STRATEGY = DataAccessStrategy.raw
+
+    def __init__(self, db: Session, strategy: Optional[DataAccessStrategy] = None):
         self.repository = FavoriteRecipeRepository(db)
         self.db = db
+        self.strategy = resolve_strategy("favorite", self.DEFAULT_STRATEGY, strategy)
 
     def get_user_favorites(self, user_id: int, skip: int = 0, limit: int = 100) -> List[FavoriteRecipe]:
-        """ORM version"""
-        #favorites = self.repository.get_user_favorites(user_id, skip, limit)
-        #return [self._format_favorite(favorite) for favorite in favorites]
-        
-        """raw SQL version """
-        query = text("""
-        SELECT 
-        F.user_id, F.recipe_id, F.user_note, F.favorited_at, R.name AS recipe_name
-        FROM favorite_recipe F
-        LEFT JOIN recipe R ON F.recipe_id = R.id
-        WHERE user_id = :user_id 
-        LIMIT :limit OFFSET :skip 
-        """)
-        result = self.db.execute(query, {'user_id': user_id, 'limit': limit, 'skip': skip})
-        favorites = [self._format_favorite_sql(favorite) for favorite in result.fetchall()]
-        return favorites
+        if self.strategy is DataAccessStrategy.orm:
+            favorites = self.repository.get_user_favorites(user_id, skip, limit)
+            return [self._format_favorite(favorite) for favorite in favorites]
+
+        if self.strategy is DataAccessStrategy.core:
+            stmt = _favorite_select.where(favorite_table.c.user_id == user_id).limit(limit).offset(skip)
+            result = self.db.execute(stmt)
+        else:
+            query = text("""
+            SELECT
+            F.user_id, F.recipe_id, F.user_note, F.favorited_at, R.name AS recipe_name
+            FROM favorite_recipe F
+            LEFT JOIN recipe R ON F.recipe_id = R.id
+            WHERE F.user_id = :user_id
+            LIMIT :limit OFFSET :skip
+            """)
+            result = self.db.execute(query, {'user_id': user_id, 'limit': limit, 'skip': skip})
+        return [self._format_favorite_sql(favorite) for favorite in result.fetchall()]
 
     def get_favorite(self, user_id: int, recipe_id: int) -> Optional[FavoriteRecipe]:
-        #favorite = self.repository.get_by_user_and_recipe(user_id, recipe_id)
-        #return self._format_favorite(favorite) if favorite else None
-        
-        query = text("""
-        SELECT 
-        F.user_id, F.recipe_id, F.user_note, F.favorited_at, R.name AS recipe_name
-        FROM favorite_recipe F
-        LEFT JOIN recipe R ON F.recipe_id = R.id
-        WHERE user_id = :user_id AND recipe_id = :recipe_id 
-        """)
-        result = self.db.execute(query, {'user_id': user_id, 'recipe_id': recipe_id})
-        favorite = [self._format_favorite_sql(favorite) for favorite in result.fetchall()]
-        return favorite
+        if self.strategy is DataAccessStrategy.orm:
+            favorite = self.repository.get_by_user_and_recipe(user_id, recipe_id)
+            return self._format_favorite(favorite) if favorite else None
+
+        if self.strategy is DataAccessStrategy.core:
+            stmt = _favorite_select.where(favorite_table.c.user_id == user_id, favorite_table.c.recipe_id == recipe_id)
+            row = self.db.execute(stmt).fetchone()
+        else:
+            query = text("""
+            SELECT
+            F.user_id, F.recipe_id, F.user_note, F.favorited_at, R.name AS recipe_name
+            FROM favorite_recipe F
+            LEFT JOIN recipe R ON F.recipe_id = R.id
+            WHERE F.user_id = :user_id AND F.recipe_id = :recipe_id
+            """)
+            row = self.db.execute(query, {'user_id': user_id, 'recipe_id': recipe_id}).fetchone()
+        return self._format_favorite_sql(row) if row else None
 
     def add_favorite(self, user_id: int, favorite_data: FavoriteRecipeCreate) -> FavoriteRecipe:
-        #favorite = self.repository.create(user_id, favorite_data)
-        #return self._format_favorite(favorite)
-        
-        query = text("""
-        INSERT INTO favorite_recipe (user_id, recipe_id, user_note, favorited_at)
-        VALUES (:user_id, :recipe_id, :user_note,  CURRENT_TIMESTAMP)
-        RETURNING user_id, recipe_id, user_note, favorited_at
-        """)
-        
-        result = self.db.execute(query,{'user_id': user_id, 'recipe_id': favorite_data.recipe_id, "user_note":favorite_data.user_note if favorite_data.user_note else None})
-        favorite_row = result.fetchone()
+        if self.strategy is DataAccessStrategy.orm:
+            # The repository updates the summary and neighbor lists in its transaction
+            favorite = self.repository.create(user_id, favorite_data)
+            popularity_counters.record_favorite(favorite_data.recipe_id, 1)
+            return self._format_favorite(favorite)
+
+        values = {'user_id': user_id, 'recipe_id': favorite_data.recipe_id, 'user_note': favorite_data.user_note or None}
+        if self.strategy is DataAccessStrategy.core:
+            self.db.execute(insert(favorite_table).values(**values, favorited_at=func.current_timestamp()))
+        else:
+            query = text("""
+            INSERT INTO favorite_recipe (user_id, recipe_id, user_note, favorited_at)
+            VALUES (:user_id, :recipe_id, :user_note, CURRENT_TIMESTAMP)
+            """)
+            self.db.execute(query, values)
+        refresh_favorite_counts(self.db.connection(), [favorite_data.recipe_id])
+        self._update_neighbors(user_id, favorite_data.recipe_id)
         self.db.commit()
-        
-        favorite = self._format_favorite_sql(favorite_row)
-        return favorite
+        popularity_counters.record_favorite(favorite_data.recipe_id, 1)
+        # The key is known, so read the row back instead of relying on RETURNING (not supported by MySQL)
+        return self.get_favorite(user_id, favorite_data.recipe_id)
 
     def update_favorite(self, user_id: int, recipe_id: int, favorite_data: FavoriteRecipeUpdate) -> Optional[FavoriteRecipe]:
-        #favorite = self.repository.update(user_id, recipe_id, favorite_data)
-        #return self._format_favorite(favorite) if favorite else None
-        
-        query = text("""
-        UPDATE  favorite_recipe 
-        SET user_note =  :usernote, favorited_at = CURRENT_TIMESTAMP
-        WHERE user_id = :user_id AND recipe_id = :recipe_id
-        RETURNING user_id, recipe_id, user_note, favorited_at
-        """)
-        
-        result = self.db.execute(query,{'user_id': user_id, 'recipe_id': recipe_id, "user_note":favorite_data.user_note if favorite_data.user_note else None})
-        favorite_row = result.fetchone()
+        if self.strategy is DataAccessStrategy.orm:
+            favorite = self.repository.update(user_id, recipe_id, favorite_data)
+            return self._format_favorite(favorite) if favorite else None
+
+        values = {'user_id': user_id, 'recipe_id': recipe_id, 'user_note': favorite_data.user_note or None}
+        if self.strategy is DataAccessStrategy.core:
+            stmt = (
+                update(favorite_table)
+                .where(favorite_table.c.user_id == user_id, favorite_table.c.recipe_id == recipe_id)
+                .values(user_note=values['user_note'], favorited_at=func.current_timestamp())
+            )
+            result = self.db.execute(stmt)
+        else:
+            query = text("""
+            UPDATE favorite_recipe
+            SET user_note = :user_note, favorited_at = CURRENT_TIMESTAMP
+            WHERE user_id = :user_id AND recipe_id = :recipe_id
+            """)
+            result = self.db.execute(query, values)
         self.db.commit()
-        
-        favorite = self._format_favorite_sql(favorite_row)
-        return favorite
+        return self.get_favorite(user_id, recipe_id) if result.rowcount else None
 
     def remove_favorite(self, user_id: int, recipe_id: int) -> bool:
-        #return self.repository.delete(user_id, recipe_id)
-        
-        query = text("""
-        DELETE FROM favorite_recipe 
-        WHERE user_id = :user_id AND recipe_id = :recipe_id
-        """)
-        
-        result = self.db.execute(query,{'user_id': user_id, 'recipe_id': recipe_id, })
+        if self.strategy is DataAccessStrategy.orm:
+            if not self.repository.delete(user_id, recipe_id):
+                return False
+            popularity_counters.record_favorite(recipe_id, -1)
+            return True
+
+        if self.strategy is DataAccessStrategy.core:
+            stmt = delete(favorite_table).where(favorite_table.c.user_id == user_id, favorite_table.c.recipe_id == recipe_id)
+            result = self.db.execute(stmt)
+        else:
+            query = text("""
+            DELETE FROM favorite_recipe
+            WHERE user_id = :user_id AND recipe_id = :recipe_id
+            """)
+            result = self.db.execute(query, {'user_id': user_id, 'recipe_id': recipe_id})
+        if result.rowcount:
+            refresh_favorite_counts(self.db.connection(), [recipe_id])
+            self._update_neighbors(user_id, recipe_id)
         self.db.commit()
-        
+        if result.rowcount:
+            popularity_counters.record_favorite(recipe_id, -1)
         return result.rowcount > 0
 
     def is_favorited(self, user_id: int, recipe_id: int) -> bool:
-        #return self.repository.is_favorited(user_id, recipe_id)
-        
-        query = text("""
-        SELECT * FROM favorite_recipe
-        WHERE user_id = :user_id AND recipe_id = :recipe_id
-        """
-        )
-        
-        result = self.db.execute(query, {"user_id": user_id, "recipe_id": recipe_id})
+        if self.strategy is DataAccessStrategy.orm:
+            return self.repository.is_favorited(user_id, recipe_id)
+
+        if self.strategy is DataAccessStrategy.core:
+            stmt = select(favorite_table.c.user_id).where(
+                favorite_table.c.user_id == user_id, favorite_table.c.recipe_id == recipe_id
+            )
+            result = self.db.execute(stmt)
+        else:
+            query = text("""
+            SELECT user_id FROM favorite_recipe
+            WHERE user_id = :user_id AND recipe_id = :recipe_id
+            """)
+            result = self.db.execute(query, {"user_id": user_id, "recipe_id": recipe_id})
         return result.fetchone() is not None
-        
+
+    def _update_neighbors(self, user_id: int, recipe_id: int):
+        """Fold the favorite just added or removed into the co-favorite neighbor lists (committed by the caller)"""
+        update_neighbors(self.db.connection(), user_id, recipe_id)
+
+    @staticmethod
+    def favorites_query(user_id: int):
+        """Core select of a user's favorites with recipe names, in recipe order (for streaming exports)"""
+        return _favorite_select.where(favorite_table.c.user_id == user_id).order_by(favorite_table.c.recipe_id)
+
+    def format_rows(self, rows) -> List[FavoriteRecipe]:
+        """Favorites from a batch of favorites_query rows"""
+        return [self._format_favorite_sql(row) for row in rows]
 
     def _format_favorite(self, favorite) -> FavoriteRecipe:
         """Format favorite with recipe name"""
@@ -113,12 +184,13 @@ class FavoriteRecipeService:
             favorited_at=favorite.favorited_at,
             recipe_name=favorite.recipe.name if favorite.recipe else None
         )
+
     def _format_favorite_sql(self, favorite) -> FavoriteRecipe:
-        
-         return FavoriteRecipe(
+        """Format a favorite row from a Core or raw SQL query"""
+        return FavoriteRecipe(
             user_id=favorite.user_id,
             recipe_id=favorite.recipe_id,
             user_note=favorite.user_note,
             favorited_at=favorite.favorited_at,
-            recipe_name = getattr(favorite, "recipe_name", None)
-        )
\ No newline at end of file
+            recipe_name=getattr(favorite, "recipe_name", None)
+        )
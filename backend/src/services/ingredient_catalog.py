@@ -0,0 +1,98 @@
+"""
+In-process ingredient catalog.
+
+The ingredient table is small and read on almost every request, so each worker
+keeps a snapshot of it (with substitutes) indexed by id, by normalized name and
+by category, plus the sorted category list. IngredientService serves its reads
+from the snapshot; the first read after a change reloads it with two queries.
+
+The snapshot is dropped when the change feed reports an ingredient change: at
+once for this worker's own writes, within CATALOG_CHANGE_POLL_SECONDS for
+writes made by other workers.
+"""
+import threading
+from typing import Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..core.change_feed import change_feed
+from ..core.metrics import metrics
+from ..models.ingredient import Ingredient as IngredientModel, IngredientSubstitute as IngredientSubstituteModel
+from ..schemas.ingredient import Ingredient, IngredientSubstitute
+
+ingredient_table = IngredientModel.__table__
+substitute_table = IngredientSubstituteModel.__table__
+
+
+def normalize_name(name: str) -> str:
+    """Case- and whitespace-insensitive key used for name resolution"""
+    return " ".join(name.casefold().split())
+
+
+class IngredientSnapshot:
+    def __init__(self, version: int, ingredients: List[Ingredient]):
+        self.version = version
+        self.ingredients = ingredients  # id order
+        self.by_id: Dict[int, Ingredient] = {ingredient.id: ingredient for ingredient in ingredients}
+        self.by_name: Dict[str, Ingredient] = {}
+        self.by_category: Dict[str, List[Ingredient]] = {}
+        for ingredient in ingredients:
+            self.by_name.setdefault(normalize_name(ingredient.name), ingredient)
+            if ingredient.category is not None:
+                self.by_category.setdefault(ingredient.category, []).append(ingredient)
+        self.categories = sorted(self.by_category)
+        self._search_keys = [(ingredient.name.casefold(), ingredient) for ingredient in ingredients]
+
+    def get(self, ingredient_id: int) -> Optional[Ingredient]:
+        return self.by_id.get(ingredient_id)
+
+    def find(self, name: str) -> Optional[Ingredient]:
+        return self.by_name.get(normalize_name(name))
+
+    def search(self, text: str) -> List[Ingredient]:
+        """Case-insensitive substring match on the name, in id order (same as the SQL LIKE search)"""
+        needle = text.casefold()
+        return [ingredient for key, ingredient in self._search_keys if needle in key]
+
+
+class IngredientCatalog:
+    def __init__(self):
+        self._snapshot: Optional[IngredientSnapshot] = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> IngredientSnapshot:
+        snapshot = self._snapshot
+        metrics.record_cache("ingredient_catalog", snapshot is not None)
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            if self._snapshot is not None:
+                return self._snapshot
+            generation = self._generation
+            snapshot = self._load(db)
+            # A write that landed while loading makes this copy stale: serve it to this caller only
+            if generation == self._generation:
+                self._snapshot = snapshot
+            return snapshot
+
+    def invalidate(self, entities=None, version=None):
+        if entities is None or "ingredient" in entities:
+            self._generation += 1
+            self._snapshot = None
+
+    @staticmethod
+    def _load(db: Session) -> IngredientSnapshot:
+        version = change_feed.version
+        rows = db.execute(select(ingredient_table).order_by(ingredient_table.c.id)).fetchall()
+        substitutes: Dict[int, List[IngredientSubstitute]] = {}
+        for sub in db.execute(select(substitute_table)).fetchall():
+            substitutes.setdefault(sub.source_ingredient_id, []).append(IngredientSubstitute(**sub._mapping))
+        return IngredientSnapshot(
+            version,
+            [Ingredient(**row._mapping, substitutes=substitutes.get(row.id, [])) for row in rows],
+        )
+
+
+ingredient_catalog = IngredientCatalog()
+change_feed.subscribe(ingredient_catalog.invalidate)
+change_feed.subscribe_local(ingredient_catalog.invalidate)
@@ -1,163 +1,291 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import text, bindparam, select, insert, update, delete
+from ..core.data_access import DataAccessStrategy, like_contains, resolve_strategy
+from ..models.ingredient import Ingredient as IngredientModel, IngredientSubstitute as IngredientSubstituteModel
+from ..models.recipe_ingredient import RecipeIngredient as RecipeIngredientModel
+from ..models.user_pantry import UserPantry as UserPantryModel
 from ..repositories.ingredient_repository import IngredientRepository
 from ..schemas.ingredient import Ingredient, IngredientCreate, IngredientUpdate, IngredientSubstitute
+from ..core.settings import settings
+from .ingredient_catalog import ingredient_catalog
+from ..core.tracing import trace_class
+from ..core.cookable import queue_recipes, queue_users
+from ..core.recipe_similarity import reindex_recipes
+from ..core.recipe_summary import refresh_summaries, refresh_summaries_using
 
+ingredient_table = IngredientModel.__table__
+substitute_table = IngredientSubstituteModel.__table__
+recipe_ingredient_table = RecipeIngredientModel.__table__
+pantry_table = UserPantryModel.__table__
 
+
+@trace_class("service")
 class IngredientService:
-    def __init__(self, db: Session):
+    """Reads are served from the in-process ingredient catalog (INGREDIENT_CATALOG) unless a strategy
+    is passed explicitly, which forces that database path (benchmarks, bulk export)."""
+    DEFAULT_STRATEGY = DataAccessStrategy.raw
+
+    def __init__(self, db: Session, strategy: Optional[DataAccessStrategy] = None):
         self.repository = IngredientRepository(db)
         self.db = db
-        
+        self.use_catalog = strategy is None and settings.INGREDIENT_CATALOG
+        self.strategy = resolve_strategy("ingredient", self.DEFAULT_STRATEGY, strategy)
+
     def get_all_ingredients(self, skip: int = 0, limit: int = 100) -> List[Ingredient]:
-        """ORM version"""
-        #return self.repository.get_all(skip, limit)
-        
-        """SQL version"""
-        query = text("""
-        SELECT * From ingredient
-        LIMIT :limit OFFSET :skip 
-        """)
-        result = self.db.execute(query, {"skip": skip, "limit": limit})
-        rows = result.fetchall()
-        ingredients = [Ingredient(**dict(row)) for row in rows]
-        return ingredients
+        if self.use_catalog:
+            return ingredient_catalog.get(self.db).ingredients[skip:skip + limit]
+
+        if self.strategy is DataAccessStrategy.orm:
+            return [Ingredient.model_validate(i) for i in self.repository.get_all(skip, limit)]
+
+        if self.strategy is DataAccessStrategy.core:
+            stmt = select(ingredient_table).order_by(ingredient_table.c.id).limit(limit).offset(skip)
+            rows = self.db.execute(stmt).fetchall()
+        else:
+            query = text("""
+            SELECT id, name, category FROM ingredient
+            ORDER BY id
+            LIMIT :limit OFFSET :skip
+            """)
+            rows = self.db.execute(query, {"skip": skip, "limit": limit}).fetchall()
+        return self.with_substitutes(rows)
 
     def get_ingredient_by_id(self, ingredient_id: int) -> Optional[Ingredient]:
-        #return self.repository.get_by_id(ingredient_id)
-        
-        query = text("""
-        SELECT * From ingredient
-        WHERE id = :ingredient_id
-        """)
-        result = self.db.execute(query, {"ingredient_id": ingredient_id})
-        row = result.fetchone()
-        return Ingredient(**dict(row))
+        if self.use_catalog:
+            return ingredient_catalog.get(self.db).get(ingredient_id)
+
+        if self.strategy is DataAccessStrategy.orm:
+            ingredient = self.repository.get_by_id(ingredient_id)
+            return Ingredient.model_validate(ingredient) if ingredient else None
+
+        if self.strategy is DataAccessStrategy.core:
+            row = self.db.execute(select(ingredient_table).where(ingredient_table.c.id == ingredient_id)).fetchone()
+        else:
+            query = text("""
+            SELECT id, name, category FROM ingredient
+            WHERE id = :ingredient_id
+            """)
+            row = self.db.execute(query, {"ingredient_id": ingredient_id}).fetchone()
+        return self.with_substitutes([row])[0] if row else None
 
     def get_ingredient_by_name(self, name: str) -> Optional[Ingredient]:
-        #return self.repository.get_by_name(name)
-        
-        query = text("""
-        SELECT * From ingredient
-        WHERE name = :name
-        """)
-        result = self.db.execute(query, {"name": name})
-        row = result.fetchone()
-        return Ingredient(**dict(row))
+        if self.use_catalog:
+            # Case- and whitespace-insensitive, so user-typed names resolve
+            return ingredient_catalog.get(self.db).find(name)
+
+        if self.strategy is DataAccessStrategy.orm:
+            ingredient = self.repository.get_by_name(name)
+            return Ingredient.model_validate(ingredient) if ingredient else None
+
+        if self.strategy is DataAccessStrategy.core:
+            row = self.db.execute(select(ingredient_table).where(ingredient_table.c.name == name)).fetchone()
+        else:
+            query = text("""
+            SELECT id, name, category FROM ingredient
+            WHERE name = :name
+            """)
+            row = self.db.execute(query, {"name": name}).fetchone()
+        return self.with_substitutes([row])[0] if row else None
+
+    def resolve_names(self, names: List[str]) -> Dict[str, Optional[int]]:
+        """Map each name to an ingredient id (None if unknown), for bulk imports"""
+        if self.use_catalog:
+            catalog = ingredient_catalog.get(self.db)
+            return {name: (ingredient.id if (ingredient := catalog.find(name)) else None) for name in names}
+
+        stmt = select(ingredient_table.c.name, ingredient_table.c.id).where(ingredient_table.c.name.in_(set(names)))
+        ids = dict(self.db.execute(stmt).fetchall())
+        return {name: ids.get(name) for name in names}
 
     def get_ingredients_by_category(self, category: str, skip: int = 0, limit: int = 100) -> List[Ingredient]:
-        #return self.repository.get_by_category(category, skip, limit)
-        
-        query = text("""
-        SELECT * From ingredient
-        WHERE category = :category
-        LIMIT :limit OFFSET :skip 
-        """)
-        result = self.db.execute(query, {"skip": skip, "limit": limit, "category": category})
-        rows = result.fetchall()
-        ingredients = [Ingredient(**dict(row)) for row in rows]
-        return ingredients
-        
+        if self.use_catalog:
+            return ingredient_catalog.get(self.db).by_category.get(category, [])[skip:skip + limit]
+
+        if self.strategy is DataAccessStrategy.orm:
+            return [Ingredient.model_validate(i) for i in self.repository.get_by_category(category, skip, limit)]
+
+        if self.strategy is DataAccessStrategy.core:
+            stmt = (
+                select(ingredient_table)
+                .where(ingredient_table.c.category == category)
+                .order_by(ingredient_table.c.id)
+                .limit(limit)
+                .offset(skip)
+            )
+            rows = self.db.execute(stmt).fetchall()
+        else:
+            query = text("""
+            SELECT id, name, category FROM ingredient
+            WHERE category = :category
+            ORDER BY id
+            LIMIT :limit OFFSET :skip
+            """)
+            rows = self.db.execute(query, {"skip": skip, "limit": limit, "category": category}).fetchall()
+        return self.with_substitutes(rows)
 
     def search_ingredients(self, name: str, skip: int = 0, limit: int = 100) -> List[Ingredient]:
-        #return self.repository.search_by_name(name, skip, limit)
-        query = text("""
-        SELECT * From ingredient
-        WHERE name LIKE :name
-        LIMIT :limit OFFSET :skip 
-        """)
-        result = self.db.execute(query, {"skip": skip, "limit": limit, "name": f'%{name}%'})
-        rows = result.fetchall()
-        ingredients = [Ingredient(**row._mapping) for row in rows]
-        return ingredients
+        if self.use_catalog:
+            return ingredient_catalog.get(self.db).search(name)[skip:skip + limit]
 
-    def create_ingredient(self, ingredient_data: IngredientCreate) -> Ingredient:
-        #return self.repository.create(ingredient_data)
-        
-        query = text("""
-        INSERT INTO ingredient (name, category)
-        VALUES (:name, :category)
-        RETURNING id, name, category
-        """)
-        
-        result = self.db.execute(query, {"name": ingredient_data.name, "category": ingredient_data.category})
-        self.db.commit()
-        row = result.fetchone()
-        return Ingredient(**dict(row))
-        
+        if self.strategy is DataAccessStrategy.orm:
+            return [Ingredient.model_validate(i) for i in self.repository.search_by_name(name, skip, limit)]
 
-    def update_ingredient(self, ingredient_id: int, ingredient_data: IngredientUpdate) -> Optional[Ingredient]:
-        #return self.repository.update(ingredient_id, ingredient_data)
-        
-        query = text("""
-            UPDATE ingredient
-            SET name = :name, category = :category
-            WHERE id = :ingredient_id
-            RETURNING id, name, category
-        """)
+        if self.strategy is DataAccessStrategy.core:
+            stmt = (
+                select(ingredient_table)
+                .where(ingredient_table.c.name.icontains(name, autoescape=True))
+                .order_by(ingredient_table.c.id)
+                .limit(limit)
+                .offset(skip)
+            )
+            rows = self.db.execute(stmt).fetchall()
+        else:
+            query = text("""
+            SELECT id, name, category FROM ingredient
+            WHERE LOWER(name) LIKE LOWER(:name) ESCAPE '/'
+            ORDER BY id
+            LIMIT :limit OFFSET :skip
+            """)
+            rows = self.db.execute(query, {"skip": skip, "limit": limit, "name": like_contains(name)}).fetchall()
+        return self.with_substitutes(rows)
 
-        result = self.db.execute( query, {
-            "ingredient_id": ingredient_id,
-            "name": ingredient_data.name,
-            "category": ingredient_data.category
-        })
+    def create_ingredient(self, ingredient_data: IngredientCreate) -> Ingredient:
+        if self.strategy is DataAccessStrategy.orm:
+            return Ingredient.model_validate(self.repository.create(ingredient_data))
 
+        values = {"name": ingredient_data.name, "category": ingredient_data.category}
+        if self.strategy is DataAccessStrategy.core:
+            result = self.db.execute(insert(ingredient_table).values(**values))
+            ingredient_id = result.inserted_primary_key[0]
+        else:
+            query = text("""
+            INSERT INTO ingredient (name, category)
+            VALUES (:name, :category)
+            """)
+            ingredient_id = self.db.execute(query, values).lastrowid
         self.db.commit()
+        return Ingredient(id=ingredient_id, **values)
 
-        row = result.fetchone()
-        return Ingredient(**dict(row)) if row else None
+    def update_ingredient(self, ingredient_id: int, ingredient_data: IngredientUpdate) -> Optional[Ingredient]:
+        if self.strategy is DataAccessStrategy.orm:
+            ingredient = self.repository.update(ingredient_id, ingredient_data)
+            return Ingredient.model_validate(ingredient) if ingredient else None
+
+        update_data = ingredient_data.model_dump(exclude_unset=True)
+        if update_data:
+            if self.strategy is DataAccessStrategy.core:
+                stmt = update(ingredient_table).where(ingredient_table.c.id == ingredient_id).values(**update_data)
+                self.db.execute(stmt)
+            else:
+                # Only the columns sent by the client are updated (column names come from the schema, not user input)
+                assignments = ", ".join(f"{column} = :{column}" for column in update_data)
+                query = text(f"UPDATE ingredient SET {assignments} WHERE id = :ingredient_id")
+                self.db.execute(query, {**update_data, "ingredient_id": ingredient_id})
+            if "name" in update_data:
+                refresh_summaries_using(self.db.connection(), ingredient_id)
+            self.db.commit()
+        return self.get_ingredient_by_id(ingredient_id)
 
     def delete_ingredient(self, ingredient_id: int) -> bool:
-        #return self.repository.delete(ingredient_id)
-        
-        query = text("""
-        DELETE FROM ingredient
-        WHERE id = :ingredient_id
-        """)
-        
-        
-        result = self.db.execute(query, {"ingredient_id": ingredient_id})
-        self.db.commit()
+        if self.strategy is DataAccessStrategy.orm:
+            return self.repository.delete(ingredient_id)
 
+        recipe_ids = self.db.execute(
+            select(recipe_ingredient_table.c.recipe_id).where(recipe_ingredient_table.c.ingredient_id == ingredient_id)
+        ).scalars().all()
+        user_ids = self.db.execute(
+            select(pantry_table.c.user_id).where(pantry_table.c.ingredient_id == ingredient_id)
+        ).scalars().all()
+        # Mirror the ORM cascade so dependents go away even where FK cascades are not enforced (SQLite)
+        if self.strategy is DataAccessStrategy.core:
+            self.db.execute(delete(substitute_table).where(substitute_table.c.source_ingredient_id == ingredient_id))
+            self.db.execute(delete(recipe_ingredient_table).where(recipe_ingredient_table.c.ingredient_id == ingredient_id))
+            self.db.execute(delete(pantry_table).where(pantry_table.c.ingredient_id == ingredient_id))
+            result = self.db.execute(delete(ingredient_table).where(ingredient_table.c.id == ingredient_id))
+        else:
+            params = {"ingredient_id": ingredient_id}
+            self.db.execute(text("DELETE FROM ingredient_substitute WHERE source_ingredient_id = :ingredient_id"), params)
+            self.db.execute(text("DELETE FROM recipe_ingredient WHERE ingredient_id = :ingredient_id"), params)
+            self.db.execute(text("DELETE FROM user_pantry WHERE ingredient_id = :ingredient_id"), params)
+            query = text("""
+            DELETE FROM ingredient
+            WHERE id = :ingredient_id
+            """)
+            result = self.db.execute(query, params)
+        refresh_summaries(self.db.connection(), recipe_ids)
+        reindex_recipes(self.db.connection(), recipe_ids)
+        queue_recipes(self.db.connection(), recipe_ids)
+        queue_users(self.db.connection(), user_ids)
+        self.db.commit()
         return result.rowcount > 0
 
     def add_substitute(self, ingredient_id: int, substitute_name: str, unit: Optional[str] = None, category: Optional[str] = None) -> Optional[IngredientSubstitute]:
-        #return self.repository.add_substitute(ingredient_id, substitute_name, unit, category)
-        
-        query = text("""
-        INSERT INTO ingredient_substitute (source_ingredient_id, name, unit, category)
-        VALUES (:ingredient_id, :name, :unit, :category)
-        RETURNING source_ingredient_id, name, unit, category
-        """)
-
-        result = self.db.execute(query, {
-            "ingredient_id": ingredient_id,
-            "name": substitute_name,
-            "unit": unit,
-            "category": category
-        })
+        if self.strategy is DataAccessStrategy.orm:
+            substitute = self.repository.add_substitute(ingredient_id, substitute_name, unit, category)
+            return IngredientSubstitute.model_validate(substitute) if substitute else None
 
+        values = {"source_ingredient_id": ingredient_id, "name": substitute_name, "unit": unit, "category": category}
+        if self.strategy is DataAccessStrategy.core:
+            exists = self.db.execute(select(ingredient_table.c.id).where(ingredient_table.c.id == ingredient_id)).first()
+            if not exists:
+                return None
+            self.db.execute(insert(substitute_table).values(**values))
+        else:
+            exists = self.db.execute(text("SELECT id FROM ingredient WHERE id = :id"), {"id": ingredient_id}).first()
+            if not exists:
+                return None
+            query = text("""
+            INSERT INTO ingredient_substitute (source_ingredient_id, name, unit, category)
+            VALUES (:source_ingredient_id, :name, :unit, :category)
+            """)
+            self.db.execute(query, values)
         self.db.commit()
-
-        row = result.fetchone()
-        return IngredientSubstitute(**dict(row)) if row else None
+        return IngredientSubstitute(**values)
 
     def get_unique_categories(self) -> List[str]:
-        # """Get all unique ingredient categories"""
-        # ingredients = self.repository.get_all(skip=0, limit=1000)  # Get all for categories
-        # categories = set()
-        # for ingredient in ingredients:
-        #     if ingredient.category:
-        #         categories.add(ingredient.category)
-        # return sorted(list(categories))
-        
-        query = text("""
-        SELECT DISTINCT category 
-        FROM ingredient
-        WHERE category IS NOT NULL
-        ORDER BY category
-        """)
-        result = self.db.execute(query)
-        categories = [row[0] for row in result.fetchall()]
-        return categories
\ No newline at end of file
+        """Get all unique ingredient categories"""
+        if self.use_catalog:
+            return list(ingredient_catalog.get(self.db).categories)
+
+        if self.strategy is DataAccessStrategy.orm:
+            return self.repository.get_unique_categories()
+
+        if self.strategy is DataAccessStrategy.core:
+            stmt = (
+                select(ingredient_table.c.category)
+                .where(ingredient_table.c.category.isnot(None))
+                .distinct()
+                .order_by(ingredient_table.c.category)
+            )
+            rows = self.db.execute(stmt).fetchall()
+        else:
+            query = text("""
+            SELECT DISTINCT category
+            FROM ingredient
+            WHERE category IS NOT NULL
+            ORDER BY category
+            """)
+            rows = self.db.execute(query).fetchall()
+        return [row[0] for row in rows]
+
+    def with_substitutes(self, rows) -> List[Ingredient]:
+        """Build Ingredient schemas from ingredient rows (id, name, category), loading substitutes for
+        the whole page or export batch in one query"""
+        if not rows:
+            return []
+        ids = [row.id for row in rows]
+        if self.strategy is DataAccessStrategy.core:
+            stmt = select(substitute_table).where(substitute_table.c.source_ingredient_id.in_(ids))
+            substitute_rows = self.db.execute(stmt).fetchall()
+        else:
+            query = text("""
+            SELECT source_ingredient_id, name, unit, category FROM ingredient_substitute
+            WHERE source_ingredient_id IN :ids
+            """).bindparams(bindparam("ids", expanding=True))
+            substitute_rows = self.db.execute(query, {"ids": ids}).fetchall()
+
+        substitutes = {}
+        for sub in substitute_rows:
+            substitutes.setdefault(sub.source_ingredient_id, []).append(IngredientSubstitute(**sub._mapping))
+        return [Ingredient(**row._mapping, substitutes=substitutes.get(row.id, [])) for row in rows]
@@ -0,0 +1,41 @@
+from typing import List
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..core.popularity import popularity_counters
+from ..core.tracing import trace_class
+from ..models.recipe import Recipe as RecipeModel
+from ..schemas.recipe import PopularRecipe, TrendingRecipe
+
+recipe_table = RecipeModel.__table__
+
+
+@trace_class("service")
+class PopularityService:
+    """Leaderboards from the in-memory popularity counters; only the page itself is read from the database"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_popular(self, skip: int = 0, limit: int = 10) -> List[PopularRecipe]:
+        ranked = popularity_counters.top_popular(limit, skip)
+        rows = self._rows([recipe_id for recipe_id, _ in ranked])
+        return [
+            PopularRecipe.model_validate({
+                **rows[recipe_id]._mapping, "favorites": favorites, "views": popularity_counters.views.get(recipe_id, 0),
+            })
+            for recipe_id, favorites in ranked if recipe_id in rows
+        ]
+
+    def get_trending(self, skip: int = 0, limit: int = 10) -> List[TrendingRecipe]:
+        ranked = popularity_counters.top_trending(limit, skip)
+        rows = self._rows([recipe_id for recipe_id, _ in ranked])
+        return [
+            TrendingRecipe.model_validate({**rows[recipe_id]._mapping, "score": round(score, 2)})
+            for recipe_id, score in ranked if recipe_id in rows
+        ]
+
+    def _rows(self, recipe_ids: List[int]) -> dict:
+        """Recipe rows by id (recipes deleted since the counters were loaded are left out)"""
+        if not recipe_ids:
+            return {}
+        return {row.id: row for row in self.db.execute(select(recipe_table).where(recipe_table.c.id.in_(recipe_ids)))}
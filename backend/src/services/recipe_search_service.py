@@ -0,0 +1,338 @@
+"""
+Multi-criteria recipe search: category, name text, max total time, must-include
+and must-exclude ingredients and a minimum ingredient match, in any combination.
+
+Two engines answer the same query:
+
+- index: runs on the memory-mapped catalog snapshot. Category and include
+  ingredients are posting lists whose exact sizes are free to read, so the
+  smallest one drives (or the name scan, or all recipes if neither is given)
+  and the remaining posting lists are probed by bisection in ascending size.
+  The per-recipe checks (total time, excluded ingredients, name text) follow in
+  order of their pass rate on a small sample of the candidates, then the match
+  percentage. Only the final page is read from the database, so rows deleted
+  since the last snapshot rebuild drop out.
+- sql: one SELECT with every predicate pushed down (include as a grouped
+  IN-subquery, exclude as NOT EXISTS, the match as correlated counts) and the
+  total as a window count; the database orders the predicates itself.
+
+The index engine is used whenever the snapshot is mapped and RECIPE_SEARCH_INDEX
+is on. Results are ordered by match percentage (when `have` or `include` is
+given) and then id.
+
+Facets (`facets=True`) count the matches per category, per cumulative total
+time bucket and per ingredient (top `facet_size`). Category and time are
+counted with their own filter dropped, so each chip shows what selecting it
+would return. The index engine counts positions against the snapshot columns
+in C (Counter over map / views); the SQL engine runs one GROUP BY per facet.
+"""
+import heapq
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import and_, case, distinct, exists, false, func, or_, select
+from sqlalchemy.orm import Session
+from ..core.catalog_snapshot import CatalogSnapshot, catalog_snapshot
+from ..core.settings import settings
+from ..core.tracing import trace_class, span
+from ..models.recipe import Recipe as RecipeModel
+from ..models.recipe_ingredient import RecipeIngredient as RecipeIngredientModel
+from ..models.ingredient import Ingredient as IngredientModel
+from ..schemas.recipe import (
+    CategoryFacet, IngredientFacet, RecipeFacets, RecipeSearchHit, RecipeSearchQuery, RecipeSearchResult, TotalTimeFacet
+)
+
+recipe_table = RecipeModel.__table__
+recipe_ingredient_table = RecipeIngredientModel.__table__
+ingredient_table = IngredientModel.__table__
+
+_SUMMARY_COLUMNS = (
+    recipe_table.c.id,
+    recipe_table.c.name,
+    recipe_table.c.category,
+    recipe_table.c.cook_time_in_minutes,
+    recipe_table.c.prep_time_in_minutes,
+)
+
+
+_TOTAL_MINUTES = (
+    func.coalesce(recipe_table.c.cook_time_in_minutes, 0) + func.coalesce(recipe_table.c.prep_time_in_minutes, 0)
+)
+_SAMPLE_SIZE = 256
+# Cumulative `max_total_time` values offered as total time facets
+TIME_FACET_BUCKETS = (15, 30, 45, 60, 90, 120)
+
+
+def _matched_count(ingredient_ids):
+    return (
+        select(func.count()).select_from(recipe_ingredient_table)
+        .where(recipe_ingredient_table.c.recipe_id == recipe_table.c.id,
+               recipe_ingredient_table.c.ingredient_id.in_(ingredient_ids))
+        .correlate(recipe_table)
+        .scalar_subquery()
+    )
+
+
+def _ingredient_count():
+    return (
+        select(func.count()).select_from(recipe_ingredient_table)
+        .where(recipe_ingredient_table.c.recipe_id == recipe_table.c.id)
+        .correlate(recipe_table)
+        .scalar_subquery()
+    )
+
+
+def _facets(categories: Dict[str, int], total_minutes: Dict[int, int], ingredients) -> RecipeFacets:
+    """Assemble facets from per-category counts, counts per total minutes (-1 unknown) and
+    the top (ingredient_id, name, count) rows"""
+    return RecipeFacets(
+        categories=[
+            CategoryFacet(category=category, count=count)
+            for category, count in sorted(categories.items(), key=lambda item: (-item[1], item[0]))
+        ],
+        total_time=[
+            TotalTimeFacet(
+                max_total_time=bucket,
+                count=sum(count for minutes, count in total_minutes.items() if 0 <= minutes <= bucket),
+            )
+            for bucket in TIME_FACET_BUCKETS
+        ],
+        ingredients=[
+            IngredientFacet(ingredient_id=ingredient_id, name=name, count=count)
+            for ingredient_id, name, count in ingredients
+        ],
+    )
+
+
+def _by_selectivity(candidates, checks):
+    """Order per-recipe checks by their pass rate on an evenly spaced sample of the candidates"""
+    if len(checks) < 2 or not candidates:
+        return checks
+    sample = candidates[::max(1, len(candidates) // _SAMPLE_SIZE)]
+    return sorted(checks, key=lambda check: sum(1 for position in sample if check[1](position)))
+
+
+def _contains(posting, position: int) -> bool:
+    index = bisect_left(posting, position)
+    return index < len(posting) and posting[index] == position
+
+
+@trace_class("service")
+class RecipeSearchService:
+    def __init__(self, db: Session, use_index: Optional[bool] = None):
+        self.db = db
+        self.use_index = settings.RECIPE_SEARCH_INDEX if use_index is None else use_index
+
+    def search(self, query: RecipeSearchQuery, facets: bool = False, facet_size: int = 10) -> RecipeSearchResult:
+        snapshot = catalog_snapshot.get() if self.use_index else None
+        if snapshot is not None:
+            plan = []
+            positions, scores = self._match_index(snapshot, query, plan)
+            result = self._page_index(snapshot, query, positions, scores, plan)
+            if facets:
+                result.facets = self._facets_index(snapshot, query, positions, facet_size)
+            return result
+        result = self._search_sql(query)
+        if facets:
+            result.facets = self._facets_sql(query, facet_size)
+        return result
+
+    # Index engine
+
+    def _match_index(self, snapshot: CatalogSnapshot, query: RecipeSearchQuery, plan: List[str]):
+        """Positions of the matching recipes (ascending) and their match scores, logging each step to `plan`"""
+        postings = []
+        if query.category is not None:
+            postings.append((f"category = {query.category!r}", snapshot.recipes_in_category(query.category)))
+        for ingredient_id in sorted(set(query.include)):
+            postings.append((f"include {ingredient_id}", snapshot.recipes_with_ingredient(ingredient_id)))
+        postings.sort(key=lambda item: len(item[1]))
+
+        checks = []
+        if query.max_total_time is not None:
+            limit, total_minutes_at = query.max_total_time, snapshot.total_minutes_at
+            checks.append((f"total time <= {limit}", lambda p: 0 <= total_minutes_at(p) <= limit))
+        if query.exclude:
+            excluded, ingredient_ids_at = set(query.exclude), snapshot.ingredient_ids_at
+            checks.append((f"exclude {sorted(excluded)}", lambda p: excluded.isdisjoint(ingredient_ids_at(p))))
+        name_check = None
+        if query.text:
+            text, name_contains_at = query.text, snapshot.name_contains_at
+            name_check = (f"name ~ {text!r}", lambda p: name_contains_at(p, text))
+            checks.append(name_check)
+
+        with span("search.candidates"):
+            if postings:
+                label, candidates = postings.pop(0)
+                plan.append(f"index {label}: {len(candidates)}")
+            else:
+                candidates = range(snapshot.recipe_count)
+                checks = _by_selectivity(candidates, checks)
+                if checks and checks[0] is name_check:
+                    # The name is the most selective filter: find its matches with one C scan of the names
+                    candidates = snapshot.recipes_matching_name(query.text)
+                    checks.pop(0)
+                    plan.append(f"scan name ~ {query.text!r}: {len(candidates)}")
+                else:
+                    plan.append(f"all recipes: {len(candidates)}")
+
+        with span("search.filter", candidates=len(candidates)):
+            for label, posting in postings:
+                candidates = [position for position in candidates if _contains(posting, position)]
+                plan.append(f"probe {label} ({len(posting)}): {len(candidates)}")
+            for label, check in _by_selectivity(candidates, checks):
+                candidates = [position for position in candidates if check(position)]
+                plan.append(f"{label}: {len(candidates)}")
+
+        matched_ids = set(query.have) | set(query.include)
+        scores = {}
+        if matched_ids:
+            with span("search.match", candidates=len(candidates)):
+                min_match = query.min_match or 0
+                kept = []
+                for position in candidates:
+                    ingredient_ids = snapshot.ingredient_ids_at(position)
+                    matched = sum(1 for ingredient_id in ingredient_ids if ingredient_id in matched_ids)
+                    if matched * 100 >= min_match * len(ingredient_ids):
+                        scores[position] = matched / len(ingredient_ids) if ingredient_ids else 0.0
+                        kept.append(position)
+                candidates = kept
+                plan.append(f"match >= {min_match}%: {len(candidates)}")
+        elif query.min_match:
+            candidates = []
+            plan.append(f"match >= {query.min_match}%: 0")
+        return candidates, scores
+
+    def _page_index(self, snapshot: CatalogSnapshot, query: RecipeSearchQuery, positions, scores,
+                    plan: List[str]) -> RecipeSearchResult:
+        if scores:
+            # Positions ascend with ids, so a stable sort keeps id order within equal scores
+            positions = sorted(positions, key=lambda position: -scores[position])
+        page = positions[query.skip:query.skip + query.limit]
+        ids = [snapshot.recipe_id_at(position) for position in page]
+        rows = {row.id: row for row in self.db.execute(select(*_SUMMARY_COLUMNS).where(recipe_table.c.id.in_(ids)))}
+        scored = bool(query.have or query.include)
+        items = [
+            self._hit(rows[recipe_id], scores.get(position) if scored else None)
+            for position, recipe_id in zip(page, ids) if recipe_id in rows
+        ]
+        return RecipeSearchResult(total=len(positions), items=items, plan=plan)
+
+    def _facets_index(self, snapshot: CatalogSnapshot, query: RecipeSearchQuery, positions,
+                      facet_size: int) -> RecipeFacets:
+        with span("search.facets", matches=len(positions)):
+            category_positions, time_positions = positions, positions
+            if query.category is not None:
+                category_positions, _ = self._match_index(snapshot, query.model_copy(update={"category": None}), [])
+            if query.max_total_time is not None:
+                time_positions, _ = self._match_index(snapshot, query.model_copy(update={"max_total_time": None}), [])
+            ingredient_counts = snapshot.ingredient_counts(positions)
+            for ingredient_id in query.include:
+                ingredient_counts.pop(ingredient_id, None)
+            top = heapq.nsmallest(facet_size, ingredient_counts.items(), key=lambda item: (-item[1], item[0]))
+            return _facets(
+                snapshot.category_counts(category_positions),
+                snapshot.total_minutes_counts(time_positions),
+                [(ingredient_id, (snapshot.ingredient(ingredient_id) or ("",))[0], count) for ingredient_id, count in top],
+            )
+
+    # SQL engine
+
+    def _sql_filters(self, query: RecipeSearchQuery) -> Tuple[list, List[str]]:
+        """WHERE conditions on `recipe` and their plan labels. Subqueries correlate on `recipe` only,
+        so the conditions also apply to queries that join recipe_ingredient"""
+        r, ri = recipe_table, recipe_ingredient_table
+        conditions, plan = [], []
+        if query.category is not None:
+            conditions.append(r.c.category == query.category)
+            plan.append(f"category = {query.category!r}")
+        if query.include:
+            include = sorted(set(query.include))
+            conditions.append(r.c.id.in_(
+                select(ri.c.recipe_id)
+                .where(ri.c.ingredient_id.in_(include))
+                .group_by(ri.c.recipe_id)
+                .having(func.count(distinct(ri.c.ingredient_id)) == len(include))
+                .correlate(None)
+            ))
+            plan.append(f"include all of {include}")
+        if query.max_total_time is not None:
+            conditions.append(or_(r.c.cook_time_in_minutes.isnot(None), r.c.prep_time_in_minutes.isnot(None)))
+            conditions.append(_TOTAL_MINUTES <= query.max_total_time)
+            plan.append(f"total time <= {query.max_total_time}")
+        if query.exclude:
+            conditions.append(~exists().where(
+                ri.c.recipe_id == r.c.id, ri.c.ingredient_id.in_(sorted(set(query.exclude)))
+            ).correlate(r))
+            plan.append(f"exclude {sorted(set(query.exclude))}")
+        if query.text:
+            conditions.append(r.c.name.icontains(query.text, autoescape=True))
+            plan.append(f"name ~ {query.text!r}")
+        if query.min_match:
+            matched_ids = sorted(set(query.have) | set(query.include))
+            conditions.append(
+                _matched_count(matched_ids) * 100 >= query.min_match * _ingredient_count() if matched_ids else false()
+            )
+            plan.append(f"match >= {query.min_match}%")
+        return conditions, plan
+
+    def _search_sql(self, query: RecipeSearchQuery) -> RecipeSearchResult:
+        conditions, plan = self._sql_filters(query)
+        matched_ids = sorted(set(query.have) | set(query.include))
+        stmt = select(*_SUMMARY_COLUMNS).where(*conditions)
+        if matched_ids:
+            total = _ingredient_count()
+            score = case((total == 0, 0.0), else_=_matched_count(matched_ids) * 1.0 / total).label("score")
+            stmt = stmt.add_columns(score).order_by(score.desc(), recipe_table.c.id)
+        else:
+            stmt = stmt.order_by(recipe_table.c.id)
+
+        counted = stmt.add_columns(func.count().over().label("total_count"))
+        rows = self.db.execute(counted.limit(query.limit).offset(query.skip)).fetchall()
+        if rows:
+            total_count = rows[0].total_count
+        elif query.skip:
+            total_count = self.db.execute(select(func.count()).select_from(stmt.subquery())).scalar()
+        else:
+            total_count = 0
+        items = [self._hit(row, row.score if matched_ids else None) for row in rows]
+        return RecipeSearchResult(total=total_count, items=items, plan=["sql: " + (" AND ".join(plan) or "all recipes")])
+
+    def _facets_sql(self, query: RecipeSearchQuery, facet_size: int) -> RecipeFacets:
+        """One grouped aggregate per facet, each over the matches of its own filter set"""
+        r, ri = recipe_table, recipe_ingredient_table
+        conditions, _ = self._sql_filters(query)
+        category_conditions, _ = self._sql_filters(query.model_copy(update={"category": None}))
+        time_conditions, _ = self._sql_filters(query.model_copy(update={"max_total_time": None}))
+
+        with span("search.facets"):
+            categories = self.db.execute(
+                select(r.c.category, func.count())
+                .where(r.c.category.isnot(None), *category_conditions)
+                .group_by(r.c.category)
+            ).all()
+            minutes = case(
+                (and_(r.c.cook_time_in_minutes.is_(None), r.c.prep_time_in_minutes.is_(None)), -1),
+                else_=_TOTAL_MINUTES,
+            )
+            total_minutes = self.db.execute(select(minutes, func.count()).where(*time_conditions).group_by(minutes)).all()
+            count = func.count().label("count")
+            ingredients = self.db.execute(
+                select(ri.c.ingredient_id, ingredient_table.c.name, count)
+                .select_from(ri.join(r, ri.c.recipe_id == r.c.id).join(ingredient_table, ri.c.ingredient_id == ingredient_table.c.id))
+                .where(ri.c.ingredient_id.notin_(query.include), *conditions)
+                .group_by(ri.c.ingredient_id, ingredient_table.c.name)
+                .order_by(count.desc(), ri.c.ingredient_id)
+                .limit(facet_size)
+            ).all()
+        return _facets(dict(categories), dict(total_minutes), [tuple(row) for row in ingredients])
+
+    @staticmethod
+    def _hit(row, score: Optional[float]) -> RecipeSearchHit:
+        return RecipeSearchHit(
+            id=row.id,
+            name=row.name,
+            category=row.category,
+            cook_time_in_minutes=row.cook_time_in_minutes,
+            prep_time_in_minutes=row.prep_time_in_minutes,
+            match_percentage=round(score * 100, 1) if score is not None else None,
+        )
@@ -1,28 +1,116 @@
-from typing import List, Optional
+from typing import List, Optional, Union
 from sqlalchemy.orm import Session
+from sqlalchemy import text, bindparam, select
+from ..core.data_access import DataAccessStrategy, like_contains, resolve_strategy
+from ..models.recipe import Recipe as RecipeModel, RecipeStep as RecipeStepModel
+from ..models.recipe_ingredient import RecipeIngredient as RecipeIngredientModel
+from ..models.ingredient import Ingredient as IngredientModel
+from ..models.recipe_summary import RecipeSummary as RecipeSummaryModel
 from ..repositories.recipe_repository import RecipeRepository
-from ..schemas.recipe import Recipe, RecipeCreate, RecipeUpdate
+from ..schemas.recipe import Recipe, RecipeSummary, RecipeCreate, RecipeUpdate
+from ..core.tracing import trace_class, span
 
+recipe_table = RecipeModel.__table__
+step_table = RecipeStepModel.__table__
+recipe_ingredient_table = RecipeIngredientModel.__table__
+ingredient_table = IngredientModel.__table__
+summary_table = RecipeSummaryModel.__table__
 
+_RECIPE_COLUMNS = "id, name, category, cook_time_in_minutes, prep_time_in_minutes"
+
+
+@trace_class("service")
 class RecipeService:
-    def __init__(self, db: Session):
+    """Recipe reads go through the configured data-access strategy; writes always use the ORM
+    repository because they span recipe, recipe_ingredient and recipe_step in one unit of work."""
+    DEFAULT_STRATEGY = DataAccessStrategy.orm
+
+    def __init__(self, db: Session, strategy: Optional[DataAccessStrategy] = None):
         self.repository = RecipeRepository(db)
+        self.db = db
+        self.strategy = resolve_strategy("recipe", self.DEFAULT_STRATEGY, strategy)
 
-    def get_all_recipes(self, skip: int = 0, limit: int = 100) -> List[Recipe]:
-        recipes = self.repository.get_all(skip, limit)
-        return [self._format_recipe(recipe) for recipe in recipes]
+    def get_all_recipes(self, skip: int = 0, limit: int = 100, as_dicts: bool = False) -> List[Union[Recipe, dict]]:
+        """Recipes by id; `as_dicts` returns plain dicts shaped like Recipe instead of validated models
+        (for list responses that are only encoded; see benchmarks/serialization.py)"""
+        if self.strategy is DataAccessStrategy.orm:
+            recipes = self.repository.get_all(skip, limit)
+            return self._format_all(recipes, as_dicts)
+
+        if self.strategy is DataAccessStrategy.core:
+            stmt = select(recipe_table).order_by(recipe_table.c.id).limit(limit).offset(skip)
+            rows = self.db.execute(stmt).fetchall()
+        else:
+            query = text(f"SELECT {_RECIPE_COLUMNS} FROM recipe ORDER BY id LIMIT :limit OFFSET :skip")
+            rows = self.db.execute(query, {"limit": limit, "skip": skip}).fetchall()
+        return self.hydrate(rows, as_dicts)
+
+    def get_recipe_summaries(self, skip: int = 0, limit: int = 100, category: Optional[str] = None,
+                             search: Optional[str] = None) -> List[RecipeSummary]:
+        """Recipe columns only, for list views (same filters as the full list endpoints)"""
+        rows = self.repository.get_summaries(skip, limit, category, search)
+        return [RecipeSummary.model_validate(row) for row in rows]
 
     def get_recipe_by_id(self, recipe_id: int) -> Optional[Recipe]:
-        recipe = self.repository.get_by_id(recipe_id)
-        return self._format_recipe(recipe) if recipe else None
+        if self.strategy is DataAccessStrategy.orm:
+            recipe = self.repository.get_by_id(recipe_id)
+            return self._format_recipe(recipe) if recipe else None
 
-    def get_recipes_by_category(self, category: str, skip: int = 0, limit: int = 100) -> List[Recipe]:
-        recipes = self.repository.get_by_category(category, skip, limit)
-        return [self._format_recipe(recipe) for recipe in recipes]
+        if self.strategy is DataAccessStrategy.core:
+            row = self.db.execute(select(recipe_table).where(recipe_table.c.id == recipe_id)).fetchone()
+        else:
+            query = text(f"SELECT {_RECIPE_COLUMNS} FROM recipe WHERE id = :recipe_id")
+            row = self.db.execute(query, {"recipe_id": recipe_id}).fetchone()
+        return self.hydrate([row])[0] if row else None
 
-    def search_recipes(self, name: str, skip: int = 0, limit: int = 100) -> List[Recipe]:
-        recipes = self.repository.search_by_name(name, skip, limit)
-        return [self._format_recipe(recipe) for recipe in recipes]
+    def get_recipes_by_category(self, category: str, skip: int = 0, limit: int = 100,
+                                as_dicts: bool = False) -> List[Union[Recipe, dict]]:
+        if self.strategy is DataAccessStrategy.orm:
+            recipes = self.repository.get_by_category(category, skip, limit)
+            return self._format_all(recipes, as_dicts)
+
+        if self.strategy is DataAccessStrategy.core:
+            stmt = (
+                select(recipe_table)
+                .where(recipe_table.c.category == category)
+                .order_by(recipe_table.c.id)
+                .limit(limit)
+                .offset(skip)
+            )
+            rows = self.db.execute(stmt).fetchall()
+        else:
+            query = text(f"""
+            SELECT {_RECIPE_COLUMNS} FROM recipe
+            WHERE category = :category
+            ORDER BY id
+            LIMIT :limit OFFSET :skip
+            """)
+            rows = self.db.execute(query, {"category": category, "limit": limit, "skip": skip}).fetchall()
+        return self.hydrate(rows, as_dicts)
+
+    def search_recipes(self, name: str, skip: int = 0, limit: int = 100, as_dicts: bool = False) -> List[Union[Recipe, dict]]:
+        if self.strategy is DataAccessStrategy.orm:
+            recipes = self.repository.search_by_name(name, skip, limit)
+            return self._format_all(recipes, as_dicts)
+
+        if self.strategy is DataAccessStrategy.core:
+            stmt = (
+                select(recipe_table)
+                .where(recipe_table.c.name.icontains(name, autoescape=True))
+                .order_by(recipe_table.c.id)
+                .limit(limit)
+                .offset(skip)
+            )
+            rows = self.db.execute(stmt).fetchall()
+        else:
+            query = text(f"""
+            SELECT {_RECIPE_COLUMNS} FROM recipe
+            WHERE LOWER(name) LIKE LOWER(:name) ESCAPE '/'
+            ORDER BY id
+            LIMIT :limit OFFSET :skip
+            """)
+            rows = self.db.execute(query, {"name": like_contains(name), "limit": limit, "skip": skip}).fetchall()
+        return self.hydrate(rows, as_dicts)
 
     def create_recipe(self, recipe_data: RecipeCreate) -> Recipe:
         recipe = self.repository.create(recipe_data)
@@ -36,79 +124,142 @@ class RecipeService:
         return self.repository.delete(recipe_id)
 
     def get_recipes_by_ingredients(self, ingredient_ids: List[int], skip: int = 0, limit: int = 50):
-        """Find recipes that can be made with the given ingredients"""
-        # For now, return a simple implementation that finds recipes containing any of the ingredients
-        # In a real implementation, you'd want more sophisticated matching logic
-        
-        from ..models.recipe import Recipe as RecipeModel
-        from ..models.recipe_ingredient import RecipeIngredient
-        from sqlalchemy import distinct
-        
-        # Get recipes that contain any of the specified ingredients
-        recipes_query = (
-            self.repository.db.query(RecipeModel)
-            .join(RecipeIngredient)
-            .filter(RecipeIngredient.ingredient_id.in_(ingredient_ids))
-            .distinct()
-            .offset(skip)
-            .limit(limit)
-        )
-        
-        recipes = recipes_query.all()
-        
-        # Calculate match percentages and format results
-        results = []
-        for recipe in recipes:
-            # Get all ingredient IDs for this recipe
-            recipe_ingredient_ids = [ri.ingredient_id for ri in recipe.recipe_ingredients]
-            
-            # Calculate match percentage
-            matching_ingredients = set(ingredient_ids) & set(recipe_ingredient_ids)
-            match_percentage = (len(matching_ingredients) / len(recipe_ingredient_ids)) * 100
-            
-            # Get ingredient names for available and missing ingredients
-            available_ingredients = []
-            missing_ingredients = []
-            
-            for ri in recipe.recipe_ingredients:
-                ingredient_name = ri.ingredient.name if ri.ingredient else f"Ingredient {ri.ingredient_id}"
-                if ri.ingredient_id in ingredient_ids:
-                    available_ingredients.append(ingredient_name)
-                else:
-                    missing_ingredients.append(ingredient_name)
-            
-            results.append({
-                "recipe": self._format_recipe(recipe),
-                "match_percentage": round(match_percentage, 1),
-                "available_ingredients": available_ingredients,
-                "missing_ingredients": missing_ingredients
-            })
-        
-        # Sort by match percentage (highest first)
-        results.sort(key=lambda x: x["match_percentage"], reverse=True)
-        
+        """Recipes using any of the given ingredients, best match (share of the recipe's ingredients
+        among them) first, then by id. Scored from recipe_summary; only the page is hydrated."""
+        wanted = set(ingredient_ids)
+        with span("match.query", ingredient_count=len(wanted)):
+            candidates = self.db.execute(
+                select(summary_table.c.recipe_id, summary_table.c.ingredient_ids, summary_table.c.ingredient_names)
+                .where(summary_table.c.recipe_id.in_(
+                    select(recipe_ingredient_table.c.recipe_id)
+                    .where(recipe_ingredient_table.c.ingredient_id.in_(wanted))
+                ))
+            ).fetchall()
+
+        with span("match.score", recipes=len(candidates)):
+            scored = sorted(
+                (
+                    (-len(wanted.intersection(row.ingredient_ids)) / len(row.ingredient_ids), row.recipe_id, row)
+                    for row in candidates if row.ingredient_ids
+                ),
+                key=lambda item: item[:2],
+            )[skip:skip + limit]
+
+        with span("match.format", recipes=len(scored)):
+            recipes = {recipe.id: recipe for recipe in self.repository.get_by_ids([recipe_id for _, recipe_id, _ in scored])}
+            results = []
+            for score, recipe_id, row in scored:
+                if recipe_id not in recipes:
+                    continue
+                available_ingredients, missing_ingredients = [], []
+                for ingredient_id, name in zip(row.ingredient_ids, row.ingredient_names):
+                    name = name if name is not None else f"Ingredient {ingredient_id}"
+                    (available_ingredients if ingredient_id in wanted else missing_ingredients).append(name)
+                results.append({
+                    "recipe": self._recipe_dict(recipes[recipe_id]),
+                    "match_percentage": round(-score * 100, 1),
+                    "available_ingredients": available_ingredients,
+                    "missing_ingredients": missing_ingredients
+                })
         return results
 
     def _format_recipe(self, recipe) -> Recipe:
         """Format recipe with ingredient names and sorted steps"""
-        ingredients = []
-        for ri in recipe.recipe_ingredients:
-            ingredients.append({
-                "recipe_id": ri.recipe_id,
-                "ingredient_id": ri.ingredient_id,
-                "quantity": ri.quantity,
-                "unit": ri.unit,
-                "ingredient_name": ri.ingredient.name if ri.ingredient else None
+        return Recipe.model_validate(self._recipe_dict(recipe))
+
+    def _format_all(self, recipes, as_dicts: bool) -> List[Union[Recipe, dict]]:
+        if as_dicts:
+            return [self._recipe_dict(recipe) for recipe in recipes]
+        return [self._format_recipe(recipe) for recipe in recipes]
+
+    @staticmethod
+    def _recipe_dict(recipe) -> dict:
+        """An ORM recipe as a plain dict in the Recipe schema's shape and field order, with ingredient
+        names and sorted steps (no validation pass; orjson encodes it as it is)"""
+        return {
+            "name": recipe.name,
+            "category": recipe.category,
+            "cook_time_in_minutes": recipe.cook_time_in_minutes,
+            "prep_time_in_minutes": recipe.prep_time_in_minutes,
+            "id": recipe.id,
+            "ingredients": [
+                {"ingredient_id": ri.ingredient_id, "quantity": ri.quantity, "unit": ri.unit,
+                 "recipe_id": ri.recipe_id, "ingredient_name": ri.ingredient.name if ri.ingredient else None}
+                for ri in recipe.recipe_ingredients
+            ],
+            "steps": [
+                {"step_order": step.step_order, "instruction": step.instruction,
+                 "time_in_minutes": step.time_in_minutes, "recipe_id": step.recipe_id}
+                for step in sorted(recipe.recipe_steps, key=lambda x: x.step_order)
+            ],
+        }
+
+    def hydrate(self, rows, as_dicts: bool = False) -> List[Union[Recipe, dict]]:
+        """Build Recipe schemas (or dicts of the same shape) from recipe rows, loading ingredients and
+        steps for the whole page or export batch with one query each (Core and raw SQL strategies)"""
+        if not rows:
+            return []
+        ids = [row.id for row in rows]
+
+        if self.strategy is DataAccessStrategy.core:
+            ingredient_stmt = (
+                select(
+                    recipe_ingredient_table.c.recipe_id,
+                    recipe_ingredient_table.c.ingredient_id,
+                    recipe_ingredient_table.c.quantity,
+                    recipe_ingredient_table.c.unit,
+                    ingredient_table.c.name.label("ingredient_name"),
+                )
+                .select_from(recipe_ingredient_table.outerjoin(
+                    ingredient_table, recipe_ingredient_table.c.ingredient_id == ingredient_table.c.id
+                ))
+                .where(recipe_ingredient_table.c.recipe_id.in_(ids))
+            )
+            step_stmt = (
+                select(step_table)
+                .where(step_table.c.recipe_id.in_(ids))
+                .order_by(step_table.c.recipe_id, step_table.c.step_order)
+            )
+            ingredient_rows = self.db.execute(ingredient_stmt).fetchall()
+            step_rows = self.db.execute(step_stmt).fetchall()
+        else:
+            ingredient_query = text("""
+            SELECT RI.recipe_id, RI.ingredient_id, RI.quantity, RI.unit, I.name AS ingredient_name
+            FROM recipe_ingredient RI
+            LEFT JOIN ingredient I ON RI.ingredient_id = I.id
+            WHERE RI.recipe_id IN :ids
+            """).bindparams(bindparam("ids", expanding=True)).columns(quantity=recipe_ingredient_table.c.quantity.type)
+            step_query = text("""
+            SELECT recipe_id, step_order, instruction, time_in_minutes
+            FROM recipe_step
+            WHERE recipe_id IN :ids
+            ORDER BY recipe_id, step_order
+            """).bindparams(bindparam("ids", expanding=True))
+            ingredient_rows = self.db.execute(ingredient_query, {"ids": ids}).fetchall()
+            step_rows = self.db.execute(step_query, {"ids": ids}).fetchall()
+
+        ingredients, steps = {}, {}
+        for ri in ingredient_rows:
+            ingredients.setdefault(ri.recipe_id, []).append({
+                "ingredient_id": ri.ingredient_id, "quantity": ri.quantity, "unit": ri.unit,
+                "recipe_id": ri.recipe_id, "ingredient_name": ri.ingredient_name,
+            })
+        for step in step_rows:
+            steps.setdefault(step.recipe_id, []).append({
+                "step_order": step.step_order, "instruction": step.instruction,
+                "time_in_minutes": step.time_in_minutes, "recipe_id": step.recipe_id,
             })
 
-        steps = sorted(recipe.recipe_steps, key=lambda x: x.step_order)
-
-        return Recipe(
-            id=recipe.id,
-            name=recipe.name,
-            category=recipe.category,
-            cook_time_in_minutes=recipe.cook_time_in_minutes,
-            prep_time_in_minutes=recipe.prep_time_in_minutes,
-            ingredients=ingredients,
-            steps=steps
-        )
\ No newline at end of file
+        recipes = [
+            {
+                "name": row.name,
+                "category": row.category,
+                "cook_time_in_minutes": row.cook_time_in_minutes,
+                "prep_time_in_minutes": row.prep_time_in_minutes,
+                "id": row.id,
+                "ingredients": ingredients.get(row.id, []),
+                "steps": steps.get(row.id, []),
+            }
+            for row in rows
+        ]
+        return recipes if as_dicts else [Recipe.model_validate(recipe) for recipe in recipes]
@@ -0,0 +1,81 @@
+from typing import Dict, List, Optional, Set
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from ..core.catalog_snapshot import catalog_snapshot
+from ..core.minhash import jaccard
+from ..core.recipe_similarity import recipe_minhash
+from ..core.settings import settings
+from ..core.tracing import trace_class, span
+from ..models.recipe import Recipe as RecipeModel
+from ..models.recipe_ingredient import RecipeIngredient as RecipeIngredientModel
+from ..models.recipe_lsh_bucket import RecipeLshBucket as RecipeLshBucketModel
+from ..schemas.recipe import SimilarRecipe
+
+recipe_table = RecipeModel.__table__
+recipe_ingredient_table = RecipeIngredientModel.__table__
+bucket_table = RecipeLshBucketModel.__table__
+
+
+@trace_class("service")
+class RecipeSimilarityService:
+    """"More like this": LSH candidates from recipe_lsh_bucket, re-ranked by exact Jaccard similarity"""
+
+    def __init__(self, db: Session, candidates: Optional[int] = None):
+        self.db = db
+        self.candidates = candidates or settings.RECIPE_SIMILARITY_CANDIDATES
+
+    def get_similar_recipes(self, recipe_id: int, limit: int = 10) -> Optional[List[SimilarRecipe]]:
+        """Most similar recipes first (ties by id); None if the recipe does not exist"""
+        target = self._ingredient_sets([recipe_id], use_snapshot=False).get(recipe_id)
+        if target is None:
+            exists = self.db.execute(select(recipe_table.c.id).where(recipe_table.c.id == recipe_id)).first()
+            return None if exists is None else []
+
+        # Keys come from the ingredients rather than the stored rows, so an unindexed recipe still works
+        shared = func.count().label("shared")
+        with span("similar.candidates"):
+            candidate_ids = self.db.execute(
+                select(bucket_table.c.recipe_id)
+                .where(bucket_table.c.bucket.in_(set(recipe_minhash.keys(target))), bucket_table.c.recipe_id != recipe_id)
+                .group_by(bucket_table.c.recipe_id)
+                .order_by(shared.desc(), bucket_table.c.recipe_id)
+                .limit(self.candidates)
+            ).scalars().all()
+
+        with span("similar.rerank", candidates=len(candidate_ids)):
+            sets = self._ingredient_sets(candidate_ids)
+            ranked = sorted(
+                ((jaccard(target, ingredient_ids), candidate_id) for candidate_id, ingredient_ids in sets.items()),
+                key=lambda item: (-item[0], item[1]),
+            )[:limit]
+
+        rows = {
+            row.id: row for row in self.db.execute(
+                select(recipe_table).where(recipe_table.c.id.in_([candidate_id for _, candidate_id in ranked]))
+            )
+        }
+        return [
+            SimilarRecipe.model_validate({**rows[candidate_id]._mapping, "similarity": round(similarity, 4)})
+            for similarity, candidate_id in ranked if candidate_id in rows
+        ]
+
+    def _ingredient_sets(self, recipe_ids: List[int], use_snapshot: bool = True) -> Dict[int, Set[int]]:
+        """Ingredient ids per recipe: from the shared catalog snapshot when mapped, with the
+        database covering recipes added since it was built"""
+        sets: Dict[int, Set[int]] = {}
+        missing = list(recipe_ids)
+        snapshot = catalog_snapshot.get() if use_snapshot else None
+        if snapshot is not None:
+            missing = []
+            for recipe_id in recipe_ids:
+                if snapshot.recipe_position(recipe_id) < 0:
+                    missing.append(recipe_id)
+                else:
+                    sets[recipe_id] = set(snapshot.recipe_ingredient_ids(recipe_id))
+        if missing:
+            for recipe_id, ingredient_id in self.db.execute(
+                select(recipe_ingredient_table.c.recipe_id, recipe_ingredient_table.c.ingredient_id)
+                .where(recipe_ingredient_table.c.recipe_id.in_(missing))
+            ):
+                sets.setdefault(recipe_id, set()).add(ingredient_id)
+        return sets
@@ -0,0 +1,73 @@
+import heapq
+from collections import defaultdict
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..core.tracing import trace_class, span
+from ..models.favorite_recipe import FavoriteRecipe as FavoriteRecipeModel
+from ..models.recipe import Recipe as RecipeModel
+from ..models.recipe_neighbor import RecipeNeighbor as RecipeNeighborModel
+from ..models.user import User as UserModel
+from ..schemas.recipe import AlsoFavoritedRecipe, RecommendedRecipe
+
+favorite_table = FavoriteRecipeModel.__table__
+recipe_table = RecipeModel.__table__
+neighbor_table = RecipeNeighborModel.__table__
+user_table = UserModel.__table__
+
+
+@trace_class("service")
+class RecommendationService:
+    """"Users who favorited this also favorited", served from the precomputed recipe_neighbor lists"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_also_favorited(self, recipe_id: int, limit: int = 10) -> Optional[List[AlsoFavoritedRecipe]]:
+        """Recipes most often favorited by the same users, best first; None if the recipe does not exist"""
+        rows = self.db.execute(
+            select(recipe_table, neighbor_table.c.shared, neighbor_table.c.score)
+            .join(neighbor_table, neighbor_table.c.neighbor_id == recipe_table.c.id)
+            .where(neighbor_table.c.recipe_id == recipe_id)
+            .order_by(neighbor_table.c.score.desc(), neighbor_table.c.neighbor_id)
+            .limit(limit)
+        ).fetchall()
+        if not rows and self.db.execute(select(recipe_table.c.id).where(recipe_table.c.id == recipe_id)).first() is None:
+            return None
+        return [AlsoFavoritedRecipe.model_validate({**row._mapping, "score": round(row.score, 4)}) for row in rows]
+
+    def get_recommendations(self, user_id: int, limit: int = 10) -> Optional[List[RecommendedRecipe]]:
+        """Recipes the user has not favorited, by summed neighbor score over their favorites; None if the user does not exist"""
+        favorites = set(self.db.execute(
+            select(favorite_table.c.recipe_id).where(favorite_table.c.user_id == user_id)
+        ).scalars())
+        if not favorites:
+            exists = self.db.execute(select(user_table.c.id).where(user_table.c.id == user_id)).first()
+            return None if exists is None else []
+
+        with span("recommend.merge", favorites=len(favorites)):
+            scores = defaultdict(float)
+            because = {}
+            for source_id, neighbor_id, score in self.db.execute(
+                select(neighbor_table.c.recipe_id, neighbor_table.c.neighbor_id, neighbor_table.c.score)
+                .where(neighbor_table.c.recipe_id.in_(favorites))
+            ):
+                if neighbor_id in favorites:
+                    continue
+                scores[neighbor_id] += score
+                best = because.get(neighbor_id)
+                if best is None or (score, -source_id) > (best[0], -best[1]):
+                    because[neighbor_id] = (score, source_id)
+            ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+
+        rows = {
+            row.id: row for row in self.db.execute(
+                select(recipe_table).where(recipe_table.c.id.in_([recipe_id for recipe_id, _ in ranked]))
+            )
+        }
+        return [
+            RecommendedRecipe.model_validate({
+                **rows[recipe_id]._mapping, "score": round(score, 4), "because_recipe_id": because[recipe_id][1],
+            })
+            for recipe_id, score in ranked if recipe_id in rows
+        ]
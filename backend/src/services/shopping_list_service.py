@@ -0,0 +1,121 @@
+from collections import Counter
+from decimal import Decimal
+from typing import Dict, Optional
+from sqlalchemy import and_, case, func, literal, select
+from sqlalchemy.orm import Session
+from ..core.tracing import trace_class, span
+from ..core.units import from_base, to_base
+from ..models.favorite_recipe import FavoriteRecipe as FavoriteRecipeModel
+from ..models.ingredient import Ingredient as IngredientModel
+from ..models.recipe import Recipe as RecipeModel
+from ..models.recipe_ingredient import RecipeIngredient as RecipeIngredientModel
+from ..models.user import User as UserModel
+from ..models.user_pantry import UserPantry as UserPantryModel
+from ..schemas.shopping_list import ShoppingList, ShoppingListItem, ShoppingListRequest
+
+favorite_table = FavoriteRecipeModel.__table__
+ingredient_table = IngredientModel.__table__
+recipe_table = RecipeModel.__table__
+recipe_ingredient_table = RecipeIngredientModel.__table__
+user_table = UserModel.__table__
+pantry_table = UserPantryModel.__table__
+
+_CENT = Decimal("0.01")
+
+
+@trace_class("service")
+class ShoppingListService:
+    """What a user still has to buy for a set of recipes: one grouped query sums the quantities per
+    ingredient and unit next to the user's pantry row, then one pass normalizes units and subtracts"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def build(self, user_id: int, request: ShoppingListRequest) -> Optional[ShoppingList]:
+        """None if the user does not exist"""
+        if self.db.execute(select(user_table.c.id).where(user_table.c.id == user_id)).first() is None:
+            return None
+
+        servings = Counter(request.recipe_ids)
+        if request.include_favorites:
+            for recipe_id in self.db.execute(
+                select(favorite_table.c.recipe_id).where(favorite_table.c.user_id == user_id)
+            ).scalars():
+                servings.setdefault(recipe_id, 1)
+        existing = set(self.db.execute(
+            select(recipe_table.c.id).where(recipe_table.c.id.in_(list(servings)))
+        ).scalars()) if servings else set()
+        missing = sorted(recipe_id for recipe_id in servings if recipe_id not in existing)
+        servings = {recipe_id: count for recipe_id, count in servings.items() if recipe_id in existing}
+        if not servings:
+            return ShoppingList(user_id=user_id, recipe_count=0, items=[], missing_recipe_ids=missing)
+
+        with span("shopping_list.query", recipes=len(servings)):
+            rows = self.db.execute(self._statement(user_id, servings)).fetchall()
+
+        with span("shopping_list.aggregate", rows=len(rows)):
+            items = self._aggregate(rows)
+        return ShoppingList(
+            user_id=user_id, recipe_count=sum(servings.values()), items=items, missing_recipe_ids=missing
+        )
+
+    @staticmethod
+    def _statement(user_id: int, servings: Dict[int, int]):
+        """Required quantity per (ingredient, unit) over the recipes (times how often each is planned),
+        with the user's pantry row for the ingredient"""
+        ri = recipe_ingredient_table
+        multiplier = case(servings, value=ri.c.recipe_id) if max(servings.values()) > 1 else literal(1)
+        needs = (
+            select(ri.c.ingredient_id, ri.c.unit, func.sum(ri.c.quantity * multiplier).label("quantity"))
+            .where(ri.c.recipe_id.in_(list(servings)))
+            .group_by(ri.c.ingredient_id, ri.c.unit)
+            .subquery()
+        )
+        return (
+            select(
+                needs.c.ingredient_id, needs.c.unit, needs.c.quantity,
+                ingredient_table.c.name, ingredient_table.c.category,
+                pantry_table.c.quantity.label("pantry_quantity"), pantry_table.c.unit.label("pantry_unit"),
+            )
+            .select_from(
+                needs.join(ingredient_table, ingredient_table.c.id == needs.c.ingredient_id)
+                .outerjoin(pantry_table, and_(
+                    pantry_table.c.ingredient_id == needs.c.ingredient_id, pantry_table.c.user_id == user_id
+                ))
+            )
+        )
+
+    @staticmethod
+    def _aggregate(rows) -> list:
+        """Sum per (ingredient, dimension) in base units, subtract pantry stock of the same dimension"""
+        required = {}
+        pantry = {}
+        for row in rows:
+            dim, quantity = to_base(Decimal(str(row.quantity)), row.unit)
+            entry = required.setdefault((row.ingredient_id, dim), {"quantity": Decimal(0), "units": set(), "row": row})
+            entry["quantity"] += quantity
+            entry["units"].add(row.unit)
+            if row.pantry_quantity is not None:
+                pantry[row.ingredient_id] = to_base(Decimal(str(row.pantry_quantity)), row.pantry_unit)
+
+        items = []
+        for (ingredient_id, dim), entry in required.items():
+            stock_dim, stock = pantry.get(ingredient_id, (None, Decimal(0)))
+            used = min(max(stock, Decimal(0)), entry["quantity"]) if stock_dim == dim else Decimal(0)
+            still = entry["quantity"] - used
+            if still <= 0:
+                continue
+            _, unit = from_base(still, dim, entry["units"])
+            size = to_base(Decimal(1), unit)[1]
+            row = entry["row"]
+            items.append(ShoppingListItem(
+                ingredient_id=ingredient_id,
+                ingredient_name=row.name,
+                category=row.category,
+                quantity=(still / size).quantize(_CENT),
+                unit=unit,
+                required=(entry["quantity"] / size).quantize(_CENT),
+                in_pantry=(used / size).quantize(_CENT),
+            ))
+        items.sort(key=lambda item: (item.category is None, item.category or "", item.ingredient_name or "", item.unit))
+        return items
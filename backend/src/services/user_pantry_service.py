@@ -1,22 +1,79 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
+from sqlalchemy import text, select
+from ..core.data_access import DataAccessStrategy, resolve_strategy
+from ..models.user_pantry import UserPantry as UserPantryModel
+from ..models.ingredient import Ingredient as IngredientModel
 from ..repositories.user_pantry_repository import UserPantryRepository
+from .ingredient_service import IngredientService
 from ..schemas.user_pantry import UserPantry, UserPantryCreate, UserPantryUpdate
+from ..core.tracing import trace_class
 
+pantry_table = UserPantryModel.__table__
+ingredient_table = IngredientModel.__table__
 
+# Core version of the pantry + ingredient name join shared by the read paths
+_pantry_select = (
+    select(
+        pantry_table.c.user_id,
+        pantry_table.c.ingredient_id,
+        pantry_table.c.quantity,
+        pantry_table.c.unit,
+        ingredient_table.c.name.label("ingredient_name"),
+    )
+    .select_from(pantry_table.outerjoin(ingredient_table, pantry_table.c.ingredient_id == ingredient_table.c.id))
+)
+
+_PANTRY_SQL = """
+SELECT P.user_id, P.ingredient_id, P.quantity, P.unit, I.name AS ingredient_name
+FROM user_pantry P
+LEFT JOIN ingredient I ON P.ingredient_id = I.id
+"""
+
+
+@trace_class("service")
 class UserPantryService:
-    def __init__(self, db: Session):
+    """Pantry reads go through the configured data-access strategy; writes use the ORM repository."""
+    DEFAULT_STRATEGY = DataAccessStrategy.orm
+
+    def __init__(self, db: Session, strategy: Optional[DataAccessStrategy] = None):
         self.repository = UserPantryRepository(db)
+        self.db = db
+        self.strategy = resolve_strategy("pantry", self.DEFAULT_STRATEGY, strategy)
 
     def get_user_pantry(self, user_id: int, skip: int = 0, limit: int = 100) -> List[UserPantry]:
-        pantry_items = self.repository.get_user_pantry(user_id, skip, limit)
-        return [self._format_pantry_item(item) for item in pantry_items]
+        if self.strategy is DataAccessStrategy.orm:
+            pantry_items = self.repository.get_user_pantry(user_id, skip, limit)
+            return [self._format_pantry_item(item) for item in pantry_items]
+
+        if self.strategy is DataAccessStrategy.core:
+            stmt = _pantry_select.where(pantry_table.c.user_id == user_id).limit(limit).offset(skip)
+            rows = self.db.execute(stmt).fetchall()
+        else:
+            query = text(_PANTRY_SQL + "WHERE P.user_id = :user_id LIMIT :limit OFFSET :skip")
+            rows = self.db.execute(query, {"user_id": user_id, "limit": limit, "skip": skip}).fetchall()
+        return [self._format_pantry_item(row) for row in rows]
 
     def get_pantry_item(self, user_id: int, ingredient_id: int) -> Optional[UserPantry]:
-        item = self.repository.get_by_user_and_ingredient(user_id, ingredient_id)
-        return self._format_pantry_item(item) if item else None
+        if self.strategy is DataAccessStrategy.orm:
+            item = self.repository.get_by_user_and_ingredient(user_id, ingredient_id)
+            return self._format_pantry_item(item) if item else None
+
+        if self.strategy is DataAccessStrategy.core:
+            stmt = _pantry_select.where(pantry_table.c.user_id == user_id, pantry_table.c.ingredient_id == ingredient_id)
+            row = self.db.execute(stmt).fetchone()
+        else:
+            query = text(_PANTRY_SQL + "WHERE P.user_id = :user_id AND P.ingredient_id = :ingredient_id")
+            row = self.db.execute(query, {"user_id": user_id, "ingredient_id": ingredient_id}).fetchone()
+        return self._format_pantry_item(row) if row else None
 
-    def add_pantry_item(self, user_id: int, pantry_data: UserPantryCreate) -> UserPantry:
+    def add_pantry_item(self, user_id: int, pantry_data: UserPantryCreate) -> Optional[UserPantry]:
+        """Add an item by ingredient id or name; None when the name does not match an ingredient"""
+        if pantry_data.ingredient_id is None:
+            ingredient = IngredientService(self.db).get_ingredient_by_name(pantry_data.ingredient_name)
+            if ingredient is None:
+                return None
+            pantry_data = pantry_data.model_copy(update={"ingredient_id": ingredient.id})
         item = self.repository.create(user_id, pantry_data)
         return self._format_pantry_item(item)
 
@@ -28,15 +85,42 @@ class UserPantryService:
         return self.repository.delete(user_id, ingredient_id)
 
     def get_pantry_by_category(self, user_id: int, category: str, skip: int = 0, limit: int = 100) -> List[UserPantry]:
-        pantry_items = self.repository.get_pantry_by_category(user_id, category, skip, limit)
-        return [self._format_pantry_item(item) for item in pantry_items]
+        if self.strategy is DataAccessStrategy.orm:
+            pantry_items = self.repository.get_pantry_by_category(user_id, category, skip, limit)
+            return [self._format_pantry_item(item) for item in pantry_items]
+
+        if self.strategy is DataAccessStrategy.core:
+            stmt = (
+                _pantry_select
+                .where(pantry_table.c.user_id == user_id, ingredient_table.c.category == category)
+                .limit(limit)
+                .offset(skip)
+            )
+            rows = self.db.execute(stmt).fetchall()
+        else:
+            query = text(_PANTRY_SQL + "WHERE P.user_id = :user_id AND I.category = :category LIMIT :limit OFFSET :skip")
+            rows = self.db.execute(query, {"user_id": user_id, "category": category, "limit": limit, "skip": skip}).fetchall()
+        return [self._format_pantry_item(row) for row in rows]
+
+    @staticmethod
+    def pantry_query(user_id: int):
+        """Core select of a user's pantry with ingredient names, in ingredient order (for streaming exports)"""
+        return _pantry_select.where(pantry_table.c.user_id == user_id).order_by(pantry_table.c.ingredient_id)
+
+    def format_rows(self, rows) -> List[UserPantry]:
+        """Pantry items from a batch of pantry_query rows"""
+        return [self._format_pantry_item(row) for row in rows]
 
     def _format_pantry_item(self, item) -> UserPantry:
-        """Format pantry item with ingredient name"""
+        """Format pantry item with ingredient name (ORM object or Core/raw row)"""
+        if hasattr(item, "ingredient_name"):
+            ingredient_name = item.ingredient_name
+        else:
+            ingredient_name = item.ingredient.name if item.ingredient else None
         return UserPantry(
             user_id=item.user_id,
             ingredient_id=item.ingredient_id,
             quantity=item.quantity,
             unit=item.unit,
-            ingredient_name=item.ingredient.name if item.ingredient else None
-        )
\ No newline at end of file
+            ingredient_name=ingredient_name
+        )
@@ -3,8 +3,10 @@ from typing import Optional, List
 from ..models.user import User
 from ..schemas.user import UserCreate, UserUpdate, UserResponse, UserProfile
 from ..repositories.user_repository import UserRepository
+from ..core.tracing import trace_class
 
 
+@trace_class("service")
 class UserService:
     def __init__(self, db: Session):
         self.db = db
@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+from src.core.assistant import AssistantBusy, ConcurrencyLimiter, MicroBatcher, ResponseCache, cache_key
+from src.core.assistant_model import RECIPE, SALVAGE, LocalAssistantModel, ModelRequest, content_words
+from src.core.settings import settings
+
+
+class CountingModel(LocalAssistantModel):
+    """LocalAssistantModel that records its batches and takes `delay` seconds per call"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = []
+        self.started = threading.Event()
+
+    def generate(self, requests):
+        self.calls.append(len(requests))
+        self.started.set()
+        time.sleep(self.delay)
+        return super().generate(requests)
+
+
+@pytest.fixture
+def batcher():
+    batcher = MicroBatcher(ResponseCache(capacity=100, ttl=60))
+    yield batcher
+    batcher.stop()
+
+
+def _salvage(prompt: str) -> ModelRequest:
+    return ModelRequest(SALVAGE, prompt, {"stage": "finished", "recipe": {"name": "Soup"}})
+
+
+def test_content_words_ignore_case_order_punctuation_stop_words_and_plurals():
+    assert content_words("How can I make Tomatoes and Eggs?") == content_words("egg, tomato... make please")
+    assert content_words("Berries, peaches and glasses") == ["berry", "glass", "peach"]
+    assert content_words("the a of") == []
+
+
+def test_cache_key_shares_rephrasings_only_for_the_same_inputs():
+    key = cache_key(RECIPE, "local", "Something quick with eggs", [1, 2], [])
+    assert key == cache_key(RECIPE, "local", "quick EGG something!", [1, 2], [])
+    assert key != cache_key(RECIPE, "local", "Something quick with eggs", [1, 3], [])
+    assert key != cache_key(RECIPE, "other", "Something quick with eggs", [1, 2], [])
+    assert key != cache_key(SALVAGE, "local", "Something quick with eggs", [1, 2], [])
+
+
+def test_identical_requests_share_one_model_call(batcher):
+    model = CountingModel(delay=0.2)
+    batcher.start(model)
+    first = batcher.submit("same", _salvage("too salty"))
+    assert model.started.wait(2)
+    # Queued while the first is running: joins it instead of calling the model again
+    second = batcher.submit("same", _salvage("too salty"))
+    assert second is first
+    assert first.result(timeout=2) == second.result(timeout=2)
+    assert model.calls == [1]
+    assert batcher.cache.get("same") == first.result()
+    assert batcher.pending == 0
+
+
+def test_concurrent_requests_are_sent_in_one_batch(batcher, monkeypatch):
+    monkeypatch.setattr(settings, "ASSISTANT_BATCH_WAIT_MS", 200)
+    monkeypatch.setattr(settings, "ASSISTANT_BATCH_SIZE", 8)
+    model = CountingModel()
+    batcher.start(model)
+    futures = [batcher.submit(problem, _salvage(problem)) for problem in ("too salty", "burnt", "too thin")]
+    replies = [future.result(timeout=2) for future in futures]
+    assert model.calls == [3]
+    assert (batcher.batches, batcher.requests) == (1, 3)
+    assert replies == LocalAssistantModel().generate([_salvage(problem) for problem in ("too salty", "burnt", "too thin")])
+
+
+def test_model_errors_reach_every_waiting_request(batcher):
+    class FailingModel(LocalAssistantModel):
+        def generate(self, requests):
+            raise RuntimeError("model down")
+
+    batcher.start(FailingModel())
+    future = batcher.submit("key", _salvage("bland"))
+    with pytest.raises(RuntimeError, match="model down"):
+        future.result(timeout=2)
+    assert batcher.cache.get("key") is None
+    assert batcher.pending == 0
+
+
+def test_limiter_rejects_requests_over_the_per_owner_limit():
+    limiter = ConcurrencyLimiter(limit=1)
+    with limiter.slot("user:1"):
+        with pytest.raises(AssistantBusy):
+            with limiter.slot("user:1"):
+                pass
+        with limiter.slot("user:2"):
+            pass
+    # The slot is released on exit, also after an error
+    with pytest.raises(ValueError):
+        with limiter.slot("user:1"):
+            raise ValueError
+    with limiter.slot("user:1"):
+        pass
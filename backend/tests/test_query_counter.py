@@ -0,0 +1,63 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from src.core.query_counter import QueryBudgetExceeded, QueryCounterMiddleware, install_query_counter, statement_shape
+from src.core.settings import settings
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_BUDGET", 5)
+    monkeypatch.setattr(settings, "N_PLUS_ONE_THRESHOLD", 3)
+    monkeypatch.setattr(settings, "QUERY_BUDGET_STRICT", True)
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    install_query_counter(engine)
+    app = FastAPI()
+    app.add_middleware(QueryCounterMiddleware)
+
+    @app.get("/distinct/{count}")
+    def distinct(count: int):
+        # Different statement shapes: only the budget applies
+        with engine.connect() as conn:
+            for n in range(count):
+                conn.execute(text(f"SELECT {n}" + " + 0" * n))
+        return {"count": count}
+
+    @app.get("/repeated/{count}")
+    def repeated(count: int):
+        # One shape per call, like a lazy load inside a loop
+        with engine.connect() as conn:
+            for n in range(count):
+                conn.execute(text("SELECT :n"), {"n": n})
+        return {"count": count}
+
+    yield TestClient(app)
+    engine.dispose()
+
+
+def test_statement_shape_ignores_in_list_length_and_spacing():
+    assert statement_shape("SELECT * FROM t WHERE id IN (?, ?, ?)") == statement_shape("SELECT *\n  FROM t WHERE id IN (?,?)")
+    assert statement_shape("SELECT 1") != statement_shape("SELECT 2")
+
+
+def test_server_timing_reports_the_request_queries(client):
+    response = client.get("/distinct/2")
+    assert response.status_code == 200
+    timing = response.headers["server-timing"]
+    assert timing.startswith("db;dur=")
+    assert timing.endswith('desc="2 queries"')
+
+
+def test_strict_mode_raises_over_the_query_budget(client):
+    assert client.get("/distinct/5").status_code == 200
+    with pytest.raises(QueryBudgetExceeded, match=r"6 queries \(budget 5\)"):
+        client.get("/distinct/6")
+
+
+def test_strict_mode_raises_on_a_repeated_statement(client):
+    assert client.get("/repeated/2").status_code == 200
+    with pytest.raises(QueryBudgetExceeded, match=r"statement repeated 3x \(possible N\+1\)"):
+        client.get("/repeated/3")